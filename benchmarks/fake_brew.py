@@ -0,0 +1,163 @@
+"""Generate a synthetic ``brew`` executable for benchmarks.
+
+The script answers the commands ``BrewService`` runs. Its output is built
+deterministically from a package count, so runs are comparable:
+- ``--version``
+- ``list`` and ``outdated --quiet`` for each kind
+- ``info --json=v2 --installed``
+- ``info --json=v2`` for named packages
+- plain ``info``
+
+Every call sleeps for a fixed latency first, to mimic Homebrew's Ruby
+startup. Descriptions are padded to a fixed size to control how much
+output is parsed.
+
+    PYTHONPATH=src python benchmarks/fake_brew.py /tmp/fakebrew --packages 5000
+    PATH=/tmp/fakebrew:$PATH brew list --formula | wc -l
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import stat
+import sys
+
+
+SCRIPT = r'''#!{python}
+import json
+import sys
+import time
+
+PACKAGES = {packages}
+LATENCY_MS = {latency_ms}
+DESCRIPTION_BYTES = {description_bytes}
+
+FORMULA_COUNT = PACKAGES - PACKAGES // 4
+CASK_COUNT = PACKAGES // 4
+FORMULAE = [f"formula-{{index:05d}}" for index in range(FORMULA_COUNT)]
+CASKS = [f"cask-{{index:05d}}" for index in range(CASK_COUNT)]
+
+
+def outdated(index):
+    return index % 10 == 0
+
+
+def description(name):
+    text = f"Synthetic package {{name}} for benchmarks. "
+    return (text * (DESCRIPTION_BYTES // len(text) + 1))[:DESCRIPTION_BYTES]
+
+
+def formula(index):
+    name = FORMULAE[index]
+    dependencies = [FORMULAE[dep] for dep in (index * 7 % FORMULA_COUNT, index * 13 % FORMULA_COUNT) if dep != index]
+    return {{
+        "name": name,
+        "full_name": name,
+        "desc": description(name),
+        "homepage": f"https://example.com/{{name}}",
+        "tap": "homebrew/core",
+        "versions": {{"stable": "2.0.0"}},
+        "installed": [{{"version": "1.0.0" if outdated(index) else "2.0.0", "installed_on_request": index % 3 != 0}}],
+        "dependencies": dependencies,
+        "caveats": None,
+        "outdated": outdated(index),
+    }}
+
+
+def cask(index):
+    token = CASKS[index]
+    return {{
+        "token": token,
+        "full_token": token,
+        "name": [token.replace("-", " ").title()],
+        "desc": description(token),
+        "homepage": f"https://example.com/{{token}}",
+        "tap": "homebrew/cask",
+        "version": "2.0.0",
+        "installed": "1.0.0" if outdated(index) else "2.0.0",
+        "outdated": outdated(index),
+    }}
+
+
+def index_of(name):
+    try:
+        return int(name.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return -1
+
+
+def main(argv):
+    time.sleep(LATENCY_MS / 1000)
+    flags = [arg for arg in argv if arg.startswith("-")]
+    names = [arg for arg in argv[1:] if not arg.startswith("-")]
+    command = argv[0] if argv else ""
+
+    if command == "--version":
+        print("Homebrew 4.3.0")
+    elif command == "list":
+        print("\n".join(CASKS if "--cask" in flags else FORMULAE))
+    elif command == "outdated":
+        items = CASKS if "--cask" in flags else FORMULAE
+        print("\n".join(name for index, name in enumerate(items) if outdated(index)))
+    elif command == "info" and "--json=v2" in flags:
+        if "--installed" in flags:
+            formulae = [formula(index) for index in range(FORMULA_COUNT)]
+            casks = [cask(index) for index in range(CASK_COUNT)]
+        else:
+            want_cask = "--cask" in flags
+            want_formula = "--formula" in flags
+            formulae = [formula(index_of(name)) for name in names
+                        if not want_cask and name in FORMULAE[index_of(name):index_of(name) + 1]]
+            casks = [cask(index_of(name)) for name in names
+                     if not want_formula and name in CASKS[index_of(name):index_of(name) + 1]]
+            if not formulae and not casks:
+                print(f"Error: No available formula or cask with the name \"{{names[0] if names else ''}}\".", file=sys.stderr)
+                return 1
+        json.dump({{"formulae": formulae, "casks": casks}}, sys.stdout)
+    elif command == "info" and names:
+        print(f"==> {{names[0]}}: stable 2.0.0\n{{description(names[0])}}\nhttps://example.com/{{names[0]}}")
+    else:
+        print(f"Error: Unknown command: {{command}}", file=sys.stderr)
+        return 1
+    return 0
+
+
+sys.exit(main(sys.argv[1:]))
+'''
+
+
+def write_fake_brew(directory: Path, packages: int, latency_ms: float = 0.0, description_bytes: int = 80) -> Path:
+    """Write an executable ``brew`` into ``directory`` and return its path."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "brew"
+    path.write_text(
+        SCRIPT.format(
+            python=sys.executable,
+            packages=packages,
+            latency_ms=latency_ms,
+            description_bytes=description_bytes,
+        ),
+        encoding="utf-8",
+    )
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def install_on_path(directory: Path) -> None:
+    """Put ``directory`` first on ``PATH`` for this process and its children."""
+    os.environ["PATH"] = os.pathsep.join([str(directory), os.environ.get("PATH", "")])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--packages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--description-bytes", type=int, default=80)
+    args = parser.parse_args()
+    print(write_fake_brew(args.directory, args.packages, args.latency_ms, args.description_bytes))
+
+
+if __name__ == "__main__":
+    main()
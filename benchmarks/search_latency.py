@@ -0,0 +1,98 @@
+"""Measure ranked search latency on a synthetic 15k-entry catalog.
+
+It builds a ``SearchEngine`` over generated formulae and casks, with names,
+descriptions and taps drawn from a brew-like vocabulary. It then times
+keystroke-by-keystroke queries of each kind (exact names, prefixes,
+descriptions and typos) and prints the build time and per-kind latencies.
+
+    PYTHONPATH=src python benchmarks/search_latency.py
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from brew_gui_manager.catalog_index import CatalogEntry
+from brew_gui_manager.search import SearchEngine
+
+
+SYLLABLES = ["ba", "ko", "ri", "zen", "lu", "tar", "gi", "mo", "x", "py", "jet", "qu", "ne", "so", "dra", "vim"]
+WORDS = (
+    "command line json yaml parser processor terminal emulator file manager git client http server "
+    "database postgres sqlite viewer editor network monitor image video audio converter compiler "
+    "library framework runtime shell prompt fast lightweight modern secure cross platform tool kit "
+    "search index archive backup sync cloud storage container kubernetes docker build system"
+).split()
+TAPS = ["homebrew/core", "homebrew/cask", "hashicorp/tap", "mongodb/brew", "acme/tools"]
+
+
+def corpus(size: int, rng: random.Random) -> list[CatalogEntry]:
+    entries: list[CatalogEntry] = []
+    seen: set[str] = set()
+    while len(entries) < size:
+        name = "".join(rng.choice(SYLLABLES) for _index in range(rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            name = f"{name}-{rng.choice(WORDS)}"
+        if name in seen:
+            continue
+        seen.add(name)
+        kind = "cask" if rng.random() < 0.35 else "formula"
+        description = " ".join(rng.choice(WORDS) for _index in range(rng.randint(3, 9))).capitalize()
+        tap = TAPS[1] if kind == "cask" else rng.choice(TAPS)
+        entries.append(CatalogEntry(name, kind, name.title(), description, tap, "1.0.0"))
+    return entries
+
+
+def typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    index = rng.randrange(len(word) - 1)
+    return word[:index] + word[index + 1] + word[index] + word[index + 2:]
+
+
+def keystrokes(query: str) -> list[str]:
+    return [query[:end] for end in range(1, len(query) + 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=15_000)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    entries = corpus(args.size, rng)
+    started = time.perf_counter()
+    engine = SearchEngine(entries)
+    print(f"built index over {len(engine)} entries in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    samples = rng.sample(entries, args.queries)
+    workloads = {
+        "name": [query for entry in samples for query in keystrokes(entry.name)],
+        "description": [
+            query for entry in samples for query in keystrokes(" ".join(entry.description.lower().split()[:2]))
+        ],
+        "typo": [typo(entry.name, rng) for entry in samples],
+        "phrase": ["the json cli tool", "fast file manager", "docker container build", "postgres viewer"],
+    }
+
+    print(f"{'workload':<12} {'queries':>8} {'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    for label, queries in workloads.items():
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            engine.search(query, limit=args.limit)
+            timings.append(time.perf_counter() - started)
+        ordered = sorted(timings)
+        p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+        print(
+            f"{label:<12} {len(ordered):>8} {statistics.median(ordered) * 1000:>10.2f} "
+            f"{p95 * 1000:>8.2f} {ordered[-1] * 1000:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Benchmark the app against a synthetic Homebrew of a given size.
+
+A generated fake ``brew`` (see ``fake_brew.py``) is put first on ``PATH``.
+Each package count gets its own fake. The cases are:
+- ``collect_snapshot.text`` and ``collect_snapshot.json``: a full snapshot
+  in each mode
+- ``details.parse``: parse one ``info --json=v2`` payload
+- ``details.fetch``: one uncached ``get_package_details`` call
+- ``filter.keystrokes``: build a shelf filter index and type a query into it
+- ``shelf.set_items``: load a shelf model and render its visible window
+- ``gui.apply_filter``, ``gui.shelf_set_items`` and ``gui.refresh_to_paint``:
+  the same work through a real ``BrewManagerApp``. These need a display;
+  pass ``--xvfb`` to start one, otherwise they are reported as skipped.
+
+With ``--fixtures`` the same cases run once against recorded Homebrew
+output (see ``brew_gui_manager.brew_replay``) instead, labelled ``@replay``.
+
+Results go to a JSON file. With ``--baseline`` every case is compared with
+the baseline's median. The run exits with status 1 when any case is slower
+than its threshold allows.
+
+    PYTHONPATH=src python benchmarks/suite.py --packages 50 10000 --output bench.json
+    PYTHONPATH=src python benchmarks/suite.py --baseline bench.json --threshold 0.25 --xvfb
+    PYTHONPATH=src python benchmarks/suite.py --fixtures tests/fixtures/brew --latency-ms 50 --jitter-ms 10
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_brew import install_on_path, write_fake_brew  # noqa: E402
+
+from brew_gui_manager.brew_replay import FixtureStore, ReplayPolicy, write_replay_executable  # noqa: E402
+from brew_gui_manager.brew_service import BrewService  # noqa: E402
+from brew_gui_manager.filter_index import FilterIndex  # noqa: E402
+from brew_gui_manager.shelf import ShelfModel  # noqa: E402
+
+
+Case = Callable[[], None]
+
+
+def timed(fn: Case, repeat: int, warmup: int = 1) -> dict[str, float]:
+    for _index in range(warmup):
+        fn()
+    samples = []
+    for _index in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], 3),
+        "min_ms": round(ordered[0], 3),
+        "runs": len(ordered),
+    }
+
+
+def service_cases(names: list[str], target: str) -> dict[str, Case]:
+    service = BrewService(snapshot_mode="json")
+    payload = subprocess.run(
+        ["brew", "info", "--json=v2", target],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    def fetch_details() -> None:
+        service.details_cache.clear()
+        service.get_package_details(target, "formula")
+
+    def filter_keystrokes() -> None:
+        index = FilterIndex(names)
+        for end in range(1, len(target) + 1):
+            index.search(target[:end])
+
+    def shelf_set_items() -> None:
+        model = ShelfModel()
+        model.visible_rows = 40
+        model.set_items(names)
+        model.scroll_to(len(names) // 2)
+        model.window()
+
+    return {
+        "collect_snapshot.text": lambda: BrewService(snapshot_mode="text").collect_snapshot(),
+        "collect_snapshot.json": lambda: BrewService(snapshot_mode="json").collect_snapshot(),
+        "details.parse": lambda: service._parse_package_details_json(target, "formula", payload),
+        "details.fetch": fetch_details,
+        "filter.keystrokes": filter_keystrokes,
+        "shelf.set_items": shelf_set_items,
+    }
+
+
+def gui_results(expected: int, repeat: int, workdir: Path) -> dict[str, dict[str, float]]:
+    """Time the Tk paths through a real app; raises ``RuntimeError`` without a display."""
+    import tkinter as tk
+
+    from brew_gui_manager.activity_log import ActivityLog
+    from brew_gui_manager.app import BrewManagerApp
+    from brew_gui_manager.catalog_index import CatalogIndex
+    from brew_gui_manager.snapshot_cache import SnapshotCache
+
+    try:
+        probe = tk.Tk()
+    except tk.TclError as exc:
+        raise RuntimeError(f"no display ({exc})") from None
+    probe.destroy()
+
+    def build() -> tuple[tk.Tk, BrewManagerApp]:
+        root = tk.Tk()
+        app = BrewManagerApp(
+            root,
+            service=BrewService(snapshot_mode="json"),
+            cache=SnapshotCache(workdir / "snapshot.json"),
+            catalog=CatalogIndex(workdir / "catalog.sqlite3", workdir / "api"),
+            activity=ActivityLog(None),
+        )
+        return root, app
+
+    def pump_until(root: tk.Tk, done: Callable[[], bool], timeout: float = 120.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not done():
+            if time.monotonic() > deadline:
+                raise RuntimeError("timed out waiting for the app to paint")
+            root.update()
+            time.sleep(0.001)
+
+    def close(root: tk.Tk, app: BrewManagerApp) -> None:
+        app.close()
+        root.destroy()
+
+    def refresh_to_paint() -> None:
+        (workdir / "snapshot.json").unlink(missing_ok=True)
+        root, app = build()
+        app.refresh()
+        pump_until(root, lambda: app.formulae_shelf.size() == expected and app._render.pending == 0)
+        root.update_idletasks()
+        close(root, app)
+
+    results = {"gui.refresh_to_paint": timed(refresh_to_paint, repeat)}
+
+    root, app = build()
+    app.refresh()
+    pump_until(root, lambda: app.formulae_shelf.size() == expected)
+    names = list(app._all_formulae)
+    keywords = ["f", "fo", "formula-0", "formula-00", "formula-001", ""]
+
+    def apply_filter() -> None:
+        for keyword in keywords:
+            app.filter_var.set(keyword)
+            app._apply_filter()
+        root.update_idletasks()
+
+    def shelf_set_items() -> None:
+        app.formulae_shelf.set_items(names[::-1])
+        app.formulae_shelf.set_items(names)
+        root.update_idletasks()
+
+    results["gui.apply_filter"] = timed(apply_filter, repeat)
+    results["gui.shelf_set_items"] = timed(shelf_set_items, repeat)
+    close(root, app)
+    return results
+
+
+def start_xvfb() -> subprocess.Popen | None:
+    if os.environ.get("DISPLAY") or shutil.which("Xvfb") is None:
+        return None
+    display = ":97"
+    process = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return process
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, Any],
+    threshold: float,
+    min_delta_ms: float,
+) -> list[str]:
+    """Print a comparison table and return the names of regressed cases."""
+    overrides = baseline.get("thresholds", {})
+    regressions = []
+    print(f"\n{'case':<36} {'baseline ms':>12} {'current ms':>11} {'change':>8} {'limit':>7}")
+    for name, current in sorted(results.items()):
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"{name:<36} {'-':>12} {current['median_ms']:>11.2f} {'new':>8}")
+            continue
+        limit = float(overrides.get(name, threshold))
+        change = current["median_ms"] / previous["median_ms"] - 1 if previous["median_ms"] else 0.0
+        regressed = change > limit and current["median_ms"] - previous["median_ms"] > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<36} {previous['median_ms']:>12.2f} {current['median_ms']:>11.2f} "
+            f"{change:>+8.0%} {limit:>7.0%}{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def targets(args: argparse.Namespace, workdir: Path) -> Iterator[tuple[str, list[str], str, Path]]:
+    """Yield ``(label, formula names, details target, brew directory)`` for each Homebrew to time."""
+    if args.fixtures is not None:
+        store = FixtureStore(args.fixtures)
+        listed = store.load(["list", "--formula"])
+        target = next(
+            (
+                fixture.argv[2]
+                for fixture in store
+                if len(fixture.argv) == 3 and fixture.argv[:2] == ["info", "--json=v2"] and fixture.exit_code == 0
+            ),
+            None,
+        )
+        if listed is None or target is None:
+            raise SystemExit(f"{args.fixtures} needs recordings of `brew list --formula` and `brew info --json=v2 <name>`")
+        policy = ReplayPolicy(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=0)
+        write_replay_executable(workdir / "brew-replay", args.fixtures, policy)
+        yield "replay", listed.stdout.split(), target, workdir / "brew-replay"
+        return
+
+    for packages in args.packages:
+        fake_dir = workdir / f"brew-{packages}"
+        write_fake_brew(fake_dir, packages, args.latency_ms, args.description_bytes)
+        names = [f"formula-{index:05d}" for index in range(packages - packages // 4)]
+        yield str(packages), names, names[len(names) // 2], fake_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packages", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--fixtures", type=Path, help="Replay recorded brew fixtures instead of the fake brew.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Sleep per fake brew call.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Latency jitter when replaying fixtures.")
+    parser.add_argument("--description-bytes", type=int, default=80, help="Description size per package.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=Path("bench-results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed median slowdown, e.g. 0.25 = 25%%.")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this.")
+    parser.add_argument("--no-gui", action="store_true", help="Skip the cases that need Tk.")
+    parser.add_argument("--xvfb", action="store_true", help="Start Xvfb for the Tk cases when no display is set.")
+    args = parser.parse_args()
+
+    xvfb = start_xvfb() if args.xvfb and not args.no_gui else None
+    results: dict[str, dict[str, float]] = {}
+    skipped: dict[str, str] = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="brew-gui-bench-") as temp:
+            workdir = Path(temp)
+            # Keep the app's caches, catalog and traces out of the real home directory.
+            os.environ["XDG_CACHE_HOME"] = str(workdir / "cache")
+            os.environ["HOMEBREW_CACHE"] = str(workdir / "homebrew-cache")
+            for label, names, target, install in targets(args, workdir):
+                original_path = os.environ["PATH"]
+                install_on_path(install)
+                try:
+                    for name, case in service_cases(names, target).items():
+                        results[f"{name}@{label}"] = timed(case, args.repeat)
+                        print(f"{name}@{label:<6} {results[f'{name}@{label}']['median_ms']:>10.2f} ms")
+                    if args.no_gui:
+                        skipped[f"gui.*@{label}"] = "--no-gui"
+                    else:
+                        try:
+                            gui_workdir = workdir / f"gui-{label}"
+                            gui_workdir.mkdir()
+                            for name, stats in gui_results(len(names), args.repeat, gui_workdir).items():
+                                results[f"{name}@{label}"] = stats
+                                print(f"{name}@{label:<6} {stats['median_ms']:>10.2f} ms")
+                        except RuntimeError as exc:
+                            skipped[f"gui.*@{label}"] = str(exc)
+                            print(f"gui.*@{label}: skipped, {exc}")
+                finally:
+                    os.environ["PATH"] = original_path
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    document = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "packages": args.packages,
+            "fixtures": str(args.fixtures) if args.fixtures else None,
+            "latency_ms": args.latency_ms,
+            "description_bytes": args.description_bytes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+    args.output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    print(f"\nWrote {args.output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the old 120 ms polling loop with the self-pipe wakeup.
+
+Runs headless on a bare Tcl interpreter, which has the same event loop as
+Tk. It reports two things. The first is the delay between a task
+finishing on a worker thread and its event being handled on the loop
+thread. The second is how often the loop thread wakes up while nothing is
+running.
+
+    PYTHONPATH=src python benchmarks/wakeup_latency.py
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+import tkinter as tk
+
+from brew_gui_manager.task_runner import BackgroundTaskRunner
+from brew_gui_manager.tk_wakeup import TkWakeup
+
+
+POLL_INTERVAL_MS = 120
+
+
+class Harness:
+    def __init__(self, mode: str) -> None:
+        self.interp = tk.Tcl()
+        self.mode = mode
+        self.wakeups = 0
+        self.latencies: list[float] = []
+        self.wakeup = TkWakeup(self.interp, self._process) if mode == "pipe" else None
+        if self.wakeup is not None and self.wakeup.mode != "pipe":
+            raise SystemExit("Tk file handlers are not available here; cannot measure the pipe mode.")
+        self.runner = BackgroundTaskRunner(notifier=self.wakeup.notify if self.wakeup else None)
+        if mode == "poll":
+            self.interp.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self) -> None:
+        # The pre-wakeup app rescheduled itself forever, busy or not.
+        self._process()
+        self.interp.after(POLL_INTERVAL_MS, self._poll)
+
+    def _process(self) -> None:
+        self.wakeups += 1
+        now = time.perf_counter()
+        for event in self.runner.drain_events():
+            if event.status == "completed":
+                self.latencies.append(now - event.payload)
+
+    def run_for(self, seconds: float) -> None:
+        done = []
+        self.interp.after(int(seconds * 1000), lambda: done.append(True))
+        while not done:
+            self.interp.tk.dooneevent(0)
+
+    def close(self) -> None:
+        if self.wakeup is not None:
+            self.wakeup.close()
+
+
+def finished_after(delay: float) -> float:
+    time.sleep(delay)
+    return time.perf_counter()
+
+
+def measure(mode: str, tasks: int, idle_seconds: float) -> tuple[list[float], float]:
+    harness = Harness(mode)
+    rng = random.Random(7)
+    for _index in range(tasks):
+        harness.runner.submit("task", lambda delay=rng.uniform(0.0, 0.05): finished_after(delay))
+        harness.run_for(0.08)
+    harness.run_for(0.3)
+    latencies = list(harness.latencies)
+
+    harness.wakeups = 0
+    harness.run_for(idle_seconds)
+    idle_rate = harness.wakeups / idle_seconds
+    harness.close()
+    return latencies, idle_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'idle wakeups/s':>15}")
+    for mode in ("poll", "pipe"):
+        latencies, idle_rate = measure(mode, args.tasks, args.idle_seconds)
+        ordered = sorted(latencies)
+        p95 = ordered[int(len(ordered) * 0.95) - 1]
+        print(
+            f"{mode:<6} {statistics.median(ordered) * 1000:>10.2f} {p95 * 1000:>8.2f} "
+            f"{ordered[-1] * 1000:>8.2f} {idle_rate:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
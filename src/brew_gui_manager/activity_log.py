@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, dataclass
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Final, Iterator
+
+
+@dataclass(slots=True)
+class LogEntry:
+    seq: int
+    timestamp: float
+    text: str
+    kind: str = "message"
+
+    def render(self) -> str:
+        """Widget text: messages are separated by a blank line, streamed output is not."""
+        return f"{self.text}\n\n" if self.kind == "message" else f"{self.text}\n"
+
+
+class _BoundedReader(io.RawIOBase):
+    """Reads at most ``limit`` bytes of ``stream`` without buffering them."""
+
+    def __init__(self, stream: io.BufferedReader, limit: int) -> None:
+        self._stream = stream
+        self._remaining = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        data = self._stream.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class ActivityLog:
+    """Fixed-size ring of recent log entries backed by a gzip spill file.
+
+    Entries pushed out of the ring are buffered and appended to the spill
+    file as a new gzip member every ``spill_batch`` entries. ``search`` and
+    ``around`` read the file, so old entries can be found without anyone
+    keeping them in memory. Each session starts a fresh file; the previous
+    session's file is kept next to it with a ``.1`` suffix.
+
+    ``append`` is meant for the Tk thread; ``search`` and ``around`` may run
+    in a worker thread.
+    """
+
+    SPILL_BATCH: Final[int] = 200
+
+    def __init__(self, path: Path | None = None, capacity: int = 2000, spill_batch: int = SPILL_BATCH) -> None:
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.spill_batch = max(1, spill_batch)
+        self._lock = threading.Lock()
+        self._entries: deque[LogEntry] = deque()
+        self._spill: list[LogEntry] = []
+        self._spilled_bytes = 0
+        self._next_seq = 1
+        if path is not None:
+            self._rotate(path)
+
+    @staticmethod
+    def default_path() -> Path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return Path(base) / "brew-gui-manager" / "activity.log.gz"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, text: str, kind: str = "message") -> LogEntry:
+        with self._lock:
+            entry = LogEntry(self._next_seq, time.time(), text, kind)
+            self._next_seq += 1
+            self._entries.append(entry)
+            if len(self._entries) > self.capacity:
+                self._spill.append(self._entries.popleft())
+                if len(self._spill) >= self.spill_batch:
+                    self._write_spill()
+            return entry
+
+    def recent(self, count: int) -> list[LogEntry]:
+        with self._lock:
+            return list(self._entries)[-count:] if count > 0 else []
+
+    def search(self, term: str, limit: int = 50) -> list[LogEntry]:
+        """Entries containing ``term`` (case-insensitive), newest first, from disk and memory."""
+        needle = term.strip().lower()
+        if not needle:
+            return []
+        matches: deque[LogEntry] = deque(maxlen=limit)
+        for entry in self._all_entries():
+            if needle in entry.text.lower():
+                matches.append(entry)
+        return list(reversed(matches))
+
+    def around(self, seq: int, radius: int = 20) -> list[LogEntry]:
+        """The entry ``seq`` with up to ``radius`` entries on each side, oldest first."""
+        low, high = seq - radius, seq + radius
+        context: list[LogEntry] = []
+        for entry in self._all_entries():
+            if entry.seq > high:
+                break
+            if entry.seq >= low:
+                context.append(entry)
+        return context
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_spill()
+
+    def close(self) -> None:
+        self.flush()
+
+    def _all_entries(self) -> Iterator[LogEntry]:
+        with self._lock:
+            pending = list(self._spill)
+            recent = list(self._entries)
+            size = self._spilled_bytes
+        yield from self._read_spilled(size)
+        yield from pending
+        yield from recent
+
+    def _read_spilled(self, size: int) -> Iterator[LogEntry]:
+        if self.path is None or size == 0:
+            return
+        try:
+            # Only complete members: a batch may be being appended right now.
+            with self.path.open("rb") as stream, gzip.GzipFile(fileobj=_BoundedReader(stream, size)) as archive:
+                for line in io.TextIOWrapper(archive, encoding="utf-8"):
+                    try:
+                        yield LogEntry(**json.loads(line))
+                    except (TypeError, ValueError):
+                        continue
+        except (OSError, EOFError):
+            return
+
+    def _write_spill(self) -> None:
+        if not self._spill:
+            return
+        spill, self._spill = self._spill, []
+        if self.path is None:
+            return
+        payload = "".join(json.dumps(asdict(entry), separators=(",", ":")) + "\n" for entry in spill)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as stream:
+                stream.write(gzip.compress(payload.encode("utf-8")))
+                self._spilled_bytes = stream.tell()
+        except OSError:
+            # Losing old activity is better than failing the UI thread.
+            pass
+
+    @staticmethod
+    def _rotate(path: Path) -> None:
+        try:
+            if path.exists():
+                os.replace(path, path.with_name(f"{path.stem}.1{path.suffix}"))
+        except OSError:
+            pass
@@ -1,19 +1,71 @@
 from __future__ import annotations
 
+from collections import deque
+from pathlib import Path
+import time
 import tkinter as tk
+from tkinter import filedialog
 from tkinter import messagebox
 from tkinter import ttk
 from typing import Callable
 
-from .brew_service import BrewCommandResult, BrewService, BrewSnapshot, PackageDetails
+from .activity_log import ActivityLog, LogEntry
+from .brew_service import (
+    BrewCommandResult,
+    BrewService,
+    BrewSnapshot,
+    PackageDetails,
+    SnapshotDelta,
+    package_key,
+)
+from .catalog_index import CatalogIndex
+from .command_trace import CommandTrace
+from .dependency_graph import DependencyGraph
+from .diagnostics import Diagnostics
+from .filter_index import FilterIndex
+from .render_scheduler import RenderScheduler
+from .search import SearchEngine
+from .shelf import VirtualShelf
+from .snapshot_cache import SnapshotCache
 from .task_runner import BackgroundTaskRunner, TaskEvent
+from .tk_wakeup import TkWakeup
 from .ui_state import PackageSelection
+from .upgrade_queue import UpgradeQueue
 
 
 class BrewManagerApp:
-    def __init__(self, root: tk.Tk, service: BrewService | None = None) -> None:
+    RECONCILE_DELAY_MS = 4000
+    PREFETCH_DELAY_MS = 300
+    PREFETCH_NEIGHBOURS = 3
+    FILTER_DEBOUNCE_MS = 150
+    DISCOVER_LIMIT = 200
+    AUTOCOMPLETE_LIMIT = 12
+    UPGRADE_FLUSH_DELAY_MS = 800
+    QUERY_TIMEOUT_S = 120.0
+    QUEUE_WAIT_REPORT_S = 1.0
+    POLL_INTERVAL_MS = 120
+    LOG_WINDOW_ENTRIES = 400
+    LOG_CONTEXT_RADIUS = 20
+    DIAGNOSTICS_REFRESH_MS = 1000
+    ALLOCATION_SAMPLE_MS = 10000
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        service: BrewService | None = None,
+        cache: SnapshotCache | None = None,
+        catalog: CatalogIndex | None = None,
+        activity: ActivityLog | None = None,
+    ) -> None:
         self.root = root
-        self.service = service or BrewService()
+        self.service = service or BrewService(snapshot_mode="json", tracer=CommandTrace(CommandTrace.default_path()))
+        self.cache = cache or SnapshotCache()
+        self.catalog = catalog or CatalogIndex(
+            CatalogIndex.default_db_path(),
+            Path(self.service.homebrew_cache_dir()) / "api",
+        )
+        self._search_engine: SearchEngine | None = None
+        self.activity = activity or ActivityLog(ActivityLog.default_path())
         self.root.title("Brew GUI Manager")
         self.root.geometry("1380x860")
         self.root.minsize(1180, 720)
@@ -25,6 +77,7 @@ class BrewManagerApp:
         self.status_var = tk.StringVar(value="Connecting to Homebrew...")
         self.error_var = tk.StringVar(value="")
         self.filter_var = tk.StringVar(value="")
+        self.log_search_var = tk.StringVar(value="")
         self.install_name_var = tk.StringVar(value="")
         self.install_kind_var = tk.StringVar(value="formula")
         self.selection_var = tk.StringVar(value="Choose a package to see details.")
@@ -35,22 +88,60 @@ class BrewManagerApp:
         self.hero_var = tk.StringVar(value="Your Homebrew apps, curated like a storefront.")
         self.category_var = tk.StringVar(value="all")
         self.activity_var = tk.StringVar(value="Idle")
+        self.freshness_var = tk.StringVar(value="")
 
         self._all_formulae: list[str] = []
         self._all_casks: list[str] = []
         self._outdated_formulae: list[str] = []
         self._outdated_casks: list[str] = []
+        self._snapshot: BrewSnapshot | None = None
+        self._graph = DependencyGraph()
+        self._snapshot_stale = False
+        self._reconcile_after_id: str | None = None
         self._selected_package: PackageSelection | None = None
-        self._task_runner = BackgroundTaskRunner()
+        self._render = RenderScheduler(root)
+        self._pending_filter_kinds: set[str] | None = set()
+        self._filter_indexes: dict[str, FilterIndex] = {}
+        self._filter_after_id: str | None = None
+        self._wakeup = TkWakeup(root, self._process_task_events)
+        self._task_runner = BackgroundTaskRunner(notifier=self._wakeup.notify)
+        self.diagnostics = Diagnostics(self._task_runner, self.service, self._render, self.cache)
+        self._diagnostics_window: tk.Toplevel | None = None
+        self._diagnostics_text: tk.Text | None = None
+        self._diagnostics_after_id: str | None = None
+        self._allocations_after_id: str | None = None
+        self._poll_after_id: str | None = None
         self._task_handlers: dict[int, tuple[Callable[[object], None] | None, Callable[[Exception], None] | None]] = {}
         self._active_tasks: set[int] = set()
+        self._quiet_tasks: set[int] = set()
+        self._pending_output: list[LogEntry] = []
+        self._log_line_counts: deque[int] = deque()
+        self._log_live = True
+        self._log_matches: list[LogEntry] = []
+        self._log_match_term = ""
+        self._log_match_index = 0
+        self._prefetch_generation = 0
+        self._prefetch_after_id: str | None = None
+        self._rendered_generations: dict[str, int] = {}
+        self._upgrade_queue = UpgradeQueue()
+        self._upgrade_after_id: str | None = None
         self._action_buttons: list[ttk.Button] = []
 
         self._configure_styles()
         self._build_layout()
-        self.filter_var.trace_add("write", lambda *_: self._apply_filter())
+        self.filter_var.trace_add("write", lambda *_: self._debounce_filter())
+        self._paint_cached_snapshot()
         self.root.after(50, self.refresh)
-        self.root.after(120, self._poll_task_events)
+        self.root.after(200, self._refresh_catalog)
+
+    def close(self) -> None:
+        self._wakeup.close()
+        self.catalog.close()
+        self.activity.close()
+        self.cache.flush()
+        self.diagnostics.stop_allocation_tracking()
+        if self.service.tracer is not None:
+            self.service.tracer.close()
 
     def _configure_styles(self) -> None:
         style = ttk.Style()
@@ -183,6 +274,27 @@ class BrewManagerApp:
             textvariable=self.activity_var,
             style="Muted.TLabel",
         ).grid(row=0, column=1, sticky="e")
+        self.cancel_button = ttk.Button(
+            header,
+            text="Cancel",
+            style="Secondary.TButton",
+            command=self._cancel_active_tasks,
+            state=tk.DISABLED,
+        )
+        self.cancel_button.grid(row=0, column=2, sticky="e", padx=(10, 0))
+        ttk.Button(
+            header,
+            text="Diagnostics",
+            style="Secondary.TButton",
+            command=self._open_diagnostics,
+        ).grid(row=0, column=3, sticky="e", padx=(10, 0))
+        ttk.Label(
+            header,
+            textvariable=self.freshness_var,
+            background="#f4f6fb",
+            foreground="#b45309",
+            font=("SF Pro Text", 11, "bold"),
+        ).grid(row=1, column=1, sticky="e", pady=(4, 0))
 
         self._build_hero(content)
         self._build_storefront(content)
@@ -201,6 +313,8 @@ class BrewManagerApp:
             ("Formulae", "formula"),
             ("Casks", "cask"),
             ("Updates", "outdated"),
+            ("Orphans", "orphans"),
+            ("Discover", "discover"),
         ]
         for label, value in nav_items:
             ttk.Button(
@@ -219,8 +333,9 @@ class BrewManagerApp:
             style="Muted.TLabel",
             wraplength=170,
         ).pack(anchor="w", pady=(4, 12))
-        install_entry = ttk.Entry(install_card, textvariable=self.install_name_var)
+        install_entry = ttk.Combobox(install_card, textvariable=self.install_name_var)
         install_entry.pack(fill=tk.X)
+        install_entry.bind("<KeyRelease>", lambda _event: self._autocomplete_install(install_entry))
         kind_box = ttk.Combobox(
             install_card,
             textvariable=self.install_kind_var,
@@ -344,8 +459,8 @@ class BrewManagerApp:
             style="Title.TLabel",
         ).grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 10))
 
-        self.formulae_list = self._build_shelf(shelves, "Formulae", 1, 0, "formula")
-        self.casks_list = self._build_shelf(shelves, "Casks", 1, 1, "cask")
+        self.formulae_shelf = self._build_shelf(shelves, "Formulae", 1, 0, "formula")
+        self.casks_shelf = self._build_shelf(shelves, "Casks", 1, 1, "cask")
 
         details = ttk.Frame(storefront, style="Card.TFrame", padding=20)
         details.grid(row=0, column=1, sticky="nsew")
@@ -396,8 +511,8 @@ class BrewManagerApp:
             style="Secondary.TButton",
             command=self._upgrade_selected,
         )
+        # Stays enabled while busy so upgrades can be queued behind a running batch.
         upgrade_selected_button.grid(row=0, column=1, padx=(10, 0))
-        self._register_action_button(upgrade_selected_button)
         uninstall_button = ttk.Button(
             actions,
             text="Uninstall",
@@ -414,6 +529,14 @@ class BrewManagerApp:
         )
         cleanup_button.grid(row=0, column=3, padx=(10, 0))
         self._register_action_button(cleanup_button)
+        raw_info_button = ttk.Button(
+            actions,
+            text="Raw Info",
+            style="Secondary.TButton",
+            command=self._show_raw_info,
+        )
+        raw_info_button.grid(row=0, column=4, padx=(10, 0))
+        self._register_action_button(raw_info_button)
 
         ttk.Label(details, text="About This Package", style="Section.TLabel").grid(
             row=5,
@@ -438,11 +561,22 @@ class BrewManagerApp:
             "Select an app from the charts to load its Homebrew detail page.",
         )
 
-        ttk.Label(details, text="Recent Activity", style="Section.TLabel").grid(
-            row=7,
-            column=0,
-            sticky="w",
-            pady=(16, 10),
+        log_header = ttk.Frame(details, style="Card.TFrame")
+        log_header.grid(row=7, column=0, sticky="ew", pady=(16, 10))
+        log_header.columnconfigure(0, weight=1)
+        ttk.Label(log_header, text="Recent Activity", style="Section.TLabel").grid(row=0, column=0, sticky="w")
+        log_search = ttk.Entry(log_header, textvariable=self.log_search_var, width=22)
+        log_search.grid(row=0, column=1, padx=(10, 0))
+        log_search.bind("<Return>", lambda _event: self._find_in_log())
+        ttk.Button(log_header, text="Find", style="Secondary.TButton", command=self._find_in_log).grid(
+            row=0,
+            column=2,
+            padx=(10, 0),
+        )
+        ttk.Button(log_header, text="Live", style="Secondary.TButton", command=self._show_live_log).grid(
+            row=0,
+            column=3,
+            padx=(10, 0),
         )
         self.log_text = tk.Text(
             details,
@@ -455,6 +589,7 @@ class BrewManagerApp:
             padx=16,
             pady=16,
         )
+        self.log_text.tag_configure("match", background="#854d0e")
         self.log_text.grid(row=8, column=0, sticky="nsew")
         self._append_log("Storefront ready. Refresh to sync with Homebrew.")
 
@@ -465,7 +600,7 @@ class BrewManagerApp:
         row: int,
         column: int,
         package_kind: str,
-    ) -> tk.Listbox:
+    ) -> VirtualShelf:
         card = ttk.Frame(parent, style="Card.TFrame", padding=16)
         card.grid(row=row, column=column, sticky="nsew", padx=(0 if column == 0 else 10, 0))
         card.columnconfigure(0, weight=1)
@@ -478,13 +613,10 @@ class BrewManagerApp:
             style="Muted.TLabel",
         ).grid(row=1, column=0, sticky="w", pady=(4, 10))
 
-        frame = tk.Frame(card, bg="#ffffff")
-        frame.grid(row=2, column=0, sticky="nsew")
-        frame.grid_columnconfigure(0, weight=1)
-        frame.grid_rowconfigure(0, weight=1)
-
-        listbox = tk.Listbox(
-            frame,
+        shelf = VirtualShelf(
+            card,
+            on_select=lambda name: self._handle_selection(name, package_kind),
+            on_scroll=self._schedule_prefetch,
             activestyle="none",
             relief=tk.FLAT,
             bg="#ffffff",
@@ -495,108 +627,337 @@ class BrewManagerApp:
             highlightthickness=0,
             bd=0,
         )
-        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=listbox.yview)
-        listbox.configure(yscrollcommand=scrollbar.set)
-        listbox.bind("<<ListboxSelect>>", lambda _event: self._handle_selection(listbox, package_kind))
-        listbox.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
-        return listbox
+        shelf.grid(row=2, column=0, sticky="nsew")
+        return shelf
+
+    def _schedule_prefetch(self) -> None:
+        """Restart the prefetch debounce; any running prefetch becomes stale."""
+        self._prefetch_generation += 1
+        if self._prefetch_after_id is not None:
+            self.root.after_cancel(self._prefetch_after_id)
+        self._prefetch_after_id = self.root.after(self.PREFETCH_DELAY_MS, self._run_prefetch)
+
+    def _run_prefetch(self) -> None:
+        self._prefetch_after_id = None
+        packages = self._prefetch_candidates()
+        if not packages:
+            return
+
+        generation = self._prefetch_generation
+        self._submit_task(
+            description="Prefetching package details",
+            fn=lambda: self.service.prefetch_details(
+                packages,
+                should_continue=lambda: generation == self._prefetch_generation,
+            ),
+            quiet=True,
+            lane="background",
+            key="prefetch",
+        )
 
-    def refresh(self) -> None:
+    def _prefetch_candidates(self) -> list[tuple[str, str]]:
+        """Visible shelf rows first, then the neighbours of the selection."""
+        candidates: list[tuple[str, str]] = []
+        for shelf, package_kind in ((self.formulae_shelf, "formula"), (self.casks_shelf, "cask")):
+            candidates.extend((package_kind, name) for name in shelf.model.visible_names())
+            candidates.extend(
+                (package_kind, name) for name in shelf.model.neighbours(self.PREFETCH_NEIGHBOURS)
+            )
+        return candidates
+
+    def refresh(self, join: bool = True) -> None:
+        """Collect a new snapshot; ``join`` reuses one that is already being collected."""
+        if self._reconcile_after_id is not None:
+            self.root.after_cancel(self._reconcile_after_id)
+            self._reconcile_after_id = None
         self._submit_task(
             description="Refreshing storefront",
-            fn=self.service.collect_snapshot,
+            fn=self._collect_and_cache_snapshot,
             on_success=lambda payload: self._render_snapshot(payload),
+            on_error=self._handle_refresh_error,
+            timeout=self.QUERY_TIMEOUT_S,
+            key="snapshot",
+            join=join,
         )
 
-    def _render_snapshot(self, snapshot: BrewSnapshot) -> None:
+    def _collect_and_cache_snapshot(self) -> BrewSnapshot:
+        snapshot = self.service.collect_snapshot()
+        self.cache.store_snapshot(snapshot, self.service.homebrew_prefix(), self.service.homebrew_revision())
+        return snapshot
+
+    def _paint_cached_snapshot(self) -> None:
+        cached = self.cache.load(self.service.homebrew_prefix(), self.service.homebrew_revision())
+        if cached is None:
+            return
+
+        saved_at = time.strftime("%b %d %H:%M", time.localtime(cached.saved_at))
+        self._render_snapshot(cached.snapshot, stale=True)
+        self._render.set(self.freshness_var, f"Cached library from {saved_at} • refreshing...")
+        self._append_log(f"Showing cached library from {saved_at} until Homebrew responds.")
+
+    def _handle_refresh_error(self, error: Exception) -> None:
+        self._render.set(self.error_var, str(error))
+        self._append_log(f"ERROR: Refreshing storefront failed: {error}")
+        if self._snapshot_stale:
+            self._render.set(self.freshness_var, "Cached library • refresh failed, data may be out of date")
+
+    def _render_snapshot(self, snapshot: BrewSnapshot, stale: bool = False) -> None:
+        self._snapshot_stale = stale
+        if not stale:
+            self._render.set(self.freshness_var, "")
         if snapshot.available:
-            self.status_var.set(snapshot.version)
-            self.summary_var.set(f"Formulae {len(snapshot.formulae)}  •  Casks {len(snapshot.casks)}")
-            update_count = len(snapshot.outdated_formulae) + len(snapshot.outdated_casks)
-            self.badge_var.set(f"{update_count} package updates waiting")
-            if update_count:
-                self.hero_var.set(
-                    "Updates are ready. Open a package page, inspect details, or upgrade the whole library."
-                )
-            else:
-                self.hero_var.set("Your Homebrew library is up to date and ready to browse.")
+            self._render.set(self.status_var, snapshot.version)
+            self._render_summary(snapshot)
         else:
-            self.status_var.set("Homebrew unavailable")
-            self.summary_var.set("Formulae 0  •  Casks 0")
-            self.badge_var.set("Install Homebrew to unlock the catalog")
-            self.hero_var.set("Homebrew is missing from PATH, so the storefront cannot load your library yet.")
-
-        self.error_var.set(snapshot.error)
+            self._render.set(self.status_var, "Homebrew unavailable")
+            self._render.set(self.summary_var, "Formulae 0  •  Casks 0")
+            self._render.set(self.badge_var, "Install Homebrew to unlock the catalog")
+            self._render.set(
+                self.hero_var,
+                "Homebrew is missing from PATH, so the storefront cannot load your library yet.",
+            )
+
+        self._render.set(self.error_var, snapshot.error)
+        self._snapshot = snapshot
+        self._graph = DependencyGraph.from_details(snapshot.details.values())
+        if snapshot.timings and not stale:
+            slowest, slowest_time = max(snapshot.timings.items(), key=lambda item: item[1])
+            self._append_log(
+                f"Snapshot took {snapshot.elapsed:.2f}s across {len(snapshot.timings)} commands "
+                f"(sum {sum(snapshot.timings.values()):.2f}s, slowest `{slowest}` {slowest_time:.2f}s)."
+            )
         self._all_formulae = snapshot.formulae
         self._all_casks = snapshot.casks
         self._outdated_formulae = snapshot.outdated_formulae
         self._outdated_casks = snapshot.outdated_casks
-        self._apply_filter()
+        self._schedule_filter()
 
-    def _apply_filter(self) -> None:
-        keyword = self.filter_var.get().strip().lower()
-        category = self.category_var.get()
+    def _render_summary(self, snapshot: BrewSnapshot) -> None:
+        self._render.set(
+            self.summary_var,
+            f"Formulae {len(snapshot.formulae)}  •  Casks {len(snapshot.casks)}",
+        )
+        update_count = len(snapshot.outdated_formulae) + len(snapshot.outdated_casks)
+        self._render.set(self.badge_var, f"{update_count} package updates waiting")
+        if update_count:
+            self._render.set(
+                self.hero_var,
+                "Updates are ready. Open a package page, inspect details, or upgrade the whole library.",
+            )
+        else:
+            self._render.set(self.hero_var, "Your Homebrew library is up to date and ready to browse.")
 
-        formulae_source = self._outdated_formulae if category == "outdated" else self._all_formulae
-        casks_source = self._outdated_casks if category == "outdated" else self._all_casks
+    def _refresh_catalog(self) -> None:
+        self._submit_task(
+            description="Indexing Homebrew catalog",
+            fn=self._index_catalog,
+            on_success=self._handle_catalog_refreshed,
+            quiet=True,
+            lane="background",
+            key="catalog",
+            join=True,
+        )
 
-        formulae = self._filter_items(formulae_source, keyword)
-        casks = self._filter_items(casks_source, keyword)
+    def _index_catalog(self) -> tuple[dict[str, int], SearchEngine | None]:
+        """Refresh the SQLite catalog, then rebuild the ranked search index if anything changed."""
+        rebuilt = self.catalog.refresh()
+        if not rebuilt and self._search_engine is not None:
+            return rebuilt, None
+        return rebuilt, SearchEngine(self.catalog.entries())
+
+    def _handle_catalog_refreshed(self, payload: object) -> None:
+        rebuilt, engine = payload if isinstance(payload, tuple) else ({}, None)
+        if isinstance(engine, SearchEngine):
+            self._search_engine = engine
+        if isinstance(rebuilt, dict) and rebuilt:
+            counts = ", ".join(f"{count} {kind} entries" for kind, count in rebuilt.items())
+            self._append_log(f"Catalog index updated: {counts}.")
+        if self.category_var.get() == "discover":
+            self._schedule_filter()
+
+    def _autocomplete_install(self, entry: ttk.Combobox) -> None:
+        entry.configure(values=self.catalog.complete(self.install_name_var.get(), limit=self.AUTOCOMPLETE_LIMIT))
+
+    def _debounce_filter(self) -> None:
+        """Restart the keystroke debounce; the shelves update once typing pauses."""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.root.after(self.FILTER_DEBOUNCE_MS, self._run_debounced_filter)
+
+    def _run_debounced_filter(self) -> None:
+        self._filter_after_id = None
+        self._schedule_filter()
+
+    def _schedule_filter(self, kinds: set[str] | None = None) -> None:
+        """Rebuild the shelves once in the next render pass; ``None`` means both kinds."""
+        if kinds is None or self._pending_filter_kinds is None:
+            self._pending_filter_kinds = None
+        else:
+            self._pending_filter_kinds |= kinds
+        self._render.request("shelf", self._run_scheduled_filter)
+
+    def _run_scheduled_filter(self) -> None:
+        kinds, self._pending_filter_kinds = self._pending_filter_kinds, set()
+        self._apply_filter(kinds)
+
+    def _apply_filter(self, kinds: set[str] | None = None) -> None:
+        keyword = self.filter_var.get().strip().lower()
+        category = self.category_var.get()
+        if self._filter_after_id is not None:
+            # Already applying the current text; the pending debounce is redundant.
+            self.root.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+        if category == "discover":
+            # Ranked in-memory search once it is built; FTS until then. Shelves keep the rank order.
+            if not keyword:
+                results = []
+            elif self._search_engine is not None and len(self._search_engine):
+                results = [hit.entry for hit in self._search_engine.search(keyword, limit=self.DISCOVER_LIMIT)]
+            else:
+                results = self.catalog.search(keyword, limit=self.DISCOVER_LIMIT)
+            self.formulae_shelf.set_items([entry.name for entry in results if entry.kind == "formula"])
+            self.casks_shelf.set_items([entry.name for entry in results if entry.kind == "cask"])
+            return
 
-        if category == "formula":
-            casks = []
-        elif category == "cask":
-            formulae = []
+        if category == "orphans":
+            self.formulae_shelf.set_items(self._filter_partition("orphans", self._graph.orphans(), keyword))
+            self.casks_shelf.set_items([])
+            return
 
-        self._replace_listbox(self.formulae_list, formulae)
-        self._replace_listbox(self.casks_list, casks)
+        outdated = category == "outdated"
+        formulae: list[str] = []
+        casks: list[str] = []
+        if category != "cask":
+            formulae = self._filter_partition(
+                "outdated:formula" if outdated else "formula",
+                self._outdated_formulae if outdated else self._all_formulae,
+                keyword,
+            )
+        if category != "formula":
+            casks = self._filter_partition(
+                "outdated:cask" if outdated else "cask",
+                self._outdated_casks if outdated else self._all_casks,
+                keyword,
+            )
+
+        if kinds is None or "formula" in kinds:
+            self.formulae_shelf.set_items(formulae)
+        if kinds is None or "cask" in kinds:
+            self.casks_shelf.set_items(casks)
 
     def _set_category(self, category: str) -> None:
         self.category_var.set(category)
         self._append_log(f"Browsing category: {category}")
-        self._apply_filter()
-
-    @staticmethod
-    def _filter_items(items: list[str], keyword: str) -> list[str]:
-        if not keyword:
-            return items
-        return [item for item in items if keyword in item.lower()]
-
-    @staticmethod
-    def _replace_listbox(listbox: tk.Listbox, items: list[str]) -> None:
-        listbox.delete(0, tk.END)
-        for index, item in enumerate(items, start=1):
-            listbox.insert(tk.END, f"{index:02d}   {item}")
-
-    def _handle_selection(self, listbox: tk.Listbox, package_kind: str) -> None:
-        selection = listbox.curselection()
-        if not selection:
+        if category == "discover":
+            self._append_log("Type in the search box to discover packages from the full Homebrew catalog.")
+        elif category == "orphans" and not len(self._graph):
+            if self.service.inventory_backend == "filesystem" and self._all_formulae:
+                formulae = list(self._all_formulae)
+                self._submit_task(
+                    description="Reading install receipts",
+                    fn=lambda: self.service.receipt_details(formulae),
+                    on_success=self._handle_receipt_details,
+                    quiet=True,
+                    lane="background",
+                    key="receipts",
+                    join=True,
+                )
+            else:
+                self._append_log("Orphans need dependency data from the JSON snapshot; none is loaded yet.")
+        self._schedule_filter()
+
+    def _handle_receipt_details(self, payload: object) -> None:
+        if not len(self._graph):
+            self._graph = DependencyGraph.from_details(payload)
+            self._schedule_filter()
+
+    def _filter_partition(self, partition: str, items: list[str], keyword: str) -> list[str]:
+        """Filter one shelf source through its cached index, rebuilding it only when the source changed."""
+        index = self._filter_indexes.get(partition)
+        if index is None or not index.matches(items):
+            index = self._filter_indexes[partition] = FilterIndex(items)
+        return index.search(keyword)
+
+    def _handle_selection(self, name: str, package_kind: str) -> None:
+        other = self.casks_shelf if package_kind == "formula" else self.formulae_shelf
+        other.clear_selection()
+        self._selected_package = PackageSelection(name=name, kind=package_kind)
+        self._schedule_prefetch()
+        if self.category_var.get() == "discover":
+            self.install_name_var.set(name)
+            self.install_kind_var.set(package_kind)
+        cached = self._cached_details(name, package_kind)
+        if cached is not None:
+            self._render_package_details(self._selected_package, cached)
             return
 
-        raw_item = listbox.get(selection[0])
-        name = raw_item.split(maxsplit=1)[1] if " " in raw_item else raw_item
-        self._selected_package = PackageSelection(name=name, kind=package_kind)
         self.selection_var.set(f"{name}  •  {package_kind}")
         self.package_blurb_var.set("Open Details to load the package overview from Homebrew.")
-        self.package_meta_var.set("Latest version: -    Installed: -")
+        installed = self._snapshot.installed_versions.get(package_key(name, package_kind)) if self._snapshot else None
+        self.package_meta_var.set(f"Latest version: -    Installed: {', '.join(installed) if installed else '-'}")
         self._set_text(
             self.details_text,
             f"{name}\n\nOpen Details to load the package overview from Homebrew.",
         )
 
+    def _cached_details(self, package_name: str, package_kind: str) -> PackageDetails | None:
+        if self._snapshot is not None:
+            details = self._snapshot.details_for(package_name, package_kind)
+            if details is not None:
+                return details
+        return self.service.cached_details(package_name, package_kind)
+
     def _show_selected_details(self) -> None:
         if self._selected_package is None:
             self._append_log("No package selected for details.")
             return
 
         selection = self._selected_package
+        in_memory = self._cached_details(selection.name, selection.kind)
+        if in_memory is not None and not self._snapshot_stale:
+            self._handle_details_loaded(selection, in_memory)
+            return
+
+        cached = in_memory or self.cache.details_for(selection.name, selection.kind)
+        if cached is not None:
+            self._render_package_details(selection, cached)
+            self.package_meta_var.set(f"{self.package_meta_var.get()}    (cached, refreshing...)")
+
         self._submit_task(
             description=f"Loading details for {selection.name}",
-            fn=lambda: self.service.get_package_details(selection.name, selection.kind),
+            fn=lambda: self._load_and_cache_details(selection),
             on_success=lambda payload: self._handle_details_loaded(selection, payload),
+            timeout=self.QUERY_TIMEOUT_S,
+            lane="interactive",
+            key="details",
+        )
+
+    def _show_raw_info(self) -> None:
+        if self._selected_package is None:
+            self._append_log("No package selected for raw info.")
+            return
+
+        selection = self._selected_package
+        self._submit_task(
+            description=f"Loading raw info for {selection.name}",
+            fn=lambda: self.service.get_raw_info(selection.name, selection.kind),
+            on_success=lambda payload: self._handle_raw_info_loaded(selection, payload),
+            timeout=self.QUERY_TIMEOUT_S,
+            lane="interactive",
+            key="raw-info",
         )
 
+    def _handle_raw_info_loaded(self, selection: PackageSelection, raw_text: object) -> None:
+        if selection != self._selected_package:
+            return
+        self.details_text.insert(tk.END, f"\n\nRaw Homebrew Info\n{raw_text}")
+        self.details_text.see(tk.END)
+
+    def _load_and_cache_details(self, selection: PackageSelection) -> PackageDetails:
+        details = self.service.get_package_details(selection.name, selection.kind)
+        self.cache.store_details(details)
+        return details
+
     def _install_package(self) -> None:
         package_name = self.install_name_var.get().strip()
         package_kind = self.install_kind_var.get()
@@ -617,21 +978,74 @@ class BrewManagerApp:
         if self._selected_package is None:
             self._append_log("No package selected for upgrade.")
             return
-        self._run_and_refresh(
-            "upgrade_selected",
-            package_name=self._selected_package.name,
-            package_kind=self._selected_package.kind,
+        selected = self._selected_package
+        if not self._upgrade_queue.add(selected.name, selected.kind):
+            self._append_log(f"{selected.name} is already queued for upgrade.")
+            return
+        self._append_log(f"Queued {selected.name} for upgrade ({len(self._upgrade_queue)} pending).")
+        self._schedule_upgrade_flush()
+
+    def _schedule_upgrade_flush(self) -> None:
+        """Wait briefly so several Upgrade Selected clicks become one brew call."""
+        if self._upgrade_after_id is not None:
+            self.root.after_cancel(self._upgrade_after_id)
+        self._upgrade_after_id = self.root.after(self.UPGRADE_FLUSH_DELAY_MS, self._flush_upgrades)
+
+    def _flush_upgrades(self) -> None:
+        self._upgrade_after_id = None
+        if not len(self._upgrade_queue):
+            return
+        if self._upgrade_queue.busy:
+            self._schedule_upgrade_flush()
+            return
+        batch = self._upgrade_queue.drain()
+        names = ", ".join(name for _kind, name in batch)
+        self._submit_task(
+            description=f"Upgrading {names}",
+            fn=lambda: self.service.upgrade_packages(batch, on_output=self._task_runner.progress_reporter()),
+            on_success=lambda payload: self._handle_upgrade_batch(batch, payload),
+            on_error=lambda error: self._handle_upgrade_batch(batch, error),
+            lane="mutating",
         )
 
+    def _handle_upgrade_batch(self, batch: list[tuple[str, str]], payload: object) -> None:
+        self._upgrade_queue.finish(batch)
+        if isinstance(payload, Exception):
+            self._render.set(self.error_var, str(payload))
+            self._append_log(f"ERROR: Upgrading {len(batch)} package(s) failed: {payload}")
+            return
+        if not isinstance(payload, list):
+            self._render.set(self.error_var, "Unexpected upgrade result received.")
+            self._append_log("ERROR: Unexpected upgrade result received.")
+            return
+
+        upgraded: list[str] = []
+        failed: list[str] = []
+        for result in payload:
+            self._handle_command_result(result)
+            for key, succeeded in result.package_results.items():
+                (upgraded if succeeded else failed).append(key.partition(":")[2])
+            if result.delta is not None and self._snapshot is not None and self._snapshot.available:
+                self._apply_delta(result.delta)
+        summary = f"Upgraded: {', '.join(upgraded) or 'none'}."
+        if failed:
+            summary = f"{summary} Failed: {', '.join(failed)}."
+            self._render.set(self.error_var, f"Upgrade failed for {', '.join(failed)}.")
+        self._append_log(summary)
+        if upgraded:
+            self._schedule_reconcile()
+
     def _uninstall_selected(self) -> None:
         if self._selected_package is None:
             self._append_log("No package selected for uninstall.")
             return
 
-        confirmed = messagebox.askyesno(
-            "Confirm Uninstall",
-            f"Uninstall {self._selected_package.name}?",
-        )
+        prompt = f"Uninstall {self._selected_package.name}?"
+        dependents = self._graph.transitive_dependents(self._selected_package.name, self._selected_package.kind)
+        if dependents:
+            shown = ", ".join(dependents[:10]) + (f" and {len(dependents) - 10} more" if len(dependents) > 10 else "")
+            prompt += f"\n\n{len(dependents)} installed package(s) depend on it: {shown}."
+        confirmed = messagebox.askyesno("Confirm Uninstall", prompt)
         if not confirmed:
             return
 
@@ -658,19 +1072,26 @@ class BrewManagerApp:
                 action,
                 package_name=package_name,
                 package_kind=package_kind,
+                on_output=self._task_runner.progress_reporter(),
             ),
             on_success=lambda payload: self._handle_action_result(payload),
+            lane="mutating",
         )
 
     def _handle_command_result(self, result: BrewCommandResult) -> None:
         command_text = " ".join(result.command) if result.command else "<no command>"
         if result.succeeded:
-            self.error_var.set("")
-            message = result.output or "Command completed successfully."
+            self._render.set(self.error_var, "")
+            if result.streamed:
+                message = "Command completed successfully."
+            else:
+                message = result.output or "Command completed successfully."
+            if result.spill_path:
+                message = f"{message}\nFull output: {result.spill_path}"
             self._append_log(f"$ {command_text}\n{message}")
             return
 
-        self.error_var.set(result.error)
+        self._render.set(self.error_var, result.error)
         self._append_log(f"$ {command_text}\nERROR: {result.error}")
 
     @staticmethod
@@ -678,16 +1099,86 @@ class BrewManagerApp:
         widget.delete("1.0", tk.END)
         widget.insert("1.0", content)
 
-    def _append_log(self, content: str) -> None:
-        self.log_text.insert(tk.END, f"{content}\n\n")
-        self.log_text.see(tk.END)
+    def _append_log(self, content: str, kind: str = "message") -> None:
+        entry = self.activity.append(content, kind)
+        if self._log_live:
+            self._pending_output.append(entry)
+            self._render.request("log", self._flush_task_output)
+
+    def _find_in_log(self) -> None:
+        """Jump to the newest match; pressing Find again with the same text steps to older ones."""
+        term = self.log_search_var.get().strip()
+        if not term:
+            self._show_live_log()
+            return
+        if term == self._log_match_term and self._log_match_index + 1 < len(self._log_matches):
+            self._log_match_index += 1
+            self._jump_to_log_entry(self._log_matches[self._log_match_index])
+            return
+
+        self._log_match_term = term
+        self._submit_task(
+            description="Searching activity log",
+            fn=lambda: self.activity.search(term),
+            on_success=lambda matches: self._handle_log_matches(term, matches),
+            quiet=True,
+            lane="interactive",
+            key="log-search",
+        )
+
+    def _handle_log_matches(self, term: str, matches: object) -> None:
+        if term != self._log_match_term or not isinstance(matches, list):
+            return
+        self._log_matches, self._log_match_index = matches, 0
+        if not matches:
+            self._render.set(self.activity_var, f"No activity matches \"{term}\".")
+            return
+        self._jump_to_log_entry(matches[0])
+
+    def _jump_to_log_entry(self, match: LogEntry) -> None:
+        self._render.set(
+            self.activity_var,
+            f"Match {self._log_match_index + 1} of {len(self._log_matches)} for \"{self._log_match_term}\"",
+        )
+        self._submit_task(
+            description="Loading activity context",
+            fn=lambda: self.activity.around(match.seq, self.LOG_CONTEXT_RADIUS),
+            on_success=lambda context: self._render_log_context(match, context),
+            quiet=True,
+            lane="interactive",
+            key="log-context",
+        )
+
+    def _render_log_context(self, match: LogEntry, context: object) -> None:
+        if not isinstance(context, list):
+            return
+        # Frozen on the match until Live is pressed; new entries keep going to the activity log.
+        self._log_live = False
+        self._pending_output.clear()
+        self.log_text.delete("1.0", tk.END)
+        for entry in context:
+            self.log_text.insert(tk.END, entry.render(), ("match",) if entry.seq == match.seq else ())
+        ranges = self.log_text.tag_ranges("match")
+        self.log_text.see(ranges[0] if ranges else tk.END)
+
+    def _show_live_log(self) -> None:
+        self._log_live = True
+        self._log_matches, self._log_match_term = [], ""
+        self._pending_output = self.activity.recent(self.LOG_WINDOW_ENTRIES)
+        self.log_text.delete("1.0", tk.END)
+        self._log_line_counts.clear()
+        self._flush_task_output()
 
     def _handle_details_loaded(self, selection: PackageSelection, details: object) -> None:
         if not isinstance(details, PackageDetails):
-            self.error_var.set("Unexpected package details payload received.")
+            self._render.set(self.error_var, "Unexpected package details payload received.")
             self._append_log("ERROR: Unexpected package details payload received.")
             return
 
+        self._render_package_details(selection, details)
+        self._append_log(f"Loaded details for {selection.name} ({selection.kind}).")
+
+    def _render_package_details(self, selection: PackageSelection, details: PackageDetails) -> None:
         self.selection_var.set(f"{details.title}  •  {selection.kind}")
         self.package_blurb_var.set(details.description)
         installed = ", ".join(details.installed_versions) if details.installed_versions else "Not installed"
@@ -695,18 +1186,71 @@ class BrewManagerApp:
             f"Latest version: {details.latest_version}    Installed: {installed}"
         )
         self._set_text(self.details_text, self._format_package_details(details))
-        self._append_log(f"Loaded details for {selection.name} ({selection.kind}).")
 
     def _handle_action_result(self, payload: object) -> None:
         result = payload
         if not isinstance(result, BrewCommandResult):
-            self.error_var.set("Unexpected action result received.")
+            self._render.set(self.error_var, "Unexpected action result received.")
             self._append_log("ERROR: Unexpected action result received.")
             return
 
         self._handle_command_result(result)
-        if result.succeeded:
-            self.refresh()
+        if not result.succeeded:
+            return
+        if result.delta is None or self._snapshot is None or not self._snapshot.available:
+            # A snapshot already in flight may predate this action.
+            self.refresh(join=False)
+            return
+
+        self._apply_delta(result.delta)
+        self._schedule_reconcile()
+
+    def _apply_delta(self, delta: SnapshotDelta) -> None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+
+        changed = delta.changed(snapshot)
+        kinds = delta.apply(snapshot)
+        if not kinds:
+            return
+        for package_kind, package_name in delta.removed:
+            self._graph.remove(package_name, package_kind)
+        if changed and len(self._graph):
+            self._submit_task(
+                description="Updating dependencies",
+                fn=lambda: self.service.fresh_details(changed),
+                on_success=self._handle_changed_details,
+                quiet=True,
+                lane="background",
+            )
+        selected = self._selected_package
+        if selected is not None and (selected.kind, selected.name) in delta.removed:
+            self._selected_package = None
+            self.selection_var.set("Choose a package to see details.")
+        self._render_summary(snapshot)
+        self._schedule_filter(kinds)
+
+    def _handle_changed_details(self, payload: object) -> None:
+        """Re-link installed or upgraded packages so orphans and dependents stay current."""
+        if not len(self._graph):
+            return
+        for details in payload:
+            self._graph.add(details)
+        self._schedule_filter()
+
+    def _schedule_reconcile(self) -> None:
+        """Debounce a full refresh so a burst of actions costs one snapshot."""
+        if self._reconcile_after_id is not None:
+            self.root.after_cancel(self._reconcile_after_id)
+        self._reconcile_after_id = self.root.after(self.RECONCILE_DELAY_MS, self._run_reconcile)
+
+    def _run_reconcile(self) -> None:
+        self._reconcile_after_id = None
+        if self._active_tasks:
+            self._schedule_reconcile()
+            return
+        self.refresh()
 
     def _submit_task(
         self,
@@ -714,49 +1258,241 @@ class BrewManagerApp:
         fn: Callable[[], object],
         on_success: Callable[[object], None] | None = None,
         on_error: Callable[[Exception], None] | None = None,
+        quiet: bool = False,
+        timeout: float | None = None,
+        lane: str = "normal",
+        key: str | None = None,
+        join: bool = False,
     ) -> None:
-        task_id = self._task_runner.submit(description, fn)
+        """Submit background work; see ``BackgroundTaskRunner.submit`` for ``key`` and ``join``."""
+        task_id = self._task_runner.submit(description, fn, timeout=timeout, lane=lane, key=key, join=join)
         self._task_handlers[task_id] = (on_success, on_error)
+        if quiet:
+            self._quiet_tasks.add(task_id)
+        if self._wakeup.mode == "poll" and self._poll_after_id is None:
+            self._poll_after_id = self.root.after(self.POLL_INTERVAL_MS, self._poll_task_events)
+
+    def _process_task_events(self) -> None:
+        self._render.process(self._task_runner.drain_events(), self._handle_task_event)
 
     def _poll_task_events(self) -> None:
-        for event in self._task_runner.drain_events():
-            self._handle_task_event(event)
-        self.root.after(120, self._poll_task_events)
+        """Fallback when Tk cannot watch the wakeup pipe; stops once the runner is idle."""
+        self._poll_after_id = None
+        self._process_task_events()
+        if not self._task_runner.idle:
+            self._poll_after_id = self.root.after(self.POLL_INTERVAL_MS, self._poll_task_events)
+
+    def _flush_task_output(self) -> None:
+        """Write log entries and streamed output gathered during one render pass in a single insert.
+
+        The widget keeps only the newest ``LOG_WINDOW_ENTRIES`` entries; older
+        ones stay reachable through the activity log search.
+        """
+        if not self._pending_output or not self._log_live:
+            return
+        entries = self._pending_output[-self.LOG_WINDOW_ENTRIES:]
+        self._pending_output = []
+        chunks = [entry.render() for entry in entries]
+        self.log_text.insert(tk.END, "".join(chunks))
+        self._log_line_counts.extend(chunk.count("\n") for chunk in chunks)
+
+        excess = len(self._log_line_counts) - self.LOG_WINDOW_ENTRIES
+        if excess > 0:
+            lines = sum(self._log_line_counts.popleft() for _index in range(excess))
+            self.log_text.delete("1.0", f"{lines + 1}.0")
+        self.log_text.see(tk.END)
 
     def _handle_task_event(self, event: TaskEvent) -> None:
         handlers = self._task_handlers.get(event.task_id, (None, None))
         on_success, on_error = handlers
 
+        if event.task_id in self._quiet_tasks:
+            self._handle_quiet_task_event(event, on_success)
+            return
+
+        if event.status == "progress":
+            if event.task_id not in self._active_tasks:
+                return
+            line = str(event.payload)
+            self._append_log(line, kind="output")
+            if line.strip():
+                self._render.set(self.activity_var, f"{event.description}: {line.strip()[:60]}")
+            return
+
         if event.status == "started":
             self._active_tasks.add(event.task_id)
-            self.activity_var.set(f"{event.description}...")
+            self._render.set(self.activity_var, f"{event.description}...")
             self._set_busy_state(True)
-            self._append_log(f"{event.description} started.")
+            if event.wait_time >= self.QUEUE_WAIT_REPORT_S:
+                self._append_log(
+                    f"{event.description} started after waiting {event.wait_time:.1f}s "
+                    f"in the {event.lane} lane ({event.queue_depth} still queued)."
+                )
+            else:
+                self._append_log(f"{event.description} started.")
             return
 
         self._active_tasks.discard(event.task_id)
         if not self._active_tasks:
-            self.activity_var.set("Idle")
+            self._render.set(self.activity_var, "Idle")
             self._set_busy_state(False)
 
         if event.status == "completed":
-            if on_success is not None:
-                on_success(event.payload)
-            self._append_log(f"{event.description} finished.")
+            if self._is_superseded(event):
+                self._append_log(f"{event.description} finished; a newer result is already shown.")
+            else:
+                if on_success is not None:
+                    on_success(event.payload)
+                self._append_log(f"{event.description} finished.")
         elif event.status == "failed":
             error = event.error or RuntimeError("Background task failed.")
             if on_error is not None:
                 on_error(error)
             else:
-                self.error_var.set(str(error))
+                self._render.set(self.error_var, str(error))
                 self._append_log(f"ERROR: {event.description} failed: {error}")
+        elif event.status == "cancelled":
+            error = event.error or RuntimeError("Background task cancelled.")
+            if on_error is not None:
+                on_error(error)
+            else:
+                self._append_log(f"{event.description} cancelled: {error}")
+
+        self._task_handlers.pop(event.task_id, None)
+
+    def _is_superseded(self, event: TaskEvent) -> bool:
+        """Latest wins: drop a keyed result older than the one already rendered."""
+        if event.key is None:
+            return False
+        if event.generation < self._rendered_generations.get(event.key, 0):
+            return True
+        self._rendered_generations[event.key] = event.generation
+        return False
 
+    def _handle_quiet_task_event(
+        self,
+        event: TaskEvent,
+        on_success: Callable[[object], None] | None,
+    ) -> None:
+        """Background housekeeping never touches the busy state or the log."""
+        if event.status not in {"completed", "failed", "cancelled"}:
+            return
+        if event.status == "completed" and on_success is not None and not self._is_superseded(event):
+            on_success(event.payload)
+        self._quiet_tasks.discard(event.task_id)
         self._task_handlers.pop(event.task_id, None)
 
     def _set_busy_state(self, busy: bool) -> None:
         state = tk.DISABLED if busy else tk.NORMAL
         for button in self._action_buttons:
             button.configure(state=state)
+        self.cancel_button.configure(state=tk.NORMAL if busy else tk.DISABLED)
+
+    def _open_diagnostics(self) -> None:
+        if self._diagnostics_window is not None:
+            self._diagnostics_window.lift()
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("860x640")
+        window.configure(bg="#f4f6fb")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+        window.protocol("WM_DELETE_WINDOW", self._close_diagnostics)
+        text = tk.Text(
+            window,
+            wrap="none",
+            relief=tk.FLAT,
+            bg="#0f172a",
+            fg="#e2e8f0",
+            font=("SF Mono", 10),
+            padx=16,
+            pady=16,
+        )
+        text.grid(row=0, column=0, sticky="nsew", padx=16, pady=(16, 10))
+        buttons = ttk.Frame(window, style="App.TFrame")
+        buttons.grid(row=1, column=0, sticky="e", padx=16, pady=(0, 16))
+        ttk.Button(buttons, text="Export Bundle", style="Primary.TButton", command=self._export_diagnostics).grid(
+            row=0,
+            column=0,
+        )
+        ttk.Button(buttons, text="Close", style="Secondary.TButton", command=self._close_diagnostics).grid(
+            row=0,
+            column=1,
+            padx=(10, 0),
+        )
+
+        self._diagnostics_window, self._diagnostics_text = window, text
+        # Allocation tracking slows every allocation down, so it only runs while the panel is open.
+        self.diagnostics.start_allocation_tracking()
+        self._refresh_diagnostics()
+        self._sample_allocations()
+
+    def _refresh_diagnostics(self) -> None:
+        self._diagnostics_after_id = None
+        if self._diagnostics_text is None:
+            return
+        self._paint_diagnostics()
+        self._diagnostics_after_id = self.root.after(self.DIAGNOSTICS_REFRESH_MS, self._refresh_diagnostics)
+
+    def _paint_diagnostics(self) -> None:
+        if self._diagnostics_text is not None:
+            self._set_text(self._diagnostics_text, Diagnostics.format_report(self.diagnostics.collect()))
+
+    def _sample_allocations(self) -> None:
+        """Walk the traced blocks on the background lane; the next panel refresh paints the result."""
+        self._allocations_after_id = None
+        if self._diagnostics_text is None:
+            return
+        self._submit_task(
+            description="Sampling allocations",
+            fn=self.diagnostics.refresh_allocations,
+            on_success=lambda _allocations: self._paint_diagnostics(),
+            quiet=True,
+            lane="background",
+            key="diagnostics-allocations",
+            join=True,
+        )
+        self._allocations_after_id = self.root.after(self.ALLOCATION_SAMPLE_MS, self._sample_allocations)
+
+    def _close_diagnostics(self) -> None:
+        for after_id in (self._diagnostics_after_id, self._allocations_after_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self._diagnostics_after_id = self._allocations_after_id = None
+        self.diagnostics.stop_allocation_tracking()
+        if self._diagnostics_window is not None:
+            self._diagnostics_window.destroy()
+        self._diagnostics_window = self._diagnostics_text = None
+
+    def _export_diagnostics(self) -> None:
+        target = filedialog.asksaveasfilename(
+            parent=self._diagnostics_window or self.root,
+            title="Export diagnostics",
+            defaultextension=".zip",
+            initialfile=time.strftime("brew-gui-diagnostics-%Y%m%d-%H%M%S.zip"),
+            filetypes=[("Zip archive", "*.zip")],
+        )
+        if not target:
+            return
+        # Collected here: the Tk-side timings must be read on the Tk thread. The
+        # allocation sample is slow, so the task takes a fresh one.
+        report = self.diagnostics.collect()
+        self._submit_task(
+            description="Exporting diagnostics",
+            fn=lambda: self.diagnostics.export(
+                Path(target),
+                {**report, "allocations": self.diagnostics.refresh_allocations()},
+            ),
+            on_success=lambda archive: self._append_log(f"Diagnostics exported to {archive}."),
+            lane="background",
+        )
+
+    def _cancel_active_tasks(self) -> None:
+        """Cancel running and still-queued foreground work; housekeeping keeps going."""
+        for task_id in sorted(set(self._task_handlers) - self._quiet_tasks):
+            self._task_runner.cancel(task_id)
 
     def _register_action_button(self, button: ttk.Button) -> None:
         self._action_buttons.append(button)
@@ -774,6 +1510,8 @@ class BrewManagerApp:
         ]
         if details.caveats:
             sections.append(f"Caveats: {details.caveats}")
+        if not details.raw_text:
+            return "\n".join(sections)
         sections.append("")
         sections.append("Raw Homebrew Info")
         sections.append(details.raw_text)
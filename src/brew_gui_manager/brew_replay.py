@@ -0,0 +1,248 @@
+"""Record Homebrew commands as fixtures and replay them without Homebrew.
+
+Record while using the app, then serve the recordings from a stand-in
+``brew`` with extra latency, jitter or failures::
+
+    BREW_GUI_RECORD_DIR=~/brew-fixtures brew-gui
+    python -m brew_gui_manager.brew_replay install ~/brew-fixtures /tmp/replay --latency-ms 300 --jitter-ms 100
+    PATH=/tmp/replay:$PATH BREW_REPLAY_FAILURE_RATE=0.1 brew-gui
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass, fields
+import hashlib
+import json
+import os
+from pathlib import Path
+import random
+import re
+import stat
+import sys
+import tempfile
+import time
+from typing import Callable, Final, Iterator, Sequence
+
+from .command_trace import command_type
+
+
+@dataclass(slots=True)
+class Fixture:
+    """One recorded command; ``argv`` leaves out the executable."""
+
+    argv: list[str]
+    stdout: str
+    stderr: str
+    exit_code: int
+    wall_time: float = 0.0
+    recorded_at: float = 0.0
+
+
+def fixture_name(argv: Sequence[str]) -> str:
+    """A readable, collision-free file name for the arguments ``argv``."""
+    slug = re.sub(r"[^A-Za-z0-9@.]+", "-", " ".join(argv)).strip("-")[:60] or "empty"
+    digest = hashlib.sha1(json.dumps(list(argv)).encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{digest}.json"
+
+
+class FixtureStore:
+    """A directory of fixtures, one JSON file per distinct argument list."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def path_for(self, argv: Sequence[str]) -> Path:
+        return self.directory / fixture_name(argv)
+
+    def save(self, fixture: Fixture) -> Path:
+        """Write ``fixture`` atomically, replacing an earlier recording of the same command."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(fixture.argv)
+        handle, temp_name = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as stream:
+                json.dump(asdict(fixture), stream, indent=1)
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        return path
+
+    def load(self, argv: Sequence[str]) -> Fixture | None:
+        try:
+            data = json.loads(self.path_for(argv).read_text(encoding="utf-8"))
+            return Fixture(**data)
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def __iter__(self) -> Iterator[Fixture]:
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                yield Fixture(**json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, TypeError, ValueError):
+                continue
+
+
+class CommandRecorder:
+    """Save every completed command ``BrewService`` runs into a ``FixtureStore``."""
+
+    def __init__(self, directory: Path) -> None:
+        self.store = FixtureStore(directory)
+
+    def record(self, argv: Sequence[str], stdout: str, stderr: str, exit_code: int, wall_time: float) -> None:
+        fixture = Fixture(
+            argv=list(argv)[1:],
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            wall_time=round(wall_time, 4),
+            recorded_at=round(time.time(), 3),
+        )
+        try:
+            self.store.save(fixture)
+        except OSError:
+            pass
+
+
+REPLAY_ENVIRONMENT: Final[dict[str, str]] = {
+    "latency_ms": "BREW_REPLAY_LATENCY_MS",
+    "jitter_ms": "BREW_REPLAY_JITTER_MS",
+    "failure_rate": "BREW_REPLAY_FAILURE_RATE",
+    "fail_matching": "BREW_REPLAY_FAIL_MATCHING",
+    "recorded_timing": "BREW_REPLAY_RECORDED_TIMING",
+    "seed": "BREW_REPLAY_SEED",
+}
+
+
+@dataclass(slots=True)
+class ReplayPolicy:
+    """How the replay ``brew`` misbehaves.
+
+    Every call sleeps ``latency_ms`` plus a uniform jitter of up to
+    ``jitter_ms`` either way. With ``recorded_timing`` it also sleeps the
+    recorded wall time. Calls fail with ``failure_rate`` probability, and
+    always when their command type contains ``fail_matching``. With a
+    ``seed`` the jitter and failures depend only on the arguments, so a run
+    can be repeated exactly.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    fail_matching: str = ""
+    recorded_timing: bool = False
+    seed: int | None = None
+
+    def with_environment(self, environ: dict[str, str] | None = None) -> ReplayPolicy:
+        """A copy with any ``BREW_REPLAY_*`` variables applied on top."""
+        environ = os.environ if environ is None else environ
+        values = asdict(self)
+        for item in fields(self):
+            raw = environ.get(REPLAY_ENVIRONMENT[item.name])
+            if raw is None:
+                continue
+            if item.name == "fail_matching":
+                values[item.name] = raw
+            elif item.name == "recorded_timing":
+                values[item.name] = raw.lower() in {"1", "true", "yes"}
+            elif item.name == "seed":
+                values[item.name] = int(raw) if raw else None
+            else:
+                values[item.name] = float(raw)
+        return ReplayPolicy(**values)
+
+
+def replay(
+    store: FixtureStore,
+    argv: Sequence[str],
+    policy: ReplayPolicy,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Fixture:
+    """The response the stand-in gives for ``argv``, after the policy's delay."""
+    fixture = store.load(argv)
+    rng = random.Random(f"{policy.seed}:{json.dumps(list(argv))}") if policy.seed is not None else random.Random()
+
+    delay_ms = policy.latency_ms + rng.uniform(-policy.jitter_ms, policy.jitter_ms)
+    if policy.recorded_timing and fixture is not None:
+        delay_ms += fixture.wall_time * 1000
+    if delay_ms > 0:
+        sleep(delay_ms / 1000)
+
+    kind = command_type(["brew", *argv])
+    if (policy.fail_matching and policy.fail_matching in kind) or rng.random() < policy.failure_rate:
+        return Fixture(list(argv), "", f"Error: injected failure for `brew {' '.join(argv)}`.\n", 1)
+    if fixture is None:
+        return Fixture(list(argv), "", f"Error: no recorded fixture for `brew {' '.join(argv)}`.\n", 1)
+    return fixture
+
+
+def serve(directory: str, defaults: dict, argv: list[str]) -> int:
+    """Entry point of the generated ``brew``: print the replayed output and return its exit code."""
+    policy = ReplayPolicy(**defaults).with_environment()
+    fixture = replay(FixtureStore(Path(directory)), argv, policy)
+    sys.stdout.write(fixture.stdout)
+    sys.stderr.write(fixture.stderr)
+    return fixture.exit_code
+
+
+EXECUTABLE: Final[str] = """#!{python}
+import sys
+sys.path.insert(0, {package_root!r})
+from brew_gui_manager.brew_replay import serve
+sys.exit(serve({fixtures!r}, {defaults!r}, sys.argv[1:]))
+"""
+
+
+def write_replay_executable(directory: Path, fixtures: Path, policy: ReplayPolicy | None = None) -> Path:
+    """Write a ``brew`` into ``directory`` that replays ``fixtures`` and return its path."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "brew"
+    path.write_text(
+        EXECUTABLE.format(
+            python=sys.executable,
+            package_root=str(Path(__file__).resolve().parent.parent),
+            fixtures=str(fixtures.resolve()),
+            defaults=asdict(policy or ReplayPolicy()),
+        ),
+        encoding="utf-8",
+    )
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded Homebrew commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    install = commands.add_parser("install", help="Write a replaying brew executable.")
+    install.add_argument("fixtures", type=Path)
+    install.add_argument("directory", type=Path, help="Put this directory first on PATH to use it.")
+    install.add_argument("--latency-ms", type=float, default=0.0)
+    install.add_argument("--jitter-ms", type=float, default=0.0)
+    install.add_argument("--failure-rate", type=float, default=0.0)
+    install.add_argument("--fail-matching", default="", help="Always fail commands whose type contains this text.")
+    install.add_argument("--recorded-timing", action="store_true", help="Also sleep for the recorded wall time.")
+    install.add_argument("--seed", type=int)
+    listing = commands.add_parser("list", help="List the recorded commands.")
+    listing.add_argument("fixtures", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for fixture in FixtureStore(args.fixtures):
+            size = len(fixture.stdout.encode("utf-8"))
+            print(f"{fixture.exit_code:>3} {fixture.wall_time:>8.3f}s {size:>10} B  brew {' '.join(fixture.argv)}")
+        return
+
+    policy = ReplayPolicy(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        fail_matching=args.fail_matching,
+        recorded_timing=args.recorded_timing,
+        seed=args.seed,
+    )
+    print(write_replay_executable(args.directory, args.fixtures, policy))
+
+
+if __name__ == "__main__":
+    main()
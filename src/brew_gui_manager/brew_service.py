@@ -1,15 +1,44 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import json
+import os
+from pathlib import Path
+import re
 import shutil
 import subprocess
-from typing import Final
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Final, Iterable
+
+from .brew_replay import CommandRecorder
+from .brew_worker import BrewWorkerClient, WorkerError
+from .command_trace import CommandTrace
+from .details_cache import DetailsCache
+from .inventory import FilesystemInventory, Inventory, InventoryLayoutError
+from .output_buffer import OutputBuffer
+from .task_context import (
+    TaskContext,
+    bind,
+    check_cancelled,
+    current_task,
+    terminate_process_group,
+    watch_process,
+)
 
 
 PackageKind = str
 
 
+def package_key(package_name: str, package_kind: PackageKind) -> str:
+    """Stable lookup key for a package; formulae and casks may share names."""
+    return f"{package_kind}:{package_name}"
+
+
 @dataclass(slots=True)
 class BrewSnapshot:
     available: bool
@@ -19,6 +48,90 @@ class BrewSnapshot:
     outdated_formulae: list[str]
     outdated_casks: list[str]
     error: str = ""
+    timings: dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+    details: dict[str, PackageDetails] = field(default_factory=dict)
+    installed_versions: dict[str, list[str]] = field(default_factory=dict)
+
+    def details_for(self, package_name: str, package_kind: PackageKind) -> PackageDetails | None:
+        return self.details.get(package_key(package_name, package_kind))
+
+
+@dataclass(slots=True)
+class SnapshotDelta:
+    """Targeted change to a snapshot after a successful action.
+
+    Packages are ``(kind, name)`` pairs. The delta only covers what the action
+    is known to have changed; side effects such as newly pulled dependencies
+    are left to a later reconcile refresh.
+    """
+
+    added: list[tuple[PackageKind, str]] = field(default_factory=list)
+    removed: list[tuple[PackageKind, str]] = field(default_factory=list)
+    upgraded: list[tuple[PackageKind, str]] = field(default_factory=list)
+    all_upgraded: bool = False
+
+    def apply(self, snapshot: BrewSnapshot) -> set[PackageKind]:
+        """Patch ``snapshot`` in place and return the kinds whose shelves changed."""
+        affected: set[PackageKind] = set()
+        for package_kind, package_name in self.added:
+            installed = snapshot.casks if package_kind == "cask" else snapshot.formulae
+            if package_name not in installed:
+                bisect.insort(installed, package_name)
+            affected.add(package_kind)
+
+        for package_kind, package_name in self.removed:
+            key = package_key(package_name, package_kind)
+            for items in self._lists_for(snapshot, package_kind):
+                if package_name in items:
+                    items.remove(package_name)
+            snapshot.details.pop(key, None)
+            snapshot.installed_versions.pop(key, None)
+            affected.add(package_kind)
+
+        for package_kind, package_name in self._upgraded(snapshot):
+            outdated = snapshot.outdated_casks if package_kind == "cask" else snapshot.outdated_formulae
+            if package_name in outdated:
+                outdated.remove(package_name)
+            details = snapshot.details.get(package_key(package_name, package_kind))
+            if details is not None and details.outdated:
+                details.outdated = False
+                details.installed_versions = [details.latest_version]
+                snapshot.installed_versions[package_key(package_name, package_kind)] = details.installed_versions
+            affected.add(package_kind)
+        return affected
+
+    def changed(self, snapshot: BrewSnapshot) -> list[tuple[PackageKind, str]]:
+        """Packages whose details the action replaced; call before ``apply``."""
+        return [*self.added, *self._upgraded(snapshot)]
+
+    def _upgraded(self, snapshot: BrewSnapshot) -> list[tuple[PackageKind, str]]:
+        upgraded = list(self.upgraded)
+        if self.all_upgraded:
+            upgraded.extend(("formula", name) for name in snapshot.outdated_formulae)
+            upgraded.extend(("cask", name) for name in snapshot.outdated_casks)
+        return upgraded
+
+    @staticmethod
+    def _lists_for(snapshot: BrewSnapshot, package_kind: PackageKind) -> tuple[list[str], list[str]]:
+        if package_kind == "cask":
+            return snapshot.casks, snapshot.outdated_casks
+        return snapshot.formulae, snapshot.outdated_formulae
+
+
+class CommandTimeout(subprocess.CalledProcessError):
+    """A brew command ran longer than ``BrewService.command_timeout`` and was killed.
+
+    It is a ``CalledProcessError`` so every existing failure path reports it.
+    """
+
+    def __init__(self, cmd: tuple[str, ...], timeout: float, output: str = "", stderr: str = "") -> None:
+        message = f"Timed out after {timeout:g}s."
+        super().__init__(-1, cmd, output, f"{stderr.strip()}\n{message}".strip())
+        self.timeout = timeout
+
+    def __str__(self) -> str:
+        return f"Command '{' '.join(self.cmd)}' timed out after {self.timeout:g}s."
 
 
 @dataclass(slots=True)
@@ -27,6 +140,11 @@ class BrewCommandResult:
     succeeded: bool
     output: str = ""
     error: str = ""
+    delta: SnapshotDelta | None = None
+    exit_code: int | None = None
+    spill_path: str = ""
+    streamed: bool = False
+    package_results: dict[str, bool] = field(default_factory=dict)
 
 
 @dataclass(slots=True)
@@ -41,23 +159,127 @@ class PackageDetails:
     dependencies: list[str]
     tap: str
     caveats: str
-    raw_text: str
+    raw_text: str = ""
+    outdated: bool = False
+    installed_on_request: bool = True
 
 
 class BrewService:
-    """Small wrapper around the Homebrew CLI."""
+    """Small wrapper around the Homebrew CLI.
+
+    ``inventory_backend`` only affects the text snapshot: the JSON snapshot
+    already gets the installed lists from its single ``info`` call, so the
+    filesystem scan is used there only when JSON falls back to text.
+    """
 
     ACTIONS: Final[dict[str, tuple[str, ...]]] = {
         "upgrade_all": ("upgrade",),
         "cleanup": ("cleanup",),
     }
 
-    def __init__(self, executable: str = "brew") -> None:
+    SNAPSHOT_COMMANDS: Final[dict[str, tuple[str, ...]]] = {
+        "version": ("--version",),
+        "formulae": ("list", "--formula"),
+        "casks": ("list", "--cask"),
+        "outdated_formulae": ("outdated", "--quiet", "--formula"),
+        "outdated_casks": ("outdated", "--quiet", "--cask"),
+    }
+
+    JSON_SNAPSHOT_COMMANDS: Final[dict[str, tuple[str, ...]]] = {
+        "version": ("--version",),
+        "installed": ("info", "--json=v2", "--installed"),
+    }
+
+    SNAPSHOT_MODES: Final[tuple[str, ...]] = ("text", "json")
+    INVENTORY_BACKENDS: Final[tuple[str, ...]] = ("cli", "filesystem")
+    INVENTORY_COMMANDS: Final[tuple[str, ...]] = ("formulae", "casks")
+
+    def __init__(
+        self,
+        executable: str = "brew",
+        snapshot_workers: int = 5,
+        snapshot_mode: str = "text",
+        inventory_backend: str = "cli",
+        details_cache: DetailsCache | None = None,
+        stream_tail_lines: int = 200,
+        stream_spill_dir: str | None = None,
+        worker: BrewWorkerClient | None = None,
+        command_timeout: float | None = None,
+        tracer: CommandTrace | None = None,
+        recorder: CommandRecorder | None = None,
+    ) -> None:
+        if snapshot_mode not in self.SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode: {snapshot_mode}")
+        if inventory_backend not in self.INVENTORY_BACKENDS:
+            raise ValueError(f"Unknown inventory backend: {inventory_backend}")
         self.executable = executable
+        self.snapshot_workers = snapshot_workers
+        self.snapshot_mode = snapshot_mode
+        self.inventory_backend = inventory_backend
+        self.details_cache = details_cache if details_cache is not None else DetailsCache()
+        self.stream_tail_lines = stream_tail_lines
+        self.stream_spill_dir = stream_spill_dir
+        self.worker = worker
+        self.command_timeout = command_timeout
+        self.tracer = tracer
+        self.recorder = recorder
+        self._inventory: FilesystemInventory | None = None
 
     def is_available(self) -> bool:
         return shutil.which(self.executable) is not None
 
+    def homebrew_prefix(self) -> str:
+        """Best-effort Homebrew prefix without spawning ``brew --prefix``."""
+        prefix = os.environ.get("HOMEBREW_PREFIX", "")
+        if prefix:
+            return prefix
+        executable = shutil.which(self.executable)
+        if executable is None:
+            return ""
+        return str(Path(executable).parent.parent)
+
+    def homebrew_revision(self) -> str:
+        """Commit of the Homebrew checkout, read from ``.git`` without spawning anything.
+
+        Changes whenever ``brew update`` moves Homebrew to a new version.
+        Empty when the checkout cannot be found.
+        """
+        prefix = self.homebrew_prefix()
+        repositories = [os.environ.get("HOMEBREW_REPOSITORY", "")]
+        if prefix:
+            # Apple Silicon keeps the checkout at the prefix, Intel under it.
+            repositories += [prefix, os.path.join(prefix, "Homebrew")]
+        for repository in filter(None, repositories):
+            git_dir = Path(repository) / ".git"
+            try:
+                head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+            except OSError:
+                continue
+            if not head.startswith("ref: "):
+                return head
+            ref = head.removeprefix("ref: ")
+            try:
+                return (git_dir / ref).read_text(encoding="utf-8").strip()
+            except OSError:
+                pass
+            try:
+                packed = (git_dir / "packed-refs").read_text(encoding="utf-8").splitlines()
+            except OSError:
+                return ""
+            return next((line.split(" ", 1)[0] for line in packed if line.endswith(f" {ref}")), "")
+        return ""
+
+    def homebrew_cache_dir(self) -> str:
+        """Homebrew's download/API cache without spawning ``brew --cache``."""
+        cache = os.environ.get("HOMEBREW_CACHE", "")
+        if cache:
+            return cache
+        home = os.path.expanduser("~")
+        if sys.platform == "darwin":
+            return os.path.join(home, "Library", "Caches", "Homebrew")
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+        return os.path.join(base, "Homebrew")
+
     def collect_snapshot(self) -> BrewSnapshot:
         if not self.is_available():
             return BrewSnapshot(
@@ -70,49 +292,175 @@ class BrewService:
                 error="Homebrew executable was not found in PATH.",
             )
 
+        if self.snapshot_mode == "json":
+            snapshot = self._collect_json_snapshot()
+            if snapshot is not None:
+                return snapshot
+
+        return self._collect_text_snapshot()
+
+    def _collect_json_snapshot(self) -> BrewSnapshot | None:
+        """Build a snapshot from one ``brew info --json=v2 --installed`` call.
+
+        Returns ``None`` when the installed Homebrew cannot produce the JSON
+        document so the caller can fall back to the text commands.
+        """
+        started = time.perf_counter()
         try:
-            version = self._run(self.executable, "--version").splitlines()[0]
-            formulae = self._run(self.executable, "list", "--formula").splitlines()
-            casks = self._run(self.executable, "list", "--cask").splitlines()
-            outdated_formulae = self._run(
-                self.executable,
-                "outdated",
-                "--quiet",
-                "--formula",
-            ).splitlines()
-            outdated_casks = self._run(
-                self.executable,
-                "outdated",
-                "--quiet",
-                "--cask",
-            ).splitlines()
+            outputs, timings = self._run_many(self.JSON_SNAPSHOT_COMMANDS)
+            data = json.loads(outputs["installed"])
+            details: dict[str, PackageDetails] = {}
+            for package_kind, key in (("formula", "formulae"), ("cask", "casks")):
+                for entry in data.get(key, []):
+                    item = self._details_from_entry(entry, package_kind)
+                    details[package_key(item.name, package_kind)] = item
+            for key, item in details.items():
+                self.details_cache.put(key, item)
+        except CommandTimeout as exc:
+            # Falling back would run five more commands that can each time out too.
+            return self._error_snapshot(exc)
+        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, IndexError, TypeError, ValueError, AttributeError):
+            return None
+
+        formulae = [item for item in details.values() if item.kind == "formula"]
+        casks = [item for item in details.values() if item.kind == "cask"]
+        return BrewSnapshot(
+            available=True,
+            version=next(iter(outputs["version"].splitlines()), "Unknown"),
+            formulae=[item.name for item in formulae],
+            casks=[item.name for item in casks],
+            outdated_formulae=[item.name for item in formulae if item.outdated],
+            outdated_casks=[item.name for item in casks if item.outdated],
+            timings=timings,
+            elapsed=time.perf_counter() - started,
+            details=details,
+            installed_versions={key: item.installed_versions for key, item in details.items()},
+        )
+
+    def _collect_text_snapshot(self) -> BrewSnapshot:
+        """Build a snapshot from the text commands.
+
+        With the ``filesystem`` inventory backend the two ``brew list`` calls
+        are replaced by a scan of the Cellar and Caskroom; an unexpected
+        layout falls back to running them.
+        """
+        started = time.perf_counter()
+        commands = dict(self.SNAPSHOT_COMMANDS)
+        inventory = self.read_inventory() if self.inventory_backend == "filesystem" else None
+        installed_versions: dict[str, list[str]] = {}
+        inventory_timing: dict[str, float] = {}
+        if inventory is not None:
+            for key in self.INVENTORY_COMMANDS:
+                commands.pop(key)
+            for name, versions in inventory.formula_versions.items():
+                installed_versions[package_key(name, "formula")] = versions
+            for name, versions in inventory.cask_versions.items():
+                installed_versions[package_key(name, "cask")] = versions
+            inventory_timing["scan Cellar/Caskroom"] = time.perf_counter() - started
+
+        try:
+            outputs, timings = self._run_many(commands)
         except subprocess.CalledProcessError as exc:
-            return BrewSnapshot(
-                available=True,
-                version="Unknown",
-                formulae=[],
-                casks=[],
-                outdated_formulae=[],
-                outdated_casks=[],
-                error=exc.stderr.strip() or str(exc),
-            )
+            return self._error_snapshot(exc)
+
+        if inventory is not None:
+            formulae = inventory.formulae
+            casks = inventory.casks
+        else:
+            formulae = self._split_lines(outputs["formulae"])
+            casks = self._split_lines(outputs["casks"])
+
+        return BrewSnapshot(
+            available=True,
+            version=next(iter(outputs["version"].splitlines()), "Unknown"),
+            formulae=formulae,
+            casks=casks,
+            outdated_formulae=self._split_lines(outputs["outdated_formulae"]),
+            outdated_casks=self._split_lines(outputs["outdated_casks"]),
+            timings={**inventory_timing, **timings},
+            elapsed=time.perf_counter() - started,
+            installed_versions=installed_versions,
+        )
 
+    @staticmethod
+    def _error_snapshot(exc: subprocess.CalledProcessError) -> BrewSnapshot:
         return BrewSnapshot(
             available=True,
-            version=version,
-            formulae=[item for item in formulae if item],
-            casks=[item for item in casks if item],
-            outdated_formulae=[item for item in outdated_formulae if item],
-            outdated_casks=[item for item in outdated_casks if item],
+            version="Unknown",
+            formulae=[],
+            casks=[],
+            outdated_formulae=[],
+            outdated_casks=[],
+            error=(exc.stderr or "").strip() or str(exc),
         )
 
+    def read_inventory(self) -> Inventory | None:
+        """Scan the Cellar and Caskroom, or ``None`` if the layout is unexpected."""
+        prefix = self.homebrew_prefix()
+        if not prefix:
+            return None
+        inventory = FilesystemInventory(prefix)
+        try:
+            result = inventory.read()
+        except InventoryLayoutError:
+            return None
+        self._inventory = inventory
+        return result
+
+    def receipt_details(self, formulae: Iterable[str]) -> list[PackageDetails]:
+        """Dependency data for a text snapshot, read from the formulae's install receipts.
+
+        Only the filesystem backend has receipts to read; each is parsed the
+        first time it is asked for. Formulae without a readable receipt are
+        left out.
+        """
+        inventory = self._inventory
+        if inventory is None:
+            return []
+        details: list[PackageDetails] = []
+        for name in formulae:
+            receipt = inventory.receipt(name)
+            if receipt is None:
+                continue
+            dependencies = [
+                str(item["full_name"])
+                for item in receipt.get("runtime_dependencies") or []
+                if isinstance(item, dict) and item.get("full_name") and item.get("declared_directly", True)
+            ]
+            details.append(
+                PackageDetails(
+                    name=name,
+                    kind="formula",
+                    title=name,
+                    description="",
+                    homepage="",
+                    latest_version="Unknown",
+                    installed_versions=[],
+                    dependencies=dependencies,
+                    tap="",
+                    caveats="",
+                    installed_on_request=bool(receipt.get("installed_on_request", True)),
+                )
+            )
+        return details
+
     def get_package_details(self, package_name: str, package_kind: PackageKind) -> PackageDetails:
+        """Structured details for one package, served from the LRU cache when fresh.
+
+        ``raw_text`` is left empty on the structured path; call ``get_raw_info``
+        when the raw section is actually shown.
+        """
+        key = package_key(package_name, package_kind)
+        cached = self.details_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            payload = self._run(self.executable, "info", "--json=v2", package_name)
-            return self._parse_package_details_json(package_name, package_kind, payload)
+            payload = self._query(self.executable, "info", "--json=v2", package_name)
+            details = self._parse_package_details_json(package_name, package_kind, payload)
         except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, IndexError, TypeError, ValueError):
-            raw_text = self._run(self.executable, "info", self._kind_flag(package_kind), package_name)
-            return PackageDetails(
+            raw_text = self._query(self.executable, "info", self._kind_flag(package_kind), package_name)
+            details = PackageDetails(
                 name=package_name,
                 kind=package_kind,
                 title=package_name,
@@ -125,13 +473,87 @@ class BrewService:
                 caveats="",
                 raw_text=raw_text,
             )
+        self.details_cache.put(key, details)
+        return details
+
+    def cached_details(self, package_name: str, package_kind: PackageKind) -> PackageDetails | None:
+        """Details already in the cache; never spawns a process."""
+        return self.details_cache.get(package_key(package_name, package_kind))
+
+    def prefetch_details(
+        self,
+        packages: list[tuple[PackageKind, str]],
+        chunk_size: int = 25,
+        should_continue: Callable[[], bool] | None = None,
+    ) -> int:
+        """Warm the details cache with batched ``brew info --json=v2`` calls.
+
+        Packages already cached are skipped. ``should_continue`` is checked
+        before every chunk so a stale prefetch stops early. Chunks that fail
+        are skipped since prefetching is best effort. Returns how many
+        packages were added to the cache.
+        """
+        pending: dict[PackageKind, list[str]] = {}
+        for package_kind, package_name in packages:
+            names = pending.setdefault(package_kind, [])
+            if package_name not in names and package_key(package_name, package_kind) not in self.details_cache:
+                names.append(package_name)
+
+        fetched = 0
+        for package_kind, names in pending.items():
+            for start in range(0, len(names), chunk_size):
+                if should_continue is not None and not should_continue():
+                    return fetched
+                chunk = names[start:start + chunk_size]
+                try:
+                    payload = self._query(
+                        self.executable,
+                        "info",
+                        "--json=v2",
+                        self._kind_flag(package_kind),
+                        *chunk,
+                    )
+                    entries = json.loads(payload).get("casks" if package_kind == "cask" else "formulae", [])
+                    parsed = [self._details_from_entry(entry, package_kind) for entry in entries]
+                except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError, IndexError, TypeError, ValueError, AttributeError):
+                    continue
+                for item in parsed:
+                    self.details_cache.put(package_key(item.name, package_kind), item)
+                fetched += len(parsed)
+        return fetched
+
+    def fresh_details(self, packages: list[tuple[PackageKind, str]]) -> list[PackageDetails]:
+        """Details for ``packages`` after an action, fetched in batches where not cached.
+
+        Packages that ``brew info`` cannot describe are left out.
+        """
+        self.prefetch_details(packages)
+        found = (self.cached_details(package_name, package_kind) for package_kind, package_name in packages)
+        return [details for details in found if details is not None]
+
+    def get_raw_info(self, package_name: str, package_kind: PackageKind) -> str:
+        """Plain ``brew info`` text, stored on the cached details once loaded."""
+        cached = self.details_cache.get(package_key(package_name, package_kind))
+        if cached is not None and cached.raw_text:
+            return cached.raw_text
+
+        raw_text = self._query(self.executable, "info", self._kind_flag(package_kind), package_name)
+        if cached is not None:
+            cached.raw_text = raw_text
+        return raw_text
 
     def run_action(
         self,
         action: str,
         package_name: str = "",
         package_kind: PackageKind = "formula",
+        on_output: Callable[[str], None] | None = None,
     ) -> BrewCommandResult:
+        """Run a mutating action.
+
+        With ``on_output`` the command is streamed: every stdout/stderr line is
+        passed to the callback as it arrives and only a bounded tail is kept.
+        """
         command = self._build_action_command(action, package_name, package_kind)
         if command is None:
             return BrewCommandResult(
@@ -147,9 +569,18 @@ class BrewService:
                 error=f"Action '{action}' requires a package name.",
             )
 
+        self._invalidate_details_for_action(action, package_name, package_kind)
+        if on_output is not None:
+            result = self._stream(command, on_output)
+            self._invalidate_details_for_action(action, package_name, package_kind)
+            if result.succeeded:
+                result.delta = self._delta_for_action(action, package_name, package_kind)
+            return result
+
         try:
             output = self._run(*command)
         except subprocess.CalledProcessError as exc:
+            self._invalidate_details_for_action(action, package_name, package_kind)
             return BrewCommandResult(
                 command=command,
                 succeeded=False,
@@ -157,12 +588,134 @@ class BrewService:
                 error=(exc.stderr or "").strip() or str(exc),
             )
 
+        # Drop anything a concurrent details load cached while the action ran.
+        self._invalidate_details_for_action(action, package_name, package_kind)
         return BrewCommandResult(
             command=command,
             succeeded=True,
             output=output,
+            delta=self._delta_for_action(action, package_name, package_kind),
         )
 
+    def upgrade_packages(
+        self,
+        packages: Iterable[tuple[PackageKind, str]],
+        on_output: Callable[[str], None] | None = None,
+    ) -> list[BrewCommandResult]:
+        """Upgrade several packages with one ``brew upgrade`` per kind.
+
+        Each result's ``package_results`` maps package keys to whether that
+        package upgraded, and its delta only covers the ones that did.
+        """
+        groups: dict[PackageKind, list[str]] = {}
+        for package_kind, package_name in packages:
+            names = groups.setdefault(package_kind, [])
+            if package_name and package_name not in names:
+                names.append(package_name)
+
+        results: list[BrewCommandResult] = []
+        for package_kind in sorted(groups):
+            names = groups[package_kind]
+            if names:
+                results.append(self._upgrade_group(package_kind, names, on_output))
+        return results
+
+    def _upgrade_group(
+        self,
+        package_kind: PackageKind,
+        names: list[str],
+        on_output: Callable[[str], None] | None,
+    ) -> BrewCommandResult:
+        command = (self.executable, "upgrade", *(("--cask",) if package_kind == "cask" else ()), *names)
+        for name in names:
+            self.details_cache.invalidate(package_key(name, package_kind))
+
+        if on_output is not None:
+            # The streamed tail may drop early errors, so keep every error line.
+            error_lines: list[str] = []
+
+            def forward(line: str) -> None:
+                if line.startswith("Error:"):
+                    error_lines.append(line)
+                on_output(line)
+
+            result = self._stream(command, forward)
+            errors = "\n".join(error_lines)
+        else:
+            try:
+                output = self._run(*command)
+            except subprocess.CalledProcessError as exc:
+                result = BrewCommandResult(
+                    command=command,
+                    succeeded=False,
+                    output=(exc.stdout or "").strip(),
+                    error=(exc.stderr or "").strip() or str(exc),
+                    exit_code=exc.returncode,
+                )
+            else:
+                result = BrewCommandResult(command=command, succeeded=True, output=output, exit_code=0)
+            errors = result.error
+
+        for name in names:
+            self.details_cache.invalidate(package_key(name, package_kind))
+        outcomes = self._parse_upgrade_results(names, errors, result.succeeded)
+        result.package_results = {package_key(name, package_kind): upgraded for name, upgraded in outcomes.items()}
+        upgraded_names = [name for name, upgraded in outcomes.items() if upgraded]
+        if upgraded_names:
+            result.delta = SnapshotDelta(upgraded=[(package_kind, name) for name in upgraded_names])
+        return result
+
+    @staticmethod
+    def _parse_upgrade_results(names: list[str], errors: str, succeeded: bool) -> dict[str, bool]:
+        """Work out which packages of a batched upgrade failed from its ``Error:`` lines.
+
+        ``brew upgrade a b c`` keeps going after one package fails and exits
+        non-zero at the end. A package counts as failed when an error line
+        names it; a failed run whose errors name nobody fails the whole batch.
+        """
+        error_lines = [line for line in errors.splitlines() if line.lstrip().startswith("Error:")]
+        failed = {
+            name
+            for name in names
+            if any(re.search(rf"(?<![\w@.+/-]){re.escape(name)}(?![\w@.+-])", line) for line in error_lines)
+        }
+        if not succeeded and not failed:
+            failed = set(names)
+        return {name: name not in failed for name in names}
+
+    def _invalidate_details_for_action(
+        self,
+        action: str,
+        package_name: str,
+        package_kind: PackageKind,
+    ) -> None:
+        if action in self.ACTIONS:
+            self.details_cache.clear()
+        elif action.endswith("_cask"):
+            self.details_cache.invalidate(package_key(package_name, "cask"))
+        elif action.endswith("_formula"):
+            self.details_cache.invalidate(package_key(package_name, "formula"))
+        else:
+            self.details_cache.invalidate(package_key(package_name, package_kind))
+
+    @staticmethod
+    def _delta_for_action(
+        action: str,
+        package_name: str,
+        package_kind: PackageKind,
+    ) -> SnapshotDelta | None:
+        if action in {"install_formula", "install_cask"}:
+            return SnapshotDelta(added=[(action.removeprefix("install_"), package_name)])
+        if action in {"uninstall_formula", "uninstall_cask"}:
+            return SnapshotDelta(removed=[(action.removeprefix("uninstall_"), package_name)])
+        if action == "upgrade_selected":
+            return SnapshotDelta(upgraded=[(package_kind, package_name)])
+        if action == "upgrade_all":
+            return SnapshotDelta(all_upgraded=True)
+        if action == "cleanup":
+            return SnapshotDelta()
+        return None
+
     def _build_action_command(
         self,
         action: str,
@@ -189,6 +742,39 @@ class BrewService:
             )
         return None
 
+    def _run_many(
+        self,
+        commands: dict[str, tuple[str, ...]],
+    ) -> tuple[dict[str, str], dict[str, float]]:
+        """Run independent read-only commands, concurrently when workers allow.
+
+        Returns the stdout and wall time of every command keyed like ``commands``.
+        The first ``CalledProcessError`` (in ``commands`` order) is re-raised so
+        callers keep the same stderr handling as a sequential run.
+        """
+        workers = max(1, min(self.snapshot_workers, len(commands)))
+        if workers == 1:
+            results = {key: self._timed_run(args) for key, args in commands.items()}
+        else:
+            context = current_task()
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="brew-snapshot") as pool:
+                futures = {key: pool.submit(self._timed_run, args, context) for key, args in commands.items()}
+                results = {key: future.result() for key, future in futures.items()}
+
+        outputs = {key: output for key, (output, _elapsed) in results.items()}
+        timings = {" ".join(commands[key]): elapsed for key, (_output, elapsed) in results.items()}
+        return outputs, timings
+
+    def _timed_run(self, args: tuple[str, ...], context: TaskContext | None = None) -> tuple[str, float]:
+        started = time.perf_counter()
+        with bind(context or current_task()):
+            output = self._query(self.executable, *args)
+        return output, time.perf_counter() - started
+
+    @staticmethod
+    def _split_lines(output: str) -> list[str]:
+        return [item for item in output.splitlines() if item]
+
     @staticmethod
     def _kind_flag(package_kind: PackageKind) -> str:
         return "--cask" if package_kind == "cask" else "--formula"
@@ -215,47 +801,66 @@ class BrewService:
                 raise ValueError(f"No package details returned for {package_name}")
             package = entries[0]
 
+        details = self._details_from_entry(package, package_kind, fallback_name=package_name)
+        details.name = package_name
+        return details
+
+    def _details_from_entry(
+        self,
+        package: dict,
+        package_kind: PackageKind,
+        fallback_name: str = "",
+    ) -> PackageDetails:
         if package_kind == "cask":
+            name = str(package.get("token") or fallback_name)
             installed_versions = self._parse_cask_versions(package)
             latest_version = str(package.get("version") or "Unknown")
-            title = package.get("name") or package.get("token") or package_name
-            homepage = str(package.get("homepage") or "")
-            description = str(package.get("desc") or "No description available.")
-            dependencies = [str(item) for item in package.get("depends_on", {}).get("formula", [])]
-            tap = str(package.get("tap") or "")
-            caveats = str(package.get("caveats") or "")
+            title = self._cask_title(package) or name
+            dependencies = [str(item) for item in (package.get("depends_on") or {}).get("formula", [])]
+            installed_on_request = True
         else:
+            name = str(package.get("name") or fallback_name)
             installed_versions = [
                 str(item.get("version"))
                 for item in package.get("installed", [])
                 if item.get("version")
             ]
             latest_version = str(package.get("versions", {}).get("stable") or "Unknown")
-            title = package.get("name") or package_name
-            homepage = str(package.get("homepage") or "")
-            description = str(package.get("desc") or "No description available.")
+            title = name
             dependencies = [str(item) for item in package.get("dependencies", [])]
-            tap = str(package.get("tap") or "")
-            caveats = str(package.get("caveats") or "")
+            kegs = package.get("installed") or []
+            installed_on_request = not kegs or any(item.get("installed_on_request", True) for item in kegs)
+
+        if not name:
+            raise ValueError("Package entry has no name")
 
-        raw_text = self._run(self.executable, "info", self._kind_flag(package_kind), package_name)
         return PackageDetails(
-            name=package_name,
+            name=name,
             kind=package_kind,
             title=title,
-            description=description,
-            homepage=homepage,
+            description=str(package.get("desc") or "No description available."),
+            homepage=str(package.get("homepage") or ""),
             latest_version=latest_version,
             installed_versions=installed_versions,
             dependencies=dependencies,
-            tap=tap,
-            caveats=caveats,
-            raw_text=raw_text,
+            tap=str(package.get("tap") or ""),
+            caveats=str(package.get("caveats") or ""),
+            outdated=bool(package.get("outdated")),
+            installed_on_request=installed_on_request,
         )
 
+    @staticmethod
+    def _cask_title(package: dict) -> str:
+        names = package.get("name")
+        if isinstance(names, list):
+            return str(names[0]) if names else ""
+        return str(names or "")
+
     @staticmethod
     def _parse_cask_versions(package: dict) -> list[str]:
         installed_items = package.get("installed") or []
+        if isinstance(installed_items, str):
+            installed_items = [installed_items]
         versions: list[str] = []
         for item in installed_items:
             if isinstance(item, str):
@@ -264,11 +869,184 @@ class BrewService:
                 versions.append(str(item["version"]))
         return versions
 
+    def _stream(self, command: tuple[str, ...], on_line: Callable[[str], None]) -> BrewCommandResult:
+        spill = None
+        if self.stream_spill_dir is not None:
+            os.makedirs(self.stream_spill_dir, exist_ok=True)
+            spill = tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.stream_spill_dir,
+                prefix="brew-",
+                suffix=".log",
+                delete=False,
+            )
+        spill_lock = threading.Lock()
+        stdout = OutputBuffer(self.stream_tail_lines, spill=spill, lock=spill_lock)
+        stderr = OutputBuffer(self.stream_tail_lines, spill=spill, lock=spill_lock)
+
+        started_at, started = time.time(), time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                start_new_session=True,
+            )
+        except OSError as exc:
+            if spill is not None:
+                spill.close()
+                os.unlink(spill.name)
+            self._trace(command, started_at, started, None, source="stream", outcome="error")
+            return BrewCommandResult(command=command, succeeded=False, error=str(exc))
+
+        timed_out = threading.Event()
+        watchdog = None
+        if self.command_timeout is not None:
+            def expire() -> None:
+                timed_out.set()
+                terminate_process_group(process)
+
+            watchdog = threading.Timer(self.command_timeout, expire)
+            watchdog.daemon = True
+            watchdog.start()
+
+        with watch_process(process):
+            stderr_reader = threading.Thread(
+                target=self._pump_lines,
+                args=(process.stderr, stderr, on_line),
+                name="brew-stderr",
+                daemon=True,
+            )
+            stderr_reader.start()
+            self._pump_lines(process.stdout, stdout, on_line)
+            stderr_reader.join()
+            exit_code = process.wait()
+        if watchdog is not None:
+            watchdog.cancel()
+        if spill is not None:
+            spill.close()
+        self._trace(
+            command,
+            started_at,
+            started,
+            exit_code,
+            stdout.byte_count,
+            stderr.byte_count,
+            source="stream",
+            outcome="timeout" if timed_out.is_set() else None,
+        )
+        check_cancelled()
+
+        succeeded = exit_code == 0
+        error = "" if succeeded else stderr.tail() or f"Command exited with status {exit_code}."
+        if timed_out.is_set():
+            error = f"{error}\nTimed out after {self.command_timeout:g}s.".strip()
+        return BrewCommandResult(
+            command=command,
+            succeeded=succeeded,
+            output=stdout.tail(),
+            error=error,
+            exit_code=exit_code,
+            spill_path=stdout.spill_path,
+            streamed=True,
+        )
+
+    @staticmethod
+    def _pump_lines(stream, buffer: OutputBuffer, on_line: Callable[[str], None]) -> None:
+        with stream:
+            for line in stream:
+                buffer.append(line)
+                on_line(line.rstrip("\n"))
+
+    def _query(self, *args: str) -> str:
+        """Run a read-only query, through the persistent worker when one is configured.
+
+        Worker failures fall back to a fresh process; a non-zero status from
+        the worker raises ``CalledProcessError`` just like ``_run``.
+        """
+        if self.worker is None or not self.worker.supports(args[1:]):
+            return self._run(*args)
+        started_at, started = time.time(), time.perf_counter()
+        try:
+            response = self.worker.request(args[1:])
+        except WorkerError:
+            return self._run(*args)
+        self._trace(args, started_at, started, response.status, response.stdout, response.stderr, source="worker")
+        # The shared worker cannot be killed for one task; drop its answer instead.
+        check_cancelled()
+        if response.status != 0:
+            raise subprocess.CalledProcessError(
+                response.status,
+                args,
+                output=response.stdout,
+                stderr=response.stderr,
+            )
+        return response.stdout.strip()
+
     def _run(self, *args: str) -> str:
-        completed = subprocess.run(
+        check_cancelled()
+        started_at, started = time.time(), time.perf_counter()
+        with subprocess.Popen(
             args,
-            check=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
+            start_new_session=True,
+        ) as process, watch_process(process):
+            try:
+                stdout, stderr = process.communicate(timeout=self.command_timeout)
+            except subprocess.TimeoutExpired:
+                terminate_process_group(process, grace=0.5)
+                stdout, stderr = process.communicate()
+                self._trace(args, started_at, started, process.returncode, stdout, stderr, outcome="timeout")
+                check_cancelled()
+                raise CommandTimeout(args, self.command_timeout or 0.0, stdout, stderr) from None
+        self._trace(args, started_at, started, process.returncode, stdout, stderr)
+        check_cancelled()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+        return stdout.strip()
+
+    def _trace(
+        self,
+        argv: tuple[str, ...],
+        started_at: float,
+        started: float,
+        exit_code: int | None,
+        stdout: str | int = 0,
+        stderr: str | int = 0,
+        source: str = "process",
+        outcome: str | None = None,
+    ) -> None:
+        """Hand a finished command to the tracer, and to the recorder when its output is complete."""
+        if self.tracer is None and self.recorder is None:
+            return
+        wall_time = time.perf_counter() - started
+        context = current_task()
+        if outcome is None and context is not None and context.cancelled:
+            outcome = "cancelled"
+        if (
+            self.recorder is not None
+            and outcome is None
+            and exit_code is not None
+            and isinstance(stdout, str)
+            and isinstance(stderr, str)
+        ):
+            self.recorder.record(argv, stdout, stderr, exit_code, wall_time)
+        if self.tracer is None:
+            return
+        self.tracer.record(
+            argv,
+            started_at,
+            wall_time,
+            exit_code,
+            stdout,
+            stderr,
+            source=source,
+            outcome=outcome,
         )
-        return completed.stdout.strip()
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+import itertools
+import json
+from pathlib import Path
+import subprocess
+import threading
+import time
+from typing import IO, Final, Sequence
+
+
+WORKER_SCRIPT: Final[Path] = Path(__file__).with_name("brew_worker.rb")
+
+
+class WorkerError(Exception):
+    """The persistent worker could not answer; callers should fall back to a fresh process."""
+
+
+class WorkerUnsupported(WorkerError):
+    """The worker does not implement the requested query."""
+
+
+class WorkerTimeout(WorkerError):
+    """The worker did not answer in time; it has been replaced, but the query is not retried."""
+
+
+@dataclass(slots=True)
+class WorkerResponse:
+    status: int
+    stdout: str
+    stderr: str
+
+
+class BrewWorkerClient:
+    """Client for a long-lived helper that answers read-only brew queries.
+
+    The helper speaks newline-delimited JSON on stdin/stdout::
+
+        -> {"id": 1, "op": "run", "argv": ["list", "--formula"]}
+        <- {"id": 1, "ok": true, "status": 0, "stdout": "...", "stderr": ""}
+        -> {"id": 2, "op": "ping"}
+        <- {"id": 2, "ok": true, "status": 0, "stdout": "pong", "stderr": ""}
+
+    Unsupported queries answer ``{"id": n, "ok": false, "error": "..."}``.
+    Requests are matched to responses by id, so several may be in flight at
+    once. The helper is started lazily, restarted when it dies, and shut down
+    after ``idle_timeout`` seconds without requests. A helper that has sat
+    idle for ``health_check_after`` seconds is pinged before the next query,
+    so one that wedged while idle is replaced before a query waits on it.
+    """
+
+    READ_ONLY_COMMANDS: Final[frozenset[str]] = frozenset({"--version", "info", "list", "outdated", "deps"})
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        idle_timeout: float = 300.0,
+        request_timeout: float = 60.0,
+        max_restarts: int = 3,
+        health_check_after: float = 30.0,
+        ping_timeout: float = 2.0,
+    ) -> None:
+        self.command = tuple(command)
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self.max_restarts = max_restarts
+        self.health_check_after = health_check_after
+        self.ping_timeout = ping_timeout
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._process: subprocess.Popen[str] | None = None
+        self._pending: dict[int, Future[dict]] = {}
+        self._ids = itertools.count(1)
+        self._idle_timer: threading.Timer | None = None
+        self._last_used = 0.0
+        self._failures = 0
+        self._lost = False
+
+    @classmethod
+    def for_homebrew(cls, executable: str = "brew", **kwargs: float) -> BrewWorkerClient:
+        return cls((executable, "ruby", str(WORKER_SCRIPT)), **kwargs)
+
+    @property
+    def alive(self) -> bool:
+        with self._lock:
+            return self._process is not None and self._process.poll() is None
+
+    def supports(self, argv: Sequence[str]) -> bool:
+        return bool(argv) and argv[0] in self.READ_ONLY_COMMANDS
+
+    def request(self, argv: Sequence[str]) -> WorkerResponse:
+        """Run one read-only query in the worker, restarting it once if it crashed.
+
+        A timeout is not retried: the query would likely hang again, and the
+        caller is better off falling back to a fresh process right away.
+        """
+        if not self.supports(argv):
+            raise WorkerUnsupported(f"Not a read-only query: {' '.join(argv)}")
+
+        if self._idle_for() > self.health_check_after:
+            # A failed ping replaces the worker, so the query goes to a fresh one.
+            self.ping(timeout=self.ping_timeout)
+        try:
+            reply = self._send({"op": "run", "argv": list(argv)})
+        except (WorkerUnsupported, WorkerTimeout):
+            raise
+        except WorkerError:
+            reply = self._send({"op": "run", "argv": list(argv)})
+        return WorkerResponse(
+            status=int(reply.get("status", 1)),
+            stdout=str(reply.get("stdout", "")),
+            stderr=str(reply.get("stderr", "")),
+        )
+
+    def ping(self, timeout: float | None = None) -> bool:
+        try:
+            return self._send({"op": "ping"}, timeout).get("stdout") == "pong"
+        except WorkerError:
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            process = self._process
+            self._process = None
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+        if process is not None:
+            self._stop(process)
+
+    def _idle_for(self) -> float:
+        """Seconds since the running worker was last used; 0 when none is running."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                return 0.0
+            return time.monotonic() - self._last_used
+
+    def _send(self, message: dict, timeout: float | None = None) -> dict:
+        timeout = self.request_timeout if timeout is None else timeout
+        request_id = next(self._ids)
+        future: Future[dict] = Future()
+        with self._lock:
+            process = self._ensure_started()
+            self._pending[request_id] = future
+            self._last_used = time.monotonic()
+
+        line = json.dumps({"id": request_id, **message}) + "\n"
+        try:
+            with self._write_lock:
+                assert process.stdin is not None
+                process.stdin.write(line)
+                process.stdin.flush()
+            reply = future.result(timeout=timeout)
+        except FutureTimeoutError as exc:
+            # A wedged worker would block every later query; replace it.
+            self._discard(process)
+            raise WorkerTimeout(f"Worker did not answer within {timeout:g}s") from exc
+        except (OSError, ValueError) as exc:
+            self._discard(process)
+            raise WorkerError(f"Worker pipe failed: {exc}") from exc
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+        with self._lock:
+            self._failures = 0
+        if not reply.get("ok", False):
+            raise WorkerUnsupported(str(reply.get("error") or "Worker rejected the request."))
+        return reply
+
+    def _ensure_started(self) -> subprocess.Popen[str]:
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        if self._process is not None:
+            self._fail_pending(WorkerError("Worker exited."))
+            self._lost = True
+        if self._failures > self.max_restarts:
+            raise WorkerError("Worker keeps crashing; giving up.")
+
+        self._failures += 1
+        try:
+            process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+            )
+        except OSError as exc:
+            self._process = None
+            raise WorkerError(f"Cannot start worker: {exc}") from exc
+
+        self._process = process
+        # Counted here only, however the previous worker was lost.
+        if self._lost:
+            self.restarts += 1
+            self._lost = False
+        self._arm_idle_timer(self.idle_timeout)
+        threading.Thread(
+            target=self._read_responses,
+            args=(process, process.stdout),
+            name="brew-worker-reader",
+            daemon=True,
+        ).start()
+        return process
+
+    def _read_responses(self, process: subprocess.Popen[str], stream: IO[str]) -> None:
+        for line in stream:
+            try:
+                reply = json.loads(line)
+                request_id = int(reply["id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            with self._lock:
+                future = self._pending.get(request_id)
+            if future is not None:
+                try:
+                    future.set_result(reply)
+                except InvalidStateError:
+                    pass
+
+        with self._lock:
+            crashed = self._process is process
+            if crashed:
+                self._process = None
+                self._lost = True
+                self._fail_pending(WorkerError("Worker exited."))
+        if crashed:
+            process.wait()
+
+    def _fail_pending(self, error: WorkerError) -> None:
+        for future in self._pending.values():
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+    def _discard(self, process: subprocess.Popen[str]) -> None:
+        with self._lock:
+            if self._process is process:
+                self._process = None
+                self._fail_pending(WorkerError("Worker was restarted."))
+                self._lost = True
+        self._stop(process)
+
+    def _arm_idle_timer(self, delay: float) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(delay, self._shutdown_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _shutdown_if_idle(self) -> None:
+        with self._lock:
+            if self._process is None:
+                return
+            remaining = self.idle_timeout - (time.monotonic() - self._last_used)
+            if self._pending or remaining > 0:
+                self._arm_idle_timer(max(remaining, 0.05))
+                return
+        self.close()
+
+    @staticmethod
+    def _stop(process: subprocess.Popen[str]) -> None:
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -0,0 +1,111 @@
+# frozen_string_literal: true
+
+# Persistent read-only query worker for brew-gui-manager.
+#
+# Started as `brew ruby brew_worker.rb`, so Homebrew's libraries are loaded
+# once. Every request forks a child from this warm interpreter, which skips
+# the Ruby and Homebrew boot that dominates a fresh `brew` call. The
+# newline-delimited JSON protocol is documented in brew_worker.py.
+
+require "json"
+
+SUPPORTED_COMMANDS = %w[--version info list outdated deps].freeze
+
+# Keep the protocol on the original stdout and send anything else Homebrew
+# prints in this process to stderr.
+PROTOCOL = $stdout.dup
+PROTOCOL.sync = true
+$stdout.reopen($stderr)
+WRITE_LOCK = Mutex.new
+
+def respond(payload)
+  line = JSON.generate(payload)
+  WRITE_LOCK.synchronize { PROTOCOL.puts(line) }
+end
+
+def run_command(argv)
+  name, *args = argv
+  if name == "--version"
+    puts "Homebrew #{HOMEBREW_VERSION}"
+    return
+  end
+
+  require "commands"
+  path = Commands.path(name)
+  raise ArgumentError, "Unknown command: #{name}" if path.nil?
+
+  require path
+  command_class = Homebrew::AbstractCommand.command(name) if defined?(Homebrew::AbstractCommand)
+  if command_class
+    command_class.new(args).run
+  else
+    ARGV.replace(args)
+    Homebrew.public_send(Commands.method_name(name))
+  end
+end
+
+def run_in_child(argv)
+  out_read, out_write = IO.pipe
+  err_read, err_write = IO.pipe
+  pid = fork do
+    out_read.close
+    err_read.close
+    $stdin.reopen(File::NULL)
+    $stdout.reopen(out_write)
+    $stderr.reopen(err_write)
+    status = 0
+    begin
+      run_command(argv)
+    rescue SystemExit => e
+      status = e.status
+    rescue Exception => e # rubocop:disable Lint/RescueException
+      $stderr.puts "Error: #{e.message}"
+      status = 1
+    end
+    $stdout.flush
+    $stderr.flush
+    exit!(status)
+  end
+  out_write.close
+  err_write.close
+
+  stdout_reader = Thread.new { out_read.read }
+  stderr = err_read.read
+  stdout = stdout_reader.value
+  _, status = Process.wait2(pid)
+  [status.exitstatus || 1, stdout, stderr]
+ensure
+  [out_read, err_read].each { |io| io&.close unless io&.closed? }
+end
+
+workers = []
+$stdin.each_line do |line|
+  request = begin
+    JSON.parse(line)
+  rescue JSON::ParserError
+    next
+  end
+  id = request["id"]
+
+  case request["op"]
+  when "ping"
+    respond(id: id, ok: true, status: 0, stdout: "pong", stderr: "")
+  when "run"
+    argv = Array(request["argv"]).map(&:to_s)
+    unless SUPPORTED_COMMANDS.include?(argv.first)
+      respond(id: id, ok: false, error: "Unsupported query: #{argv.first}")
+      next
+    end
+
+    workers.reject!(&:stop?)
+    workers << Thread.new do
+      status, stdout, stderr = run_in_child(argv)
+      respond(id: id, ok: true, status: status, stdout: stdout, stderr: stderr)
+    rescue => e
+      respond(id: id, ok: false, error: e.message)
+    end
+  else
+    respond(id: id, ok: false, error: "Unknown op: #{request["op"]}")
+  end
+end
+workers.each(&:join)
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import sqlite3
+import threading
+from typing import Final, Iterable, Iterator
+
+from .brew_service import PackageKind
+
+
+SCHEMA_VERSION: Final[int] = 1
+_WHITESPACE: Final[re.Pattern[str]] = re.compile(r"[ \t\n\r]*")
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    name: str
+    kind: PackageKind
+    title: str
+    description: str
+    tap: str
+    version: str
+
+
+class CatalogIndex:
+    """Local full-text index over Homebrew's cached API catalog.
+
+    Homebrew downloads ``formula.jws.json`` and ``cask.jws.json`` into its
+    cache for the JSON API. ``refresh`` loads them into SQLite (FTS5 when the
+    interpreter's SQLite has it, plain ``LIKE`` otherwise) and only rebuilds a
+    source whose size/mtime changed *and* whose content hash differs.
+    Searches use a separate read connection so they stay fast while a rebuild
+    is running in a worker thread.
+    """
+
+    SOURCES: Final[dict[PackageKind, str]] = {
+        "formula": "formula.jws.json",
+        "cask": "cask.jws.json",
+    }
+
+    def __init__(self, db_path: Path, api_cache_dir: Path) -> None:
+        self.db_path = db_path
+        self.api_cache_dir = api_cache_dir
+        self._write_lock = threading.Lock()
+        self._reader: sqlite3.Connection | None = None
+        self._reader_lock = threading.Lock()
+        self.fts_enabled = False
+
+    @staticmethod
+    def default_db_path() -> Path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return Path(base) / "brew-gui-manager" / "catalog.sqlite3"
+
+    def refresh(self) -> dict[PackageKind, int]:
+        """Rebuild changed sources; returns the entry count of each rebuilt kind."""
+        rebuilt: dict[PackageKind, int] = {}
+        with self._write_lock:
+            connection = self._connect()
+            try:
+                for package_kind, filename in self.SOURCES.items():
+                    count = self._refresh_source(connection, package_kind, self.api_cache_dir / filename)
+                    if count is not None:
+                        rebuilt[package_kind] = count
+            finally:
+                connection.close()
+        return rebuilt
+
+    def search(self, query: str, limit: int = 50) -> list[CatalogEntry]:
+        terms = self._terms(query)
+        if not terms:
+            return []
+
+        connection = self._read_connection()
+        if connection is None:
+            return []
+        with self._reader_lock:
+            try:
+                if self.fts_enabled:
+                    rows = connection.execute(
+                        """
+                        SELECT name, kind, title, description, tap, version FROM catalog
+                        WHERE catalog MATCH ?
+                        ORDER BY name = ? DESC, bm25(catalog, 10.0, 6.0, 1.0, 0.5)
+                        LIMIT ?
+                        """,
+                        (" ".join(f'"{term}"*' for term in terms), query.strip().lower(), limit),
+                    ).fetchall()
+                else:
+                    where = " AND ".join(
+                        "(name LIKE ? OR token LIKE ? OR description LIKE ? OR tap LIKE ?)" for _term in terms
+                    )
+                    params = [f"%{term}%" for term in terms for _column in range(4)]
+                    rows = connection.execute(
+                        f"SELECT name, kind, title, description, tap, version FROM catalog WHERE {where} "
+                        "ORDER BY name = ? DESC, length(name) LIMIT ?",
+                        (*params, query.strip().lower(), limit),
+                    ).fetchall()
+            except sqlite3.Error:
+                return []
+        return [CatalogEntry(*row) for row in rows]
+
+    def entries(self) -> list[CatalogEntry]:
+        """Every indexed entry, for building in-memory indexes on top of the catalog."""
+        connection = self._read_connection()
+        if connection is None:
+            return []
+        with self._reader_lock:
+            try:
+                rows = connection.execute(
+                    "SELECT name, kind, title, description, tap, version FROM catalog ORDER BY kind, name"
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+        return [CatalogEntry(*row) for row in rows]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        prefix = prefix.strip().lower()
+        connection = self._read_connection()
+        if not prefix or connection is None:
+            return []
+        with self._reader_lock:
+            try:
+                rows = connection.execute(
+                    "SELECT DISTINCT name FROM catalog_names WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+                    (prefix, f"{prefix}\U0010ffff", limit),
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._reader_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def _read_connection(self) -> sqlite3.Connection | None:
+        with self._reader_lock:
+            if self._reader is None:
+                if not self.db_path.exists():
+                    return None
+                self._reader = sqlite3.connect(self.db_path, check_same_thread=False)
+                self.fts_enabled = self._has_fts(self._reader)
+            return self._reader
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._create_schema(connection)
+        self.fts_enabled = self._has_fts(connection)
+        return connection
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS catalog")
+            connection.execute("DROP TABLE IF EXISTS catalog_names")
+            connection.execute("DROP TABLE IF EXISTS sources")
+            try:
+                connection.execute(
+                    """
+                    CREATE VIRTUAL TABLE catalog USING fts5(
+                        name, token, description, tap,
+                        kind UNINDEXED, title UNINDEXED, version UNINDEXED,
+                        prefix='2 3'
+                    )
+                    """
+                )
+            except sqlite3.OperationalError:
+                connection.execute(
+                    "CREATE TABLE catalog (name, token, description, tap, kind, title, version)"
+                )
+            connection.execute("CREATE TABLE catalog_names (name TEXT NOT NULL, kind TEXT NOT NULL)")
+            connection.execute("CREATE INDEX catalog_names_name ON catalog_names (name)")
+            connection.execute(
+                "CREATE TABLE sources (kind TEXT PRIMARY KEY, mtime REAL, size INTEGER, sha256 TEXT)"
+            )
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _has_fts(connection: sqlite3.Connection) -> bool:
+        row = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'catalog'").fetchone()
+        return bool(row and "fts5" in row[0].lower())
+
+    def _refresh_source(
+        self,
+        connection: sqlite3.Connection,
+        package_kind: PackageKind,
+        path: Path,
+    ) -> int | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        known = connection.execute(
+            "SELECT mtime, size, sha256 FROM sources WHERE kind = ?",
+            (package_kind,),
+        ).fetchone()
+        if known is not None and known[0] == stat.st_mtime and known[1] == stat.st_size:
+            return None
+
+        digest = self._sha256(path)
+        if known is not None and known[2] == digest:
+            with connection:
+                connection.execute(
+                    "UPDATE sources SET mtime = ?, size = ? WHERE kind = ?",
+                    (stat.st_mtime, stat.st_size, package_kind),
+                )
+            return None
+
+        try:
+            rows = list(self._rows(self._load_entries(path), package_kind))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        with connection:
+            connection.execute("DELETE FROM catalog WHERE kind = ?", (package_kind,))
+            connection.execute("DELETE FROM catalog_names WHERE kind = ?", (package_kind,))
+            connection.executemany(
+                "INSERT INTO catalog (name, token, description, tap, kind, title, version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.executemany(
+                "INSERT INTO catalog_names (name, kind) VALUES (?, ?)",
+                ((row[0], package_kind) for row in rows),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sources (kind, mtime, size, sha256) VALUES (?, ?, ?, ?)",
+                (package_kind, stat.st_mtime, stat.st_size, digest),
+            )
+        return len(rows)
+
+    @staticmethod
+    def _load_entries(path: Path) -> Iterator[object]:
+        """Decode catalog entries one at a time.
+
+        Only the compact row tuples are kept, so the parsed tree of the whole
+        multi-megabyte catalog never exists at once.
+        """
+        text = path.read_text(encoding="utf-8")
+        start = _WHITESPACE.match(text).end()
+        # JWS files wrap the JSON array in a signed "payload" string.
+        if text.startswith("{", start):
+            document = json.loads(text)
+            if not isinstance(document, dict) or not isinstance(document.get("payload"), str):
+                raise ValueError(f"Unexpected catalog format in {path}")
+            text = document["payload"]
+            del document
+            start = _WHITESPACE.match(text).end()
+        if not text.startswith("[", start):
+            raise ValueError(f"Unexpected catalog format in {path}")
+
+        decoder = json.JSONDecoder()
+        index = _WHITESPACE.match(text, start + 1).end()
+        if text.startswith("]", index):
+            return
+        while True:
+            entry, index = decoder.raw_decode(text, index)
+            yield entry
+            index = _WHITESPACE.match(text, index).end()
+            if text.startswith("]", index):
+                return
+            if not text.startswith(",", index):
+                raise ValueError(f"Unexpected catalog format in {path}")
+            index = _WHITESPACE.match(text, index + 1).end()
+
+    @staticmethod
+    def _rows(entries: Iterable[object], package_kind: PackageKind) -> Iterator[tuple[str, ...]]:
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            if package_kind == "cask":
+                name = str(entry.get("token") or "")
+                names = entry.get("name") or []
+                title = str(names[0]) if isinstance(names, list) and names else name
+                token = " ".join([str(entry.get("full_token") or ""), *[str(item) for item in names]]).strip()
+                version = str(entry.get("version") or "")
+            else:
+                name = str(entry.get("name") or "")
+                title = name
+                aliases = [str(item) for item in entry.get("aliases") or []]
+                token = " ".join([str(entry.get("full_name") or ""), *aliases]).strip()
+                version = str((entry.get("versions") or {}).get("stable") or "")
+            if not name:
+                continue
+            yield (
+                name.lower(),
+                token,
+                str(entry.get("desc") or ""),
+                str(entry.get("tap") or ""),
+                package_kind,
+                title,
+                version,
+            )
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with path.open("rb") as stream:
+            for chunk in iter(lambda: stream.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _terms(query: str) -> list[str]:
+        return re.findall(r"[a-z0-9]+", query.lower())
@@ -0,0 +1,283 @@
+"""Structured trace of every Homebrew command the app runs.
+
+Analyze a trace with::
+
+    python -m brew_gui_manager.command_trace ~/.cache/brew-gui-manager/commands.jsonl
+    python -m brew_gui_manager.command_trace commands.jsonl --split 2024-05-01T12:00
+"""
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import json
+import math
+import os
+from pathlib import Path
+from queue import Queue
+import threading
+from typing import Final, Iterable, Iterator
+
+from .task_context import current_task
+
+
+@dataclass(slots=True)
+class TraceRecord:
+    argv: list[str]
+    started_at: float
+    wall_time: float
+    exit_code: int | None
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    task_id: int | None = None
+    source: str = "process"
+    outcome: str = "ok"
+
+    @property
+    def command_type(self) -> str:
+        return command_type(self.argv)
+
+
+@dataclass(slots=True)
+class CommandStats:
+    command_type: str
+    count: int
+    failures: int
+    p50: float
+    p95: float
+    p99: float
+    samples: list[float] = field(default_factory=list, repr=False)
+
+
+def command_type(argv: Iterable[str]) -> str:
+    """Subcommand plus flags, without the executable or package names."""
+    tokens = list(argv)[1:]
+    subcommand = next((token for token in tokens if not token.startswith("-")), "")
+    flags = [token for token in tokens if token.startswith("-")]
+    return " ".join([subcommand, *flags] if subcommand else flags)
+
+
+class CommandTrace:
+    """Append ``TraceRecord`` objects to a rotating JSONL file from a writer thread.
+
+    ``record`` only enqueues, so tracing never blocks the thread that ran
+    the command. When the file grows past ``max_bytes`` it is rotated to
+    ``.1`` … ``.<backups>``.
+    """
+
+    MAX_BYTES: Final[int] = 5 * 1024 * 1024
+    RECENT: Final[int] = 200
+
+    def __init__(self, path: Path, max_bytes: int = MAX_BYTES, backups: int = 3) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = max(0, backups)
+        self._queue: Queue[TraceRecord | None] = Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._recent: deque[TraceRecord] = deque(maxlen=self.RECENT)
+
+    @staticmethod
+    def default_path() -> Path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return Path(base) / "brew-gui-manager" / "commands.jsonl"
+
+    def record(
+        self,
+        argv: Iterable[str],
+        started_at: float,
+        wall_time: float,
+        exit_code: int | None,
+        stdout: str | int = 0,
+        stderr: str | int = 0,
+        source: str = "process",
+        outcome: str | None = None,
+    ) -> TraceRecord:
+        context = current_task()
+        entry = TraceRecord(
+            argv=list(argv),
+            started_at=started_at,
+            wall_time=wall_time,
+            exit_code=exit_code,
+            stdout_bytes=stdout if isinstance(stdout, int) else len(stdout.encode("utf-8", "replace")),
+            stderr_bytes=stderr if isinstance(stderr, int) else len(stderr.encode("utf-8", "replace")),
+            task_id=context.task_id if context is not None else None,
+            source=source,
+            outcome=outcome or ("ok" if exit_code == 0 else "failed"),
+        )
+        self._ensure_writer()
+        self._queue.put(entry)
+        self._recent.append(entry)
+        return entry
+
+    def recent(self) -> list[TraceRecord]:
+        """The last ``RECENT`` records, oldest first, without reading the file."""
+        return list(self._recent)
+
+    def files(self) -> list[Path]:
+        """The trace file and its rotated backups that exist, oldest first."""
+        return [path for path in _trace_files(self.path) if path.exists()]
+
+    def flush(self) -> None:
+        """Block until every record queued so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="command-trace", daemon=True)
+                self._thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                self._queue.task_done()
+                return
+            batch = [entry]
+            # Take whatever else is already queued and write it in one go.
+            while not self._queue.empty():
+                queued = self._queue.get()
+                if queued is None:
+                    self._queue.put(None)
+                    self._queue.task_done()
+                    break
+                batch.append(queued)
+            try:
+                self._write(batch)
+            except OSError:
+                pass
+            for _entry in batch:
+                self._queue.task_done()
+
+    def _write(self, batch: list[TraceRecord]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(asdict(entry), separators=(",", ":")) + "\n" for entry in batch)
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(payload) > self.max_bytes:
+            self._rotate()
+        with self.path.open("a", encoding="utf-8") as stream:
+            stream.write(payload)
+
+    def _rotate(self) -> None:
+        if self.backups == 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+
+def read_records(paths: Iterable[Path]) -> Iterator[TraceRecord]:
+    """Records from trace files (rotated ones included), skipping malformed lines."""
+    for path in paths:
+        try:
+            stream = path.open("r", encoding="utf-8")
+        except OSError:
+            continue
+        with stream:
+            for line in stream:
+                try:
+                    yield TraceRecord(**json.loads(line))
+                except (TypeError, ValueError):
+                    continue
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted ``values``."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(records: Iterable[TraceRecord]) -> list[CommandStats]:
+    groups: dict[str, list[TraceRecord]] = {}
+    for entry in records:
+        groups.setdefault(entry.command_type, []).append(entry)
+
+    stats: list[CommandStats] = []
+    for name, entries in groups.items():
+        samples = sorted(entry.wall_time for entry in entries)
+        stats.append(
+            CommandStats(
+                command_type=name,
+                count=len(entries),
+                failures=sum(entry.outcome != "ok" for entry in entries),
+                p50=percentile(samples, 0.50),
+                p95=percentile(samples, 0.95),
+                p99=percentile(samples, 0.99),
+                samples=samples,
+            )
+        )
+    return sorted(stats, key=lambda item: item.p95, reverse=True)
+
+
+def format_report(records: list[TraceRecord], split: float | None = None) -> str:
+    """Latency table per command type; with ``split`` compare records before and after it."""
+    if split is None:
+        lines = [f"{'command':<36} {'count':>6} {'fail':>5} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}"]
+        for item in summarize(records):
+            lines.append(
+                f"{item.command_type[:36]:<36} {item.count:>6} {item.failures:>5} "
+                f"{item.p50:>8.3f} {item.p95:>8.3f} {item.p99:>8.3f}"
+            )
+        return "\n".join(lines)
+
+    before = {item.command_type: item for item in summarize(entry for entry in records if entry.started_at < split)}
+    after = {item.command_type: item for item in summarize(entry for entry in records if entry.started_at >= split)}
+    lines = [f"{'command':<36} {'n before':>8} {'n after':>8} {'p50 before':>10} {'p50 after':>10} "
+             f"{'p95 before':>10} {'p95 after':>10} {'p95 change':>10}"]
+    for name in sorted(before.keys() | after.keys()):
+        old, new = before.get(name), after.get(name)
+        change = f"{(new.p95 / old.p95 - 1) * 100:>+9.0f}%" if old and new and old.p95 else f"{'-':>10}"
+        lines.append(
+            f"{name[:36]:<36} {old.count if old else 0:>8} {new.count if new else 0:>8} "
+            f"{_seconds(old, 'p50'):>10} {_seconds(new, 'p50'):>10} "
+            f"{_seconds(old, 'p95'):>10} {_seconds(new, 'p95'):>10} {change}"
+        )
+    return "\n".join(lines)
+
+
+def _seconds(stats: CommandStats | None, attribute: str) -> str:
+    return f"{getattr(stats, attribute):.3f}" if stats is not None else "-"
+
+
+def _trace_files(path: Path) -> list[Path]:
+    rotated = [item for item in path.parent.glob(f"{path.name}.*") if item.suffix[1:].isdecimal()]
+    rotated.sort(key=lambda item: int(item.suffix[1:]), reverse=True)
+    return [*rotated, path]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Report Homebrew command latency from a trace file.")
+    parser.add_argument("trace", nargs="?", type=Path, default=CommandTrace.default_path())
+    parser.add_argument(
+        "--split",
+        help="ISO timestamp (e.g. the time of a brew upgrade); compare latency before and after it.",
+    )
+    args = parser.parse_args(argv)
+
+    split = datetime.fromisoformat(args.split).timestamp() if args.split else None
+    records = list(read_records(_trace_files(args.trace)))
+    if not records:
+        raise SystemExit(f"No trace records found in {args.trace}")
+    print(format_report(records, split))
+
+
+if __name__ == "__main__":
+    main()
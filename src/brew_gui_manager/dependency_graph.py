@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+from .brew_service import PackageDetails, PackageKind, package_key
+
+
+class DependencyGraph:
+    """Dependency graph of the installed library, stored as adjacency lists.
+
+    Nodes are package keys (``"formula:jq"``). Each node has an integer index
+    into ``_forward`` (what it depends on) and ``_reverse`` (what depends on
+    it), so every query below is a single O(V+E) walk. Dependencies that are
+    not installed still get a node, which lets a later install attach to the
+    edges that already point at it.
+    """
+
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {}
+        self._keys: list[str] = []
+        self._forward: list[list[int]] = []
+        self._reverse: list[list[int]] = []
+        self._installed: list[bool] = []
+        self._on_request: list[bool] = []
+
+    @classmethod
+    def from_details(cls, details: Iterable[PackageDetails]) -> DependencyGraph:
+        graph = cls()
+        for item in details:
+            graph.add(item)
+        return graph
+
+    def __contains__(self, key: str) -> bool:
+        index = self._index.get(key)
+        return index is not None and self._installed[index]
+
+    def __len__(self) -> int:
+        return sum(self._installed)
+
+    def add(self, details: PackageDetails) -> None:
+        """Insert or replace an installed package and its direct dependencies."""
+        key = package_key(details.name, details.kind)
+        index = self._node(key)
+        self._drop_edges(index)
+        self._installed[index] = True
+        self._on_request[index] = details.kind == "cask" or details.installed_on_request
+        for dependency in dict.fromkeys(self._dependency_key(name) for name in details.dependencies):
+            target = self._node(dependency)
+            if target != index:
+                self._forward[index].append(target)
+                self._reverse[target].append(index)
+
+    def remove(self, package_name: str, package_kind: PackageKind) -> None:
+        """Mark a package uninstalled; edges pointing at it stay for a reinstall."""
+        index = self._index.get(package_key(package_name, package_kind))
+        if index is None:
+            return
+        self._drop_edges(index)
+        self._installed[index] = False
+        self._on_request[index] = False
+
+    def dependencies(self, package_name: str, package_kind: PackageKind = "formula") -> list[str]:
+        return self._names(self._forward, package_key(package_name, package_kind))
+
+    def dependents(self, package_name: str, package_kind: PackageKind = "formula") -> list[str]:
+        """Installed packages that directly depend on the given one."""
+        return self._names(self._reverse, package_key(package_name, package_kind))
+
+    def transitive_dependencies(self, package_name: str, package_kind: PackageKind = "formula") -> list[str]:
+        return self._closure(self._forward, package_key(package_name, package_kind))
+
+    def transitive_dependents(self, package_name: str, package_kind: PackageKind = "formula") -> list[str]:
+        """Everything installed that would break if the given package went away."""
+        return self._closure(self._reverse, package_key(package_name, package_kind))
+
+    def leaves(self) -> list[str]:
+        """Installed formulae that no other installed package depends on (``brew leaves``)."""
+        return sorted(
+            self._name(index)
+            for index, key in enumerate(self._keys)
+            if self._installed[index] and key.startswith("formula:")
+            and not any(self._installed[source] for source in self._reverse[index])
+        )
+
+    def orphans(self) -> list[str]:
+        """Formulae installed only as dependencies that nothing requested still needs.
+
+        Matches what ``brew autoremove`` would remove: a walk from every package
+        installed on request marks what is still needed, the rest is removable.
+        """
+        needed = [False] * len(self._keys)
+        queue = deque(index for index, requested in enumerate(self._on_request) if requested)
+        for index in queue:
+            needed[index] = True
+        while queue:
+            for target in self._forward[queue.popleft()]:
+                if not needed[target]:
+                    needed[target] = True
+                    queue.append(target)
+        return sorted(
+            self._name(index)
+            for index, key in enumerate(self._keys)
+            if self._installed[index] and not needed[index] and key.startswith("formula:")
+        )
+
+    def _node(self, key: str) -> int:
+        index = self._index.get(key)
+        if index is None:
+            index = len(self._keys)
+            self._index[key] = index
+            self._keys.append(key)
+            self._forward.append([])
+            self._reverse.append([])
+            self._installed.append(False)
+            self._on_request.append(False)
+        return index
+
+    def _drop_edges(self, index: int) -> None:
+        for target in self._forward[index]:
+            self._reverse[target].remove(index)
+        self._forward[index] = []
+
+    def _names(self, adjacency: list[list[int]], key: str) -> list[str]:
+        index = self._index.get(key)
+        if index is None:
+            return []
+        return sorted(self._name(target) for target in adjacency[index] if self._installed[target])
+
+    def _closure(self, adjacency: list[list[int]], key: str) -> list[str]:
+        start = self._index.get(key)
+        if start is None:
+            return []
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for target in adjacency[queue.popleft()]:
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        seen.discard(start)
+        return sorted(self._name(index) for index in seen if self._installed[index])
+
+    def _name(self, index: int) -> str:
+        return self._keys[index].partition(":")[2]
+
+    @staticmethod
+    def _dependency_key(name: str) -> str:
+        # Tap formulae can be listed by full name (``user/tap/foo``).
+        return package_key(name.rsplit("/", 1)[-1], "formula")
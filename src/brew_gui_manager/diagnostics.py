@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Final
+import zipfile
+
+from .brew_service import BrewService
+from .command_trace import percentile, summarize
+from .render_scheduler import RenderScheduler
+from .snapshot_cache import SnapshotCache
+from .task_runner import BackgroundTaskRunner
+
+
+class Diagnostics:
+    """Collect live performance data from the app's parts and bundle it for a ticket.
+
+    ``collect`` returns one JSON-serializable report: queue depth per lane,
+    queued and running tasks with their subprocesses, recent command
+    latencies from the trace, the details cache hit ratio and how long work
+    on the Tk thread takes. ``collect`` is cheap enough for the Tk thread.
+    The top ``tracemalloc`` allocators are not: walking every traced block
+    is slow, so ``refresh_allocations`` samples them, off the Tk thread and
+    on a slower timer, and ``collect`` reports the latest sample. ``export``
+    zips the report together with the cached snapshot and the command trace
+    files.
+    """
+
+    TOP_ALLOCATORS: Final[int] = 15
+
+    def __init__(
+        self,
+        runner: BackgroundTaskRunner,
+        service: BrewService,
+        scheduler: RenderScheduler | None = None,
+        cache: SnapshotCache | None = None,
+    ) -> None:
+        self.runner = runner
+        self.service = service
+        self.scheduler = scheduler
+        self.cache = cache
+        self._started_tracing = False
+        self._allocations: list[dict[str, Any]] | None = None
+
+    def start_allocation_tracking(self, frames: int = 5) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracing = True
+        if self._allocations is None:
+            self._allocations = []
+
+    def stop_allocation_tracking(self) -> None:
+        """Stop tracing, but only if this object started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._allocations = None
+
+    def refresh_allocations(self) -> list[dict[str, Any]] | None:
+        """Sample the top allocators; slow with many traced blocks, so call it off the Tk thread.
+
+        The sample is always returned, but it only replaces the cached list
+        shown by ``collect`` while tracking is on: a sample that finishes
+        after ``stop_allocation_tracking`` must not bring back stale data.
+        """
+        allocations = self._top_allocations()
+        if self._allocations is not None:
+            self._allocations = allocations
+        return allocations
+
+    def collect(self) -> dict[str, Any]:
+        runner = self.runner
+        details_cache = self.service.details_cache
+        return {
+            "collected_at": time.time(),
+            "environment": {
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "pid": os.getpid(),
+            },
+            "queues": {lane: runner.queue_depth(lane) for lane in (*runner.LANES, runner.MUTATING_LANE)},
+            "tasks": [asdict(task) for task in runner.tasks()],
+            "commands": self._command_latencies(),
+            "caches": {
+                "details": {
+                    "entries": len(details_cache),
+                    "hits": details_cache.hits,
+                    "misses": details_cache.misses,
+                    "hit_ratio": round(details_cache.hit_ratio, 3),
+                },
+            },
+            "tk_callbacks": self._tk_timings(),
+            "allocations": self._allocations,
+        }
+
+    @staticmethod
+    def format_report(report: dict[str, Any]) -> str:
+        lines = ["Task queues"]
+        lines.extend(f"  {lane:<12} {depth:>4} waiting" for lane, depth in report["queues"].items())
+
+        lines.append("\nTasks")
+        for task in report["tasks"]:
+            state = "running" if task["started"] else "queued"
+            pids = ", ".join(str(pid) for pid in task["process_ids"]) or "-"
+            lines.append(f"  #{task['task_id']:<5} {state:<8} {task['lane']:<12} pids {pids:<14} {task['description']}")
+        if not report["tasks"]:
+            lines.append("  idle")
+
+        lines.append("\nRecent commands (s)")
+        lines.append(f"  {'command':<34} {'n':>4} {'p50':>7} {'p95':>7} {'max':>7} {'fail':>5}")
+        for row in report["commands"]:
+            lines.append(
+                f"  {row['command'][:34]:<34} {row['count']:>4} {row['p50']:>7.3f} {row['p95']:>7.3f} "
+                f"{row['max']:>7.3f} {row['failures']:>5}"
+            )
+        if not report["commands"]:
+            lines.append("  no traced commands yet")
+
+        lines.append("\nCaches")
+        for name, stats in report["caches"].items():
+            lines.append(
+                f"  {name:<12} {stats['entries']:>5} entries  {stats['hits']} hits / {stats['misses']} misses"
+                f"  ({stats['hit_ratio']:.0%})"
+            )
+
+        lines.append("\nTk thread work (ms)")
+        lines.append(f"  {'callback':<34} {'n':>4} {'p50':>7} {'p95':>7} {'max':>7}")
+        for row in report["tk_callbacks"]:
+            lines.append(
+                f"  {row['name'][:34]:<34} {row['count']:>4} {row['p50']:>7.2f} {row['p95']:>7.2f} {row['max']:>7.2f}"
+            )
+
+        lines.append("\nTop allocators")
+        if report["allocations"] is None:
+            lines.append("  tracemalloc is off")
+        elif not report["allocations"]:
+            lines.append("  sampling...")
+        for row in report["allocations"] or []:
+            lines.append(f"  {row['size_kib']:>9.1f} KiB {row['count']:>7} blocks  {row['location']}")
+        return "\n".join(lines)
+
+    def export(self, destination: Path, report: dict[str, Any] | None = None) -> Path:
+        """Write the report, the cached snapshot and the command trace into one zip archive."""
+        report = report if report is not None else self.collect()
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("report.json", json.dumps(report, indent=2))
+            archive.writestr("report.txt", self.format_report(report))
+            if self.cache is not None and self.cache.path.exists():
+                archive.write(self.cache.path, "snapshot.json")
+            tracer = self.service.tracer
+            if tracer is not None:
+                tracer.flush()
+                for path in tracer.files():
+                    archive.write(path, f"trace/{path.name}")
+        return destination
+
+    def _command_latencies(self) -> list[dict[str, Any]]:
+        tracer = self.service.tracer
+        if tracer is None:
+            return []
+        return [
+            {
+                "command": stats.command_type,
+                "count": stats.count,
+                "failures": stats.failures,
+                "p50": round(stats.p50, 4),
+                "p95": round(stats.p95, 4),
+                "max": round(stats.samples[-1], 4),
+            }
+            for stats in summarize(tracer.recent())
+        ]
+
+    def _tk_timings(self) -> list[dict[str, Any]]:
+        if self.scheduler is None:
+            return []
+        rows = []
+        for name, samples in self.scheduler.timings.items():
+            ordered = sorted(samples)
+            rows.append(
+                {
+                    "name": name,
+                    "count": len(ordered),
+                    "p50": round(percentile(ordered, 0.5), 3),
+                    "p95": round(percentile(ordered, 0.95), 3),
+                    "max": round(ordered[-1], 3) if ordered else 0.0,
+                }
+            )
+        return sorted(rows, key=lambda row: row["max"], reverse=True)
+
+    def _top_allocations(self) -> list[dict[str, Any]] | None:
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_kib": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[: self.TOP_ALLOCATORS]
+        ]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import sys
+
+
+class FilterIndex:
+    """Substring filter over one list of package names.
+
+    Lowercased names are computed and interned once, together with a trigram
+    posting list per name. A query of three or more characters only scans
+    the names that contain its rarest trigram. A query that extends the
+    previous one only scans the previous matches. Results keep the order of
+    the source list.
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        # A copy: snapshot lists are patched in place by deltas, and
+        # ``matches`` must be able to see that they changed.
+        self.names = list(names)
+        self._lowered = [sys.intern(name.lower()) for name in self.names]
+        self._postings: dict[str, list[int]] | None = None
+        self._last_keyword = ""
+        self._last_rows: list[int] = list(range(len(self.names)))
+
+    def matches(self, names: list[str]) -> bool:
+        """Whether this index was built from a list equal to ``names``."""
+        return names == self.names
+
+    def search(self, keyword: str) -> list[str]:
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return self.names
+        if keyword == self._last_keyword:
+            return [self.names[row] for row in self._last_rows]
+
+        candidates: list[int] | range = range(len(self.names))
+        if self._last_keyword and self._last_keyword in keyword:
+            candidates = self._last_rows
+        if len(keyword) >= 3:
+            posting = self._rarest_posting(keyword)
+            if len(posting) < len(candidates):
+                candidates = posting
+
+        lowered = self._lowered
+        rows = [row for row in candidates if keyword in lowered[row]]
+        self._last_keyword, self._last_rows = keyword, rows
+        return [self.names[row] for row in rows]
+
+    def _rarest_posting(self, keyword: str) -> list[int]:
+        postings = self._trigram_postings()
+        rarest: list[int] | None = None
+        for start in range(len(keyword) - 2):
+            posting = postings.get(keyword[start:start + 3], [])
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+            if not rarest:
+                break
+        return rarest or []
+
+    def _trigram_postings(self) -> dict[str, list[int]]:
+        if self._postings is None:
+            postings: dict[str, list[int]] = {}
+            for row, name in enumerate(self._lowered):
+                for trigram in {name[start:start + 3] for start in range(len(name) - 2)}:
+                    postings.setdefault(trigram, []).append(row)
+            self._postings = postings
+        return self._postings
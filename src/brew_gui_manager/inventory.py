@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import re
+
+
+class InventoryLayoutError(Exception):
+    """Raised when the prefix does not look like a Homebrew installation."""
+
+
+@dataclass(slots=True)
+class Inventory:
+    formulae: list[str]
+    casks: list[str]
+    formula_versions: dict[str, list[str]] = field(default_factory=dict)
+    cask_versions: dict[str, list[str]] = field(default_factory=dict)
+
+
+class FilesystemInventory:
+    """Read installed kegs straight from ``Cellar`` and ``Caskroom``.
+
+    ``brew list`` boots Ruby only to walk these directories, so scanning them
+    with ``os.scandir`` gives the same lists in a few milliseconds. Install
+    receipts are only parsed on demand through ``receipt``.
+    """
+
+    RECEIPT_NAME = "INSTALL_RECEIPT.json"
+
+    def __init__(
+        self,
+        prefix: str | os.PathLike[str],
+        cellar: str | os.PathLike[str] | None = None,
+        caskroom: str | os.PathLike[str] | None = None,
+    ) -> None:
+        self.prefix = Path(prefix)
+        self.cellar = Path(cellar) if cellar is not None else self.prefix / "Cellar"
+        self.caskroom = Path(caskroom) if caskroom is not None else self.prefix / "Caskroom"
+        self._receipts: dict[str, dict | None] = {}
+
+    def read(self) -> Inventory:
+        if not self.cellar.is_dir():
+            raise InventoryLayoutError(f"No Homebrew Cellar found at {self.cellar}")
+
+        formula_versions = self._scan_racks(self.cellar)
+        cask_versions = self._scan_racks(self.caskroom) if self.caskroom.is_dir() else {}
+        return Inventory(
+            formulae=list(formula_versions),
+            casks=list(cask_versions),
+            formula_versions=formula_versions,
+            cask_versions=cask_versions,
+        )
+
+    def receipt(self, formula_name: str) -> dict | None:
+        """Return the parsed install receipt of the linked (or newest) keg."""
+        if formula_name in self._receipts:
+            return self._receipts[formula_name]
+
+        receipt: dict | None = None
+        rack = self.cellar / formula_name
+        versions = self._keg_versions(rack)
+        linked = self._linked_version(formula_name)
+        if linked in versions:
+            versions = [linked]
+        for version in reversed(versions):
+            try:
+                receipt = json.loads((rack / version / self.RECEIPT_NAME).read_text(encoding="utf-8"))
+                break
+            except (OSError, ValueError):
+                continue
+        self._receipts[formula_name] = receipt
+        return receipt
+
+    def _scan_racks(self, root: Path) -> dict[str, list[str]]:
+        racks: dict[str, list[str]] = {}
+        try:
+            entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+        except OSError as exc:
+            raise InventoryLayoutError(f"Cannot read {root}: {exc}") from exc
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if not entry.is_dir():
+                raise InventoryLayoutError(f"Unexpected file in {root}: {entry.name}")
+            versions = self._keg_versions(Path(entry.path))
+            if not versions:
+                continue
+            racks[entry.name] = versions
+        return racks
+
+    @classmethod
+    def _keg_versions(cls, rack: Path) -> list[str]:
+        try:
+            versions = [
+                entry.name
+                for entry in os.scandir(rack)
+                if not entry.name.startswith(".") and entry.is_dir()
+            ]
+        except OSError:
+            return []
+        return sorted(versions, key=cls._version_sort_key)
+
+    def _linked_version(self, formula_name: str) -> str:
+        try:
+            return Path(os.readlink(self.prefix / "opt" / formula_name)).name
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _version_sort_key(version: str) -> list[tuple[int, int | str]]:
+        return [
+            (0, int(part)) if part.isdigit() else (1, part)
+            for part in re.split(r"[._\-]", version)
+        ]
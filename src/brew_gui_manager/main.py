@@ -1,16 +1,41 @@
 from __future__ import annotations
 
+import os
+from pathlib import Path
 import tkinter as tk
 
 from .app import BrewManagerApp
+from .brew_replay import CommandRecorder
+from .brew_service import BrewService
+from .brew_worker import BrewWorkerClient
+from .command_trace import CommandTrace
 
 
 def main() -> None:
     root = tk.Tk()
-    BrewManagerApp(root)
-    root.mainloop()
+    worker = None
+    service = None
+    record_dir = os.environ.get("BREW_GUI_RECORD_DIR")
+    inventory_backend = os.environ.get("BREW_GUI_INVENTORY", "cli")
+    if os.environ.get("BREW_GUI_PERSISTENT_WORKER") == "1":
+        worker = BrewWorkerClient.for_homebrew()
+    if worker is not None or record_dir or inventory_backend != "cli":
+        service = BrewService(
+            # The Cellar scan replaces the `brew list` calls, which only the text snapshot makes.
+            snapshot_mode="text" if inventory_backend == "filesystem" else "json",
+            inventory_backend=inventory_backend,
+            worker=worker,
+            tracer=CommandTrace(CommandTrace.default_path()),
+            recorder=CommandRecorder(Path(record_dir)) if record_dir else None,
+        )
+    app = BrewManagerApp(root, service)
+    try:
+        root.mainloop()
+    finally:
+        app.close()
+        if worker is not None:
+            worker.close()
 
 
 if __name__ == "__main__":
     main()
-
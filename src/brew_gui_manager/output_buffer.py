@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections import deque
+import os
+import threading
+from typing import TextIO
+
+
+class OutputBuffer:
+    """Keep the last ``max_lines`` of a command's output, optionally spilling all of it.
+
+    Lines longer than ``max_line_length`` are truncated in memory but written
+    in full to the spill file, so memory stays bounded however chatty the
+    command is.
+    """
+
+    def __init__(
+        self,
+        max_lines: int = 200,
+        max_line_length: int = 4096,
+        spill: TextIO | None = None,
+        lock: threading.Lock | None = None,
+    ) -> None:
+        self.max_line_length = max_line_length
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._spill = spill
+        # Buffers sharing a spill file must share the lock that guards it.
+        self._lock = lock or threading.Lock()
+        self.line_count = 0
+        self.byte_count = 0
+
+    def append(self, line: str) -> None:
+        size = len(line.encode("utf-8", "replace"))
+        line = line.rstrip("\n")
+        with self._lock:
+            self.line_count += 1
+            self.byte_count += size
+            if len(line) > self.max_line_length:
+                self._lines.append(f"{line[:self.max_line_length]}...")
+            else:
+                self._lines.append(line)
+            if self._spill is not None:
+                self._spill.write(f"{line}\n")
+
+    def tail(self) -> str:
+        with self._lock:
+            return "\n".join(self._lines).strip()
+
+    @property
+    def truncated(self) -> bool:
+        return self.line_count > len(self._lines)
+
+    @property
+    def spill_path(self) -> str:
+        if self._spill is None:
+            return ""
+        return os.fspath(self._spill.name)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import deque
+import time
+import tkinter as tk
+from typing import Any, Callable, Final, Iterable
+
+
+class RenderScheduler:
+    """Coalesce Tk updates into one pass per frame on the Tk thread.
+
+    ``set`` records the latest value for a Tk variable, ``request`` records
+    the latest render job under a name, and ``process`` queues items for a
+    handler. All of them are applied together from a single ``after_idle``
+    callback. Items are handled first, within ``budget_ms``; anything left
+    over waits for the next frame so Tk can repaint in between. Then the
+    render jobs run, and finally variables are written, but only the ones
+    whose value actually changed.
+
+    Every method must be called on the Tk thread. ``timings`` keeps recent
+    durations per item handler and job name for diagnostics.
+    """
+
+    TIMING_SAMPLES: Final[int] = 200
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        budget_ms: float = 8.0,
+        frame_ms: int = 16,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.root = root
+        self.budget_ms = budget_ms
+        self.frame_ms = frame_ms
+        self._clock = clock
+        self._variables: dict[str, tuple[tk.Variable, Any]] = {}
+        self._jobs: dict[str, Callable[[], None]] = {}
+        self._items: deque[tuple[Callable[[Any], None], Any]] = deque()
+        self._after_id: str | None = None
+        self.frames = 0
+        self.deferred_frames = 0
+        self.skipped_writes = 0
+        self.timings: dict[str, deque[float]] = {}
+
+    def set(self, variable: tk.Variable, value: Any) -> None:
+        self._variables[str(variable)] = (variable, value)
+        self._schedule()
+
+    def request(self, name: str, job: Callable[[], None]) -> None:
+        """Run ``job`` once in the next pass; a later request with the same name replaces it."""
+        self._jobs[name] = job
+        self._schedule()
+
+    def process(self, items: Iterable[Any], handler: Callable[[Any], None]) -> None:
+        queued = len(self._items)
+        self._items.extend((handler, item) for item in items)
+        if len(self._items) != queued:
+            self._schedule()
+
+    @property
+    def pending(self) -> int:
+        return len(self._items)
+
+    def flush(self) -> None:
+        """Apply everything now, ignoring the budget."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        while self._items or self._jobs or self._variables:
+            self._run_pass(budget_ms=None)
+
+    def _record(self, name: str, seconds: float) -> None:
+        samples = self.timings.get(name)
+        if samples is None:
+            samples = self.timings[name] = deque(maxlen=self.TIMING_SAMPLES)
+        samples.append(seconds * 1000)
+
+    def _schedule(self) -> None:
+        if self._after_id is None:
+            self._after_id = self.root.after_idle(self._tick)
+
+    def _tick(self) -> None:
+        self._after_id = None
+        self.frames += 1
+        self._run_pass(self.budget_ms)
+        if self._items or self._jobs or self._variables:
+            self.deferred_frames += 1
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+
+    def _run_pass(self, budget_ms: float | None) -> None:
+        started = self._clock()
+        while self._items:
+            handler, item = self._items.popleft()
+            handled = self._clock()
+            handler(item)
+            now = self._clock()
+            self._record(getattr(handler, "__name__", "items"), now - handled)
+            if budget_ms is not None and (now - started) * 1000 >= budget_ms:
+                break
+
+        jobs, self._jobs = self._jobs, {}
+        for name, job in jobs.items():
+            job_started = self._clock()
+            job()
+            self._record(name, self._clock() - job_started)
+
+        variables, self._variables = self._variables, {}
+        for variable, value in variables.values():
+            if variable.get() == value:
+                self.skipped_writes += 1
+                continue
+            variable.set(value)
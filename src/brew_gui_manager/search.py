@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+import heapq
+import math
+import re
+from typing import Final, Iterable
+
+from .catalog_index import CatalogEntry
+
+
+@dataclass(slots=True)
+class SearchHit:
+    entry: CatalogEntry
+    score: float
+
+
+class SearchEngine:
+    """Ranked, typo-tolerant search over catalog names, titles, descriptions and taps.
+
+    Every field is tokenized once into an in-memory inverted index. Each
+    posting keeps the best field weight the token reached in that entry. A
+    query term matches vocabulary tokens exactly, by prefix, or within one
+    edit (insertion, deletion, substitution or transposition). One-edit
+    candidates come from a precomputed delete table, so nothing scans the
+    vocabulary. A match scores ``quality * field weight * idf``. Entries
+    that match more of the query terms rank higher, and an exact name beats
+    everything.
+    """
+
+    FIELD_WEIGHTS: Final[dict[str, float]] = {"name": 10.0, "title": 6.0, "description": 1.0, "tap": 0.5}
+    EXACT: Final[float] = 1.0
+    PREFIX: Final[float] = 0.7
+    FUZZY: Final[float] = 0.5
+    PREFIX_EXPANSIONS: Final[int] = 64
+    MIN_PREFIX_LENGTH: Final[int] = 2
+    MIN_FUZZY_LENGTH: Final[int] = 4
+    STOPWORDS: Final[frozenset[str]] = frozenset(
+        {"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "tool", "with"}
+    )
+
+    def __init__(self, entries: Iterable[CatalogEntry]) -> None:
+        self.entries = list(entries)
+        self._names = [entry.name.lower() for entry in self.entries]
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+        for doc, entry in enumerate(self.entries):
+            weights: dict[str, float] = {}
+            for field, weight in self.FIELD_WEIGHTS.items():
+                for token in self.tokenize(getattr(entry, field)):
+                    if weights.get(token, 0.0) < weight:
+                        weights[token] = weight
+            for token, weight in weights.items():
+                self._postings.setdefault(token, []).append((doc, weight))
+
+        self._vocabulary = sorted(self._postings)
+        total = max(len(self.entries), 1)
+        self._idf = {token: math.log(1.0 + total / len(docs)) for token, docs in self._postings.items()}
+        self._deletes: dict[str, list[str]] = {}
+        for token in self._vocabulary:
+            if len(token) >= self.MIN_FUZZY_LENGTH:
+                for variant in self._delete_variants(token):
+                    self._deletes.setdefault(variant, []).append(token)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        return re.findall(r"[a-z0-9]+", text.lower())
+
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        terms = [term for term in self.tokenize(query) if term not in self.STOPWORDS] or self.tokenize(query)
+        if not terms:
+            return []
+
+        scores: dict[int, float] = {}
+        coverage: dict[int, int] = {}
+        for term in dict.fromkeys(terms):
+            best: dict[int, float] = {}
+            for token, quality in self._expand(term).items():
+                idf = self._idf[token]
+                for doc, weight in self._postings[token]:
+                    score = quality * weight * idf
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+                coverage[doc] = coverage.get(doc, 0) + 1
+
+        wanted = len(dict.fromkeys(terms))
+        phrase = query.strip().lower()
+        for doc in scores:
+            scores[doc] *= (coverage[doc] / wanted) ** 2
+            if self._names[doc] == phrase:
+                scores[doc] += 1000.0
+            elif self._names[doc].startswith(phrase):
+                scores[doc] += 10.0
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self._names[item[0]]))
+        return [SearchHit(self.entries[doc], round(score, 4)) for doc, score in ranked]
+
+    def _expand(self, term: str) -> dict[str, float]:
+        """Vocabulary tokens matching ``term``, each with its match quality."""
+        matches: dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = self.EXACT
+
+        if len(term) >= self.MIN_PREFIX_LENGTH:
+            start = bisect_left(self._vocabulary, term)
+            for token in self._vocabulary[start:start + self.PREFIX_EXPANSIONS]:
+                if not token.startswith(term):
+                    break
+                matches.setdefault(token, self.PREFIX)
+
+        if len(term) >= self.MIN_FUZZY_LENGTH:
+            variants = self._delete_variants(term)
+            # The term has one extra character.
+            for variant in variants:
+                if variant in self._postings:
+                    matches.setdefault(variant, self.FUZZY)
+            # The term lacks a character, or has one substituted or transposed.
+            for variant in (term, *variants):
+                for token in self._deletes.get(variant, ()):
+                    if token not in matches and self._within_one_edit(term, token):
+                        matches[token] = self.FUZZY
+        return matches
+
+    @staticmethod
+    def _delete_variants(token: str) -> set[str]:
+        return {token[:index] + token[index + 1:] for index in range(len(token))}
+
+    @staticmethod
+    def _within_one_edit(left: str, right: str) -> bool:
+        if left == right:
+            return True
+        if abs(len(left) - len(right)) > 1:
+            return False
+        if len(left) > len(right):
+            left, right = right, left
+        index = 0
+        while index < len(left) and left[index] == right[index]:
+            index += 1
+        if len(left) == len(right):
+            if left[index + 1:] == right[index + 1:]:
+                return True
+            # Adjacent transposition.
+            return (
+                index + 1 < len(left)
+                and left[index] == right[index + 1]
+                and left[index + 1] == right[index]
+                and left[index + 2:] == right[index + 2:]
+            )
+        return left[index:] == right[index + 1:]
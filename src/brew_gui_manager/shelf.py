@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+from typing import Any, Callable
+
+
+class ShelfModel:
+    """Package names behind a shelf, plus the scroll window and the selection.
+
+    Rows are plain indexes into ``items``, so mapping a row to a package is a
+    list lookup and the widget never has to parse a label back into a name.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[str] = []
+        self.top = 0
+        self.visible_rows = 1
+        self.selected: int | None = None
+        self._positions: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def set_items(self, items: list[str]) -> bool:
+        """Replace the rows; returns ``False`` when nothing changed.
+
+        The selection follows its package to the new row, or is cleared when
+        the package is gone.
+        """
+        if items == self.items:
+            return False
+        selected_name = self.selected_name()
+        self.items = list(items)
+        self._positions = None
+        self.selected = self.index_of(selected_name) if selected_name is not None else None
+        self.scroll_to(self.top)
+        return True
+
+    def item(self, row: int) -> str:
+        return self.items[row]
+
+    @staticmethod
+    def label(row: int, name: str) -> str:
+        return f"{row + 1:02d}   {name}"
+
+    def index_of(self, name: str) -> int | None:
+        if self._positions is None:
+            self._positions = {item: row for row, item in enumerate(self.items)}
+        return self._positions.get(name)
+
+    def selected_name(self) -> str | None:
+        if self.selected is None or self.selected >= len(self.items):
+            return None
+        return self.items[self.selected]
+
+    def scroll_to(self, top: int) -> bool:
+        top = max(0, min(top, len(self.items) - self.visible_rows))
+        changed = top != self.top
+        self.top = top
+        return changed
+
+    def ensure_visible(self, row: int) -> bool:
+        if row < self.top:
+            return self.scroll_to(row)
+        if row >= self.top + self.visible_rows:
+            return self.scroll_to(row - self.visible_rows + 1)
+        return False
+
+    def window(self) -> list[str]:
+        """Labels for the rows currently on screen."""
+        end = min(self.top + self.visible_rows, len(self.items))
+        return [self.label(row, self.items[row]) for row in range(self.top, end)]
+
+    def visible_names(self) -> list[str]:
+        return self.items[self.top:self.top + self.visible_rows]
+
+    def neighbours(self, radius: int) -> list[str]:
+        if self.selected is None:
+            return []
+        low = max(self.selected - radius, 0)
+        return self.items[low:self.selected + radius + 1]
+
+    def fractions(self) -> tuple[float, float]:
+        """Scrollbar position as ``(first, last)`` fractions of the whole list."""
+        if not self.items:
+            return 0.0, 1.0
+        total = len(self.items)
+        return self.top / total, min(self.top + self.visible_rows, total) / total
+
+
+class VirtualShelf(tk.Frame):
+    """A listbox that only ever holds the rows on screen.
+
+    The full list lives in a ``ShelfModel``. Scrolling moves the model's
+    window and re-renders that one page with a single ``insert`` call, so a
+    shelf with tens of thousands of packages costs the same as one with
+    thirty.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        on_select: Callable[[str], None] | None = None,
+        on_scroll: Callable[[], None] | None = None,
+        **listbox_options: Any,
+    ) -> None:
+        super().__init__(parent, bg=listbox_options.get("bg", "#ffffff"))
+        self.model = ShelfModel()
+        self.on_select = on_select
+        self.on_scroll = on_scroll
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.listbox = tk.Listbox(self, exportselection=False, **listbox_options)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._handle_scrollbar)
+        self.listbox.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self._row_height = max(
+            tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+            + 2 * int(self.listbox.cget("selectborderwidth")),
+            1,
+        )
+
+        self.listbox.bind("<Configure>", self._handle_resize)
+        self.listbox.bind("<<ListboxSelect>>", self._handle_click)
+        self.listbox.bind("<MouseWheel>", self._handle_wheel)
+        self.listbox.bind("<Button-4>", lambda _event: self._scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda _event: self._scroll_by(3))
+        self.listbox.bind("<Up>", lambda _event: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda _event: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda _event: self._scroll_by(-self.model.visible_rows))
+        self.listbox.bind("<Next>", lambda _event: self._scroll_by(self.model.visible_rows))
+
+    def set_items(self, items: list[str]) -> None:
+        if self.model.set_items(items):
+            self._render()
+
+    def size(self) -> int:
+        return len(self.model)
+
+    def selected_name(self) -> str | None:
+        return self.model.selected_name()
+
+    def clear_selection(self) -> None:
+        if self.model.selected is not None:
+            self.model.selected = None
+            self.listbox.selection_clear(0, tk.END)
+
+    def _render(self) -> None:
+        model = self.model
+        self.listbox.delete(0, tk.END)
+        labels = model.window()
+        if labels:
+            self.listbox.insert(tk.END, *labels)
+        if model.selected is not None and model.top <= model.selected < model.top + len(labels):
+            self.listbox.selection_set(model.selected - model.top)
+        self.scrollbar.set(*model.fractions())
+
+    def _scroll_to(self, top: int) -> str:
+        if self.model.scroll_to(top):
+            self._render()
+            if self.on_scroll is not None:
+                self.on_scroll()
+        return "break"
+
+    def _scroll_by(self, rows: int) -> str:
+        return self._scroll_to(self.model.top + rows)
+
+    def _handle_scrollbar(self, command: str, *args: str) -> None:
+        if command == "moveto":
+            self._scroll_to(round(float(args[0]) * len(self.model)))
+        elif command == "scroll":
+            step = self.model.visible_rows if args[1] == "pages" else 1
+            self._scroll_by(int(args[0]) * step)
+
+    def _handle_wheel(self, event: tk.Event) -> str:
+        # Windows reports multiples of 120, macOS small signed steps.
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-delta or (-1 if event.delta > 0 else 1))
+
+    def _handle_resize(self, event: tk.Event) -> None:
+        rows = max(event.height // self._row_height, 1)
+        if rows != self.model.visible_rows:
+            self.model.visible_rows = rows
+            self.model.scroll_to(self.model.top)
+            self._render()
+            if self.on_scroll is not None:
+                self.on_scroll()
+
+    def _handle_click(self, _event: tk.Event) -> None:
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self._select(self.model.top + selection[0])
+
+    def _move_selection(self, step: int) -> str:
+        if not len(self.model):
+            return "break"
+        current = self.model.selected if self.model.selected is not None else self.model.top - step
+        self._select(max(0, min(current + step, len(self.model) - 1)))
+        return "break"
+
+    def _select(self, row: int) -> None:
+        self.model.selected = row
+        scrolled = self.model.ensure_visible(row)
+        self._render()
+        if scrolled and self.on_scroll is not None:
+            self.on_scroll()
+        if self.on_select is not None:
+            self.on_select(self.model.item(row))
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Final
+
+from .brew_service import BrewSnapshot, PackageDetails, PackageKind, package_key
+
+
+CACHE_SCHEMA_VERSION: Final[int] = 1
+
+
+@dataclass(slots=True)
+class CachedSnapshot:
+    snapshot: BrewSnapshot
+    saved_at: float
+    brew_version: str
+    prefix: str
+    revision: str = ""
+
+
+class SnapshotCache:
+    """Versioned on-disk copy of the last snapshot and recently loaded details.
+
+    The cache is keyed by the Homebrew prefix and version. A prefix mismatch
+    hides the whole cache; a version change drops the cached package details
+    because their metadata format and contents may have moved with Homebrew.
+    The version is checked at ``load`` through the checkout's git revision,
+    which is cheap to read, so details from an older Homebrew are never
+    painted. Details loaded one at a time are written in batches, at most
+    once per ``details_write_delay`` seconds.
+    """
+
+    DETAILS_WRITE_DELAY: Final[float] = 2.0
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_details: int = 200,
+        details_write_delay: float = DETAILS_WRITE_DELAY,
+    ) -> None:
+        self.path = path or self.default_path()
+        self.max_details = max_details
+        self.details_write_delay = details_write_delay
+        self._lock = threading.Lock()
+        self._snapshot_data: dict | None = None
+        self._saved_at = 0.0
+        self._brew_version = ""
+        self._prefix = ""
+        self._revision = ""
+        self._details: OrderedDict[str, PackageDetails] = OrderedDict()
+        self._write_timer: threading.Timer | None = None
+
+    @staticmethod
+    def default_path() -> Path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return Path(base) / "brew-gui-manager" / "snapshot.json"
+
+    def load(self, prefix: str, revision: str = "") -> CachedSnapshot | None:
+        """The cached snapshot for ``prefix``, without details if Homebrew's ``revision`` moved since."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("schema") != CACHE_SCHEMA_VERSION or data.get("prefix") != prefix:
+                return None
+            snapshot = self._snapshot_from_dict(data["snapshot"])
+            details = [PackageDetails(**item) for item in data.get("details", [])]
+            saved_at = float(data["saved_at"])
+            brew_version = str(data["brew_version"])
+            cached_revision = str(data.get("revision", ""))
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+            return None
+
+        if revision and revision != cached_revision:
+            # Homebrew was updated since: the package list is still a useful
+            # stale preview, the metadata is not.
+            snapshot.details = {}
+            details = []
+
+        with self._lock:
+            self._snapshot_data = data["snapshot"]
+            self._saved_at = saved_at
+            self._brew_version = brew_version
+            self._prefix = prefix
+            self._revision = cached_revision
+            self._details = OrderedDict((package_key(item.name, item.kind), item) for item in details)
+        return CachedSnapshot(
+            snapshot=snapshot,
+            saved_at=saved_at,
+            brew_version=brew_version,
+            prefix=prefix,
+            revision=cached_revision,
+        )
+
+    def store_snapshot(self, snapshot: BrewSnapshot, prefix: str, revision: str = "") -> None:
+        if not snapshot.available or snapshot.error:
+            return
+
+        with self._lock:
+            if snapshot.version != self._brew_version or prefix != self._prefix or revision != self._revision:
+                self._details.clear()
+            # Serialize now: the app patches the live snapshot in place later on.
+            self._snapshot_data = asdict(snapshot)
+            self._saved_at = time.time()
+            self._brew_version = snapshot.version
+            self._prefix = prefix
+            self._revision = revision
+            self._cancel_write_timer()
+            self._write(self._payload())
+
+    def store_details(self, details: PackageDetails) -> None:
+        """Remember ``details``; the file is rewritten by the next batched write."""
+        with self._lock:
+            if self._snapshot_data is None:
+                return
+            key = package_key(details.name, details.kind)
+            self._details[key] = details
+            self._details.move_to_end(key)
+            while len(self._details) > self.max_details:
+                self._details.popitem(last=False)
+            if self._write_timer is None:
+                self._write_timer = threading.Timer(self.details_write_delay, self.flush)
+                self._write_timer.daemon = True
+                self._write_timer.start()
+
+    def flush(self) -> None:
+        """Write details stored since the last write, if any."""
+        with self._lock:
+            pending = self._write_timer is not None
+            self._cancel_write_timer()
+            if pending and self._snapshot_data is not None:
+                self._write(self._payload())
+
+    def _cancel_write_timer(self) -> None:
+        if self._write_timer is not None:
+            self._write_timer.cancel()
+            self._write_timer = None
+
+    def details_for(self, package_name: str, package_kind: PackageKind) -> PackageDetails | None:
+        with self._lock:
+            return self._details.get(package_key(package_name, package_kind))
+
+    def _payload(self) -> dict:
+        return {
+            "schema": CACHE_SCHEMA_VERSION,
+            "saved_at": self._saved_at,
+            "brew_version": self._brew_version,
+            "prefix": self._prefix,
+            "revision": self._revision,
+            "snapshot": self._snapshot_data,
+            "details": [asdict(item) for item in self._details.values()],
+        }
+
+    def _write(self, payload: dict) -> bool:
+        """Atomically replace the cache file; the cache is best effort."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(
+                dir=self.path.parent,
+                prefix=f".{self.path.name}.",
+                suffix=".tmp",
+            )
+        except OSError:
+            return False
+
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as stream:
+                json.dump(payload, stream)
+            os.replace(temp_path, self.path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    @staticmethod
+    def _snapshot_from_dict(data: dict) -> BrewSnapshot:
+        fields = dict(data)
+        details = {key: PackageDetails(**item) for key, item in fields.pop("details", {}).items()}
+        return BrewSnapshot(**fields, details=details)
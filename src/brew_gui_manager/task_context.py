@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import os
+import signal
+import subprocess
+import threading
+from typing import Iterator
+import weakref
+
+
+class TaskCancelled(Exception):
+    """The running task was cancelled or hit its deadline."""
+
+
+class TaskContext:
+    """Cancellation state shared between a task, its helper threads and its subprocesses.
+
+    Subprocesses started while the context is active are registered with
+    ``watch``; ``cancel`` terminates each of their process groups, so a hung
+    ``brew`` and everything it spawned go away together.
+    """
+
+    def __init__(self, task_id: int, kill_grace: float = 3.0) -> None:
+        self.task_id = task_id
+        self.kill_grace = kill_grace
+        self.reason = ""
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "Cancelled.") -> bool:
+        """Cancel the task and stop its subprocesses; returns ``False`` if already cancelled."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return False
+            self.reason = reason
+            self._cancelled.set()
+            processes = list(self._processes)
+        for process in processes:
+            terminate_process_group(process, self.kill_grace)
+        return True
+
+    def process_ids(self) -> list[int]:
+        with self._lock:
+            return sorted(process.pid for process in self._processes)
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise TaskCancelled(self.reason)
+
+    @contextmanager
+    def watch(self, process: subprocess.Popen) -> Iterator[subprocess.Popen]:
+        with self._lock:
+            cancelled = self._cancelled.is_set()
+            if not cancelled:
+                self._processes.add(process)
+        if cancelled:
+            terminate_process_group(process, self.kill_grace)
+        try:
+            yield process
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+
+_local = threading.local()
+_escalations: weakref.WeakKeyDictionary[subprocess.Popen, threading.Timer] = weakref.WeakKeyDictionary()
+_escalations_lock = threading.Lock()
+
+
+def current_task() -> TaskContext | None:
+    return getattr(_local, "context", None)
+
+
+@contextmanager
+def bind(context: TaskContext | None) -> Iterator[TaskContext | None]:
+    """Make ``context`` current on this thread, e.g. inside a helper thread pool."""
+    previous = current_task()
+    _local.context = context
+    try:
+        yield context
+    finally:
+        _local.context = previous
+
+
+@contextmanager
+def watch_process(process: subprocess.Popen) -> Iterator[subprocess.Popen]:
+    """Register ``process`` with the current task, if any, for the duration of the block.
+
+    The block is expected to wait for ``process``; on exit a pending SIGKILL
+    from ``terminate_process_group`` is dropped if the group is already gone.
+    """
+    context = current_task()
+    try:
+        if context is None:
+            yield process
+        else:
+            with context.watch(process):
+                yield process
+    finally:
+        _settle(process)
+
+
+def check_cancelled() -> None:
+    context = current_task()
+    if context is not None:
+        context.check()
+
+
+def terminate_process_group(process: subprocess.Popen, grace: float = 3.0) -> None:
+    """Send SIGTERM to the process group and SIGKILL to it ``grace`` seconds later.
+
+    The process must have been started with ``start_new_session=True`` so its
+    group does not include this application. Returns without waiting; the
+    SIGKILL escalation runs on a timer. Neither signal is sent once the
+    group is gone, because its id may by then belong to an unrelated group.
+    The group is signalled even when the leader has exited, since its
+    children may outlive it.
+    """
+    if not _group_exists(process):
+        return
+    _signal_group(process, signal.SIGTERM)
+    timer = threading.Timer(grace, _escalate, args=(process,))
+    timer.daemon = True
+    with _escalations_lock:
+        previous = _escalations.get(process)
+        _escalations[process] = timer
+    if previous is not None:
+        previous.cancel()
+    timer.start()
+
+
+def _escalate(process: subprocess.Popen) -> None:
+    with _escalations_lock:
+        _escalations.pop(process, None)
+    if _group_exists(process):
+        _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+
+def _settle(process: subprocess.Popen) -> None:
+    """Cancel the pending SIGKILL for ``process`` if nothing is left in its group."""
+    with _escalations_lock:
+        timer = _escalations.get(process)
+        if timer is None or _group_exists(process):
+            return
+        del _escalations[process]
+    timer.cancel()
+
+
+def _group_exists(process: subprocess.Popen) -> bool:
+    # Until the leader is reaped its pid, and so the group id, cannot be reused.
+    if process.returncode is None:
+        return True
+    if not hasattr(os, "killpg"):
+        return False
+    try:
+        os.killpg(process.pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+def _signal_group(process: subprocess.Popen, signum: int) -> None:
+    # Signal the group even when the leader already exited: brew's children
+    # (curl, git, installers) may still be running in it.
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signum)
+        elif process.poll() is None and signum == signal.SIGTERM:
+            process.terminate()
+        elif process.poll() is None:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
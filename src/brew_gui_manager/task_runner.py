@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import itertools
 from queue import Empty
+from queue import PriorityQueue
 from queue import Queue
 import threading
-from typing import Any, Callable
+import time
+from typing import Any, Callable, Final
+
+from .task_context import TaskCancelled, TaskContext, bind
 
 
 @dataclass(slots=True)
@@ -14,27 +19,195 @@ class TaskEvent:
     status: str
     payload: Any = None
     error: Exception | None = None
+    lane: str = "normal"
+    queue_depth: int = 0
+    wait_time: float = 0.0
+    key: str | None = None
+    generation: int = 0
+
+
+@dataclass(slots=True)
+class TaskInfo:
+    task_id: int
+    description: str
+    lane: str
+    started: bool
+    process_ids: list[int]
+
+
+@dataclass(slots=True)
+class _QueuedTask:
+    task_id: int
+    description: str
+    fn: Callable[[], Any]
+    lane: str
+    timeout: float | None
+    context: TaskContext
+    key: str | None = None
+    generation: int = 0
+    started: bool = False
+    sequence: int = 0
+    timer: threading.Timer | None = None
+    submitted_at: float = field(default_factory=time.monotonic)
 
 
 class BackgroundTaskRunner:
-    def __init__(self) -> None:
+    """Runs tasks on a fixed pool of daemon threads and reports them as ``TaskEvent`` objects.
+
+    Tasks are queued in lanes. The shared pool always takes ``interactive``
+    work before ``normal`` work before ``background`` work. The ``mutating``
+    lane has a thread of its own and runs strictly one task at a time, in
+    submission order, so brew actions never overlap.
+
+    Tasks submitted with the same ``key`` coalesce. A newer submit replaces a
+    task with that key that is still queued; the queued task keeps its id
+    and its place in line, unless the newer submit asked for another lane,
+    in which case it moves to the back of that lane. With ``join=True`` the submit returns the id of a
+    task with that key that is already running instead of starting another
+    one. Each new submit for a key gets a higher ``generation``, so consumers
+    can drop results older than the ones they already show.
+
+    ``notifier``, when given, is called from the emitting thread after every
+    event so the consumer can wake up instead of polling.
+
+    ``started`` is emitted when a worker picks the task up and carries how
+    long it waited and how many tasks are still queued in its lane. Every
+    task ends with exactly one ``completed``, ``failed`` or ``cancelled``
+    event. ``cancel`` (or an expired ``timeout``) emits ``cancelled`` right
+    away and kills the task's subprocess groups; whatever the thread returns
+    afterwards is dropped.
+    """
+
+    LANES: Final[dict[str, int]] = {"interactive": 0, "normal": 1, "background": 2}
+    MUTATING_LANE: Final[str] = "mutating"
+
+    def __init__(self, max_workers: int = 4, notifier: Callable[[], None] | None = None) -> None:
+        self.max_workers = max(1, max_workers)
+        self.notifier = notifier
         self._events: Queue[TaskEvent] = Queue()
         self._lock = threading.Lock()
         self._next_task_id = 1
+        self._local = threading.local()
+        self._running: dict[int, _QueuedTask] = {}
+        self._keyed: dict[str, _QueuedTask] = {}
+        self._generations: dict[str, int] = {}
+        self._shared: PriorityQueue[tuple[int, int, _QueuedTask]] = PriorityQueue()
+        self._mutating: Queue[tuple[int, _QueuedTask]] = Queue()
+        self._sequence = itertools.count()
+        self._depth = {lane: 0 for lane in (*self.LANES, self.MUTATING_LANE)}
+        self._threads: list[threading.Thread] = []
 
-    def submit(self, description: str, fn: Callable[[], Any]) -> int:
+    def submit(
+        self,
+        description: str,
+        fn: Callable[[], Any],
+        timeout: float | None = None,
+        lane: str = "normal",
+        key: str | None = None,
+        join: bool = False,
+    ) -> int:
+        """Queue ``fn`` in ``lane``; ``timeout`` counts from when it starts running."""
+        if lane not in self.LANES and lane != self.MUTATING_LANE:
+            raise ValueError(f"Unknown task lane: {lane}")
         with self._lock:
-            task_id = self._next_task_id
-            self._next_task_id += 1
-
-        self._events.put(TaskEvent(task_id=task_id, description=description, status="started"))
-        thread = threading.Thread(
-            target=self._run_task,
-            args=(task_id, description, fn),
-            daemon=True,
+            existing = self._keyed.get(key) if key is not None else None
+            if existing is not None and existing.started and join:
+                return existing.task_id
+
+            generation = 0
+            if key is not None:
+                generation = self._generations.get(key, 0) + 1
+                self._generations[key] = generation
+            if existing is not None and not existing.started:
+                existing.description = description
+                existing.fn = fn
+                existing.timeout = timeout
+                existing.generation = generation
+                if existing.lane == lane:
+                    return existing.task_id
+                # Re-queue in the new lane; the entry left in the old one is skipped.
+                self._depth[existing.lane] -= 1
+                self._depth[lane] += 1
+                existing.lane = lane
+                existing.sequence = next(self._sequence)
+                task = existing
+            else:
+                task_id = self._next_task_id
+                self._next_task_id += 1
+                task = _QueuedTask(task_id, description, fn, lane, timeout, TaskContext(task_id), key, generation)
+                task.sequence = next(self._sequence)
+                self._running[task_id] = task
+                if key is not None:
+                    self._keyed[key] = task
+                self._depth[lane] += 1
+                self._ensure_workers()
+
+        if lane == self.MUTATING_LANE:
+            self._mutating.put((task.sequence, task))
+        else:
+            self._shared.put((self.LANES[lane], task.sequence, task))
+        return task.task_id
+
+    def cancel(self, task_id: int, reason: str = "Cancelled by user.") -> bool:
+        """Cancel a queued or running task; returns ``False`` when it already finished."""
+        task = self._finish(task_id)
+        if task is None:
+            return False
+        task.context.cancel(reason)
+        self._emit(
+            TaskEvent(
+                task_id=task_id,
+                description=task.description,
+                status="cancelled",
+                error=TaskCancelled(reason),
+                lane=task.lane,
+                key=task.key,
+                generation=task.generation,
+            )
         )
-        thread.start()
-        return task_id
+        return True
+
+    def is_running(self, task_id: int) -> bool:
+        with self._lock:
+            return task_id in self._running
+
+    @property
+    def idle(self) -> bool:
+        """No task is queued or running and every event has been drained."""
+        with self._lock:
+            return not self._running and self._events.empty()
+
+    def queue_depth(self, lane: str | None = None) -> int:
+        """Tasks waiting for a worker, in one lane or in all of them."""
+        with self._lock:
+            return self._depth[lane] if lane is not None else sum(self._depth.values())
+
+    def tasks(self) -> list[TaskInfo]:
+        """Queued and running tasks with the subprocesses each one is waiting on."""
+        with self._lock:
+            tasks = list(self._running.values())
+        return [
+            TaskInfo(task.task_id, task.description, task.lane, task.started, task.context.process_ids())
+            for task in tasks
+        ]
+
+    def progress_reporter(self) -> Callable[[Any], None]:
+        """Return a callback that emits ``progress`` events for the current task.
+
+        Call it from inside a task; the returned callback is bound to that task
+        and may then be used from any thread, such as a subprocess pipe reader.
+        """
+        task = getattr(self._local, "task", None)
+        if task is None:
+            raise RuntimeError("progress_reporter() must be called from a running task.")
+        task_id, description = task
+
+        def report(payload: Any) -> None:
+            self._emit(
+                TaskEvent(task_id=task_id, description=description, status="progress", payload=payload)
+            )
+
+        return report
 
     def drain_events(self) -> list[TaskEvent]:
         events: list[TaskEvent] = []
@@ -44,25 +217,111 @@ class BackgroundTaskRunner:
             except Empty:
                 return events
 
-    def _run_task(self, task_id: int, description: str, fn: Callable[[], Any]) -> None:
+    def _emit(self, event: TaskEvent) -> None:
+        self._events.put(event)
+        if self.notifier is not None:
+            self.notifier()
+
+    def _ensure_workers(self) -> None:
+        if self._threads:
+            return
+        for index in range(self.max_workers):
+            self._threads.append(
+                threading.Thread(target=self._work_shared, name=f"task-worker-{index}", daemon=True)
+            )
+        self._threads.append(threading.Thread(target=self._work_mutating, name="task-mutating", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def _work_shared(self) -> None:
+        while True:
+            _priority, sequence, task = self._shared.get()
+            self._run_task(task, sequence)
+
+    def _work_mutating(self) -> None:
+        while True:
+            sequence, task = self._mutating.get()
+            self._run_task(task, sequence)
+
+    def _run_task(self, task: _QueuedTask, sequence: int) -> None:
+        with self._lock:
+            if task.task_id not in self._running or sequence != task.sequence:
+                # Cancelled while it was still queued (``_finish`` already
+                # took it off the depth count), or moved to another lane.
+                return
+            self._depth[task.lane] -= 1
+            depth = self._depth[task.lane]
+            # Coalescing may have swapped the work while it was queued; from
+            # here on it is fixed.
+            task.started = True
+            task_id, description, fn, lane = task.task_id, task.description, task.fn, task.lane
+            key, generation = task.key, task.generation
+            if task.timeout is not None:
+                reason = f"Timed out after {task.timeout:g}s."
+                task.timer = threading.Timer(task.timeout, self.cancel, args=(task_id, reason))
+                task.timer.daemon = True
+
+        self._emit(
+            TaskEvent(
+                task_id=task_id,
+                description=description,
+                status="started",
+                lane=lane,
+                queue_depth=depth,
+                wait_time=time.monotonic() - task.submitted_at,
+                key=key,
+                generation=generation,
+            )
+        )
+        if task.timer is not None:
+            task.timer.start()
+
+        self._local.task = (task_id, description)
         try:
-            payload = fn()
+            with bind(task.context):
+                payload = fn()
         except Exception as exc:  # noqa: BLE001
-            self._events.put(
+            if self._finish(task_id) is None:
+                return
+            self._emit(
                 TaskEvent(
                     task_id=task_id,
                     description=description,
                     status="failed",
                     error=exc,
+                    lane=lane,
+                    queue_depth=self.queue_depth(lane),
+                    key=key,
+                    generation=generation,
                 )
             )
             return
+        finally:
+            self._local.task = None
 
-        self._events.put(
+        if self._finish(task_id) is None:
+            return
+        self._emit(
             TaskEvent(
                 task_id=task_id,
                 description=description,
                 status="completed",
                 payload=payload,
+                lane=lane,
+                queue_depth=self.queue_depth(lane),
+                key=key,
+                generation=generation,
             )
         )
+
+    def _finish(self, task_id: int) -> _QueuedTask | None:
+        """Claim the task's terminal event; ``None`` means it was already claimed."""
+        with self._lock:
+            task = self._running.pop(task_id, None)
+            if task is not None and task.key is not None and self._keyed.get(task.key) is task:
+                del self._keyed[task.key]
+            if task is not None and not task.started:
+                self._depth[task.lane] -= 1
+        if task is not None and task.timer is not None:
+            task.timer.cancel()
+        return task
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import threading
+import tkinter as tk
+from typing import Callable
+
+
+class TkWakeup:
+    """Wake the Tk main loop from worker threads through a self-pipe.
+
+    ``notify`` may be called from any thread. The first call after the
+    callback has run writes one byte to a pipe that Tk watches with
+    ``createfilehandler``, so the callback runs on the Tk thread as soon as
+    the loop is free. Later calls are no-ops until the callback has run, so a
+    burst of events costs a single wakeup.
+
+    Where file handlers are unavailable (Windows, or a Tk build without
+    them) ``mode`` is ``"poll"`` and ``notify`` does nothing; the caller must
+    keep polling while it has work outstanding.
+    """
+
+    def __init__(self, root: tk.Misc, callback: Callable[[], None]) -> None:
+        self.root = root
+        self.callback = callback
+        self.mode = "poll"
+        self._signalled = threading.Event()
+        self._read_fd: int | None = None
+        self._write_fd: int | None = None
+        if os.name != "posix" or not hasattr(root.tk, "createfilehandler"):
+            return
+
+        read_fd, write_fd = os.pipe()
+        try:
+            os.set_blocking(read_fd, False)
+            os.set_blocking(write_fd, False)
+            root.tk.createfilehandler(read_fd, tk.READABLE, self._on_readable)
+        except (OSError, tk.TclError):
+            os.close(read_fd)
+            os.close(write_fd)
+            return
+        self._read_fd, self._write_fd = read_fd, write_fd
+        self.mode = "pipe"
+
+    def notify(self) -> None:
+        write_fd = self._write_fd
+        if write_fd is None or self._signalled.is_set():
+            return
+        self._signalled.set()
+        try:
+            os.write(write_fd, b"\0")
+        except (BlockingIOError, OSError):
+            # A full pipe already guarantees a wakeup; a closed one means shutdown.
+            pass
+
+    def close(self) -> None:
+        if self._read_fd is None:
+            return
+        try:
+            self.root.tk.deletefilehandler(self._read_fd)
+        except tk.TclError:
+            pass
+        read_fd, write_fd = self._read_fd, self._write_fd
+        self._read_fd = self._write_fd = None
+        self.mode = "poll"
+        for fd in (read_fd, write_fd):
+            if fd is not None:
+                os.close(fd)
+
+    def _on_readable(self, _fd: int, _mask: int) -> None:
+        if self._read_fd is None:
+            return
+        try:
+            while os.read(self._read_fd, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        # Clear before the callback: anything queued while it runs signals again.
+        self._signalled.clear()
+        self.callback()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+
+from .brew_service import PackageKind, package_key
+
+
+class UpgradeQueue:
+    """Collects upgrade requests so they can be flushed as one batch.
+
+    Requests are de-duplicated against both the pending set and the batch
+    currently being upgraded, and keep the order they were queued in.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[str, tuple[PackageKind, str]] = {}
+        self._in_flight: set[str] = set()
+
+    def add(self, package_name: str, package_kind: PackageKind) -> bool:
+        """Queue a package; returns ``False`` when it is already queued or upgrading."""
+        key = package_key(package_name, package_kind)
+        with self._lock:
+            if key in self._pending or key in self._in_flight:
+                return False
+            self._pending[key] = (package_kind, package_name)
+            return True
+
+    def drain(self) -> list[tuple[PackageKind, str]]:
+        """Take every pending request and mark it in flight until ``finish``."""
+        with self._lock:
+            batch = list(self._pending.values())
+            self._in_flight.update(self._pending)
+            self._pending.clear()
+            return batch
+
+    def finish(self, batch: list[tuple[PackageKind, str]]) -> None:
+        with self._lock:
+            for package_kind, package_name in batch:
+                self._in_flight.discard(package_key(package_name, package_kind))
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._in_flight)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._pending or key in self._in_flight
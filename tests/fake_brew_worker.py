@@ -0,0 +1,48 @@
+"""Stand-in for brew_worker.rb that speaks the same line protocol without Homebrew."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import sys
+import time
+
+
+def answer(argv: list[str]) -> tuple[int, str, str]:
+    if argv == ["--version"]:
+        return 0, f"Homebrew 4.3.0 (worker {os.getpid()})\n", ""
+    if argv == ["list", "--formula"]:
+        return 0, "wget\njq\n", ""
+    if argv[:1] == ["info"] and argv[-1] == "crash-once":
+        marker = Path(os.environ["FAKE_WORKER_MARKER"])
+        if not marker.exists():
+            marker.write_text("crashed", encoding="utf-8")
+            sys.exit(1)
+        return 0, '{"formulae":[{"name":"crash-once"}],"casks":[]}', ""
+    if argv[:1] == ["info"] and argv[-1] == "hang":
+        time.sleep(30)
+    if argv[:1] == ["info"] and argv[-1] == "missing":
+        return 1, "", "Error: No available formula with the name \"missing\"."
+    if argv[:1] == ["info"]:
+        return 0, '{"formulae":[{"name":"%s","desc":"from worker"}],"casks":[]}' % argv[-1], ""
+    return -1, "", ""
+
+
+def main() -> None:
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("op") == "ping":
+            reply = {"id": request["id"], "ok": True, "status": 0, "stdout": "pong", "stderr": ""}
+        else:
+            status, stdout, stderr = answer(request.get("argv", []))
+            if status < 0:
+                reply = {"id": request["id"], "ok": False, "error": "Unsupported query"}
+            else:
+                reply = {"id": request["id"], "ok": True, "status": status, "stdout": stdout, "stderr": stderr}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+import tempfile
+import unittest
+
+from brew_gui_manager.activity_log import ActivityLog
+
+
+class ActivityLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.path = Path(self._tempdir.name) / "activity.log.gz"
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_ring_keeps_recent_entries_and_spills_older_ones(self) -> None:
+        log = ActivityLog(self.path, capacity=5, spill_batch=3)
+        for index in range(12):
+            log.append(f"line {index}", kind="output" if index % 2 else "message")
+
+        self.assertEqual(len(log), 5)
+        self.assertEqual([entry.text for entry in log.recent(2)], ["line 10", "line 11"])
+        self.assertTrue(self.path.exists())
+        self.assertEqual(log.recent(1)[0].render(), "line 11\n")
+        self.assertEqual(log.recent(2)[0].render(), "line 10\n\n")
+
+    def test_search_reads_spilled_buffered_and_recent_entries(self) -> None:
+        log = ActivityLog(self.path, capacity=4, spill_batch=3)
+        for index in range(20):
+            log.append(f"Upgraded pkg-{index}" if index % 5 == 0 else f"noise {index}")
+
+        matches = log.search("UPGRADED", limit=10)
+
+        self.assertEqual([entry.text for entry in matches], [f"Upgraded pkg-{index}" for index in (15, 10, 5, 0)])
+        self.assertEqual([entry.text for entry in log.search("upgraded", limit=2)], ["Upgraded pkg-15", "Upgraded pkg-10"])
+        self.assertEqual(log.search("  "), [])
+
+    def test_around_returns_context_in_order(self) -> None:
+        log = ActivityLog(self.path, capacity=3, spill_batch=2)
+        entries = [log.append(f"entry {index}") for index in range(10)]
+        log.flush()
+
+        context = log.around(entries[2].seq, radius=2)
+
+        self.assertEqual([entry.text for entry in context], [f"entry {index}" for index in range(5)])
+        self.assertEqual([entry.text for entry in log.around(entries[9].seq, radius=1)], ["entry 8", "entry 9"])
+
+    def test_search_ignores_bytes_past_the_last_complete_member(self) -> None:
+        log = ActivityLog(self.path, capacity=1, spill_batch=2)
+        for index in range(5):
+            log.append(f"entry {index}")
+        with self.path.open("ab") as stream:
+            stream.write(b"\x1f\x8b partial member")
+
+        self.assertEqual([entry.text for entry in log.search("entry", limit=10)], [f"entry {index}" for index in range(4, -1, -1)])
+
+    def test_new_session_rotates_the_previous_file(self) -> None:
+        first = ActivityLog(self.path, capacity=1, spill_batch=1)
+        first.append("old session")
+        first.append("old session tail")
+        first.close()
+
+        second = ActivityLog(self.path, capacity=1, spill_batch=1)
+
+        self.assertTrue(self.path.with_name("activity.log.1.gz").exists())
+        self.assertEqual(second.search("old session"), [])
+
+    def test_without_a_path_entries_past_the_ring_are_dropped(self) -> None:
+        log = ActivityLog(None, capacity=2, spill_batch=1)
+        for index in range(5):
+            log.append(f"entry {index}")
+
+        self.assertEqual([entry.text for entry in log.search("entry")], ["entry 4", "entry 3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+import stat
+import subprocess
+import tempfile
+import unittest
+
+from brew_gui_manager.brew_replay import (
+    CommandRecorder,
+    Fixture,
+    FixtureStore,
+    ReplayPolicy,
+    replay,
+    write_replay_executable,
+)
+from brew_gui_manager.brew_service import BrewService
+
+
+class BrewReplayTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tempdir.name)
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_recorder_captures_commands_run_by_the_service(self) -> None:
+        brew = self.root / "bin" / "brew"
+        brew.parent.mkdir()
+        brew.write_text('#!/bin/sh\necho "out $*"\necho "note" >&2\n[ "$1" = "info" ] && exit 1\nexit 0\n', encoding="utf-8")
+        brew.chmod(brew.stat().st_mode | stat.S_IXUSR)
+        service = BrewService(executable=str(brew), recorder=CommandRecorder(self.root / "fixtures"))
+
+        self.assertEqual(service._run(str(brew), "list", "--formula"), "out list --formula")
+        with self.assertRaises(subprocess.CalledProcessError):
+            service._run(str(brew), "info", "--json=v2", "wget")
+
+        store = FixtureStore(self.root / "fixtures")
+        listed = store.load(["list", "--formula"])
+        failed = store.load(["info", "--json=v2", "wget"])
+        self.assertEqual((listed.stdout, listed.stderr, listed.exit_code), ("out list --formula\n", "note\n", 0))
+        self.assertEqual(failed.exit_code, 1)
+        self.assertGreaterEqual(listed.wall_time, 0)
+        self.assertEqual(len(list(store)), 2)
+
+    def test_replay_injects_latency_jitter_and_failures(self) -> None:
+        store = FixtureStore(self.root)
+        store.save(Fixture(["--version"], "Homebrew 4.4.2\n", "", 0, wall_time=0.5))
+        delays: list[float] = []
+
+        served = replay(store, ["--version"], ReplayPolicy(latency_ms=100, jitter_ms=20, seed=7), delays.append)
+        again = replay(store, ["--version"], ReplayPolicy(latency_ms=100, jitter_ms=20, seed=7), delays.append)
+        timed = replay(store, ["--version"], ReplayPolicy(recorded_timing=True), delays.append)
+        failed = replay(store, ["--version"], ReplayPolicy(fail_matching="--version"), delays.append)
+        missing = replay(store, ["list", "--cask"], ReplayPolicy(), delays.append)
+
+        self.assertEqual(served.stdout, "Homebrew 4.4.2\n")
+        self.assertTrue(0.08 <= delays[0] <= 0.12)
+        self.assertEqual(delays[0], delays[1])
+        self.assertEqual(again, served)
+        self.assertEqual(delays[2], 0.5)
+        self.assertEqual(len(delays), 3)
+        self.assertEqual((timed.exit_code, failed.exit_code), (0, 1))
+        self.assertIn("injected failure", failed.stderr)
+        self.assertIn("no recorded fixture", missing.stderr)
+
+    def test_environment_overrides_the_installed_policy(self) -> None:
+        policy = ReplayPolicy(latency_ms=5, seed=1).with_environment(
+            {"BREW_REPLAY_FAILURE_RATE": "1", "BREW_REPLAY_RECORDED_TIMING": "yes", "BREW_REPLAY_SEED": ""}
+        )
+
+        self.assertEqual(policy, ReplayPolicy(latency_ms=5, failure_rate=1.0, recorded_timing=True, seed=None))
+
+    def test_replay_executable_serves_fixtures(self) -> None:
+        store = FixtureStore(self.root / "fixtures")
+        store.save(Fixture(["list", "--formula"], "wget\njq\n", "", 0))
+        store.save(Fixture(["info", "--json=v2", "nope"], "", "Error: No available formula\n", 1))
+        brew = write_replay_executable(self.root / "bin", self.root / "fixtures")
+
+        listed = subprocess.run([str(brew), "list", "--formula"], capture_output=True, text=True)
+        failed = subprocess.run([str(brew), "info", "--json=v2", "nope"], capture_output=True, text=True)
+
+        self.assertEqual((listed.returncode, listed.stdout), (0, "wget\njq\n"))
+        self.assertEqual((failed.returncode, failed.stderr), (1, "Error: No available formula\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,32 @@
 from __future__ import annotations
 
+import os
+from pathlib import Path
+import signal
+import stat
+import subprocess
+import tempfile
+import threading
+import time
 import unittest
 from subprocess import CalledProcessError
 from unittest.mock import patch
 
-from brew_gui_manager.brew_service import BrewCommandResult, BrewService
+from brew_gui_manager.brew_replay import ReplayPolicy, write_replay_executable
+from brew_gui_manager.brew_service import (
+    BrewCommandResult,
+    BrewService,
+    BrewSnapshot,
+    CommandTimeout,
+    PackageDetails,
+    SnapshotDelta,
+)
+from brew_gui_manager.command_trace import CommandTrace, read_records
+from brew_gui_manager.task_context import terminate_process_group, watch_process
+from brew_gui_manager.task_runner import BackgroundTaskRunner
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "brew"
 
 
 class BrewServiceTests(unittest.TestCase):
@@ -39,6 +61,51 @@ class BrewServiceTests(unittest.TestCase):
         self.assertEqual(snapshot.outdated_formulae, ["git"])
         self.assertEqual(snapshot.outdated_casks, ["wezterm"])
 
+    def test_collect_snapshot_runs_commands_concurrently(self) -> None:
+        service = BrewService(snapshot_workers=5)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def slow_run(*args: str) -> str:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return "Homebrew 4.3.0" if args[1] == "--version" else ""
+
+        with patch.object(service, "is_available", return_value=True):
+            with patch.object(service, "_run", side_effect=slow_run):
+                snapshot = service.collect_snapshot()
+
+        self.assertEqual(snapshot.version, "Homebrew 4.3.0")
+        self.assertGreater(peak, 1)
+        self.assertEqual(
+            set(snapshot.timings),
+            {"--version", "list --formula", "list --cask", "outdated --quiet --formula", "outdated --quiet --cask"},
+        )
+        self.assertLess(snapshot.elapsed, sum(snapshot.timings.values()))
+
+    def test_collect_snapshot_respects_single_worker_limit(self) -> None:
+        service = BrewService(snapshot_workers=1)
+        calls: list[tuple[str, ...]] = []
+
+        def fake_run(*args: str) -> str:
+            calls.append(args)
+            self.assertEqual(threading.current_thread(), threading.main_thread())
+            return "Homebrew 4.3.0" if args[1] == "--version" else ""
+
+        with patch.object(service, "is_available", return_value=True):
+            with patch.object(service, "_run", side_effect=fake_run):
+                snapshot = service.collect_snapshot()
+
+        self.assertEqual(snapshot.error, "")
+        self.assertEqual(calls[0], ("brew", "--version"))
+        self.assertEqual(len(calls), 5)
+
     def test_collect_snapshot_handles_subprocess_failure(self) -> None:
         service = BrewService()
 
@@ -52,6 +119,123 @@ class BrewServiceTests(unittest.TestCase):
         self.assertTrue(snapshot.available)
         self.assertEqual(snapshot.error, "mocked failure")
 
+    def test_collect_snapshot_from_installed_json(self) -> None:
+        service = BrewService(snapshot_mode="json")
+        payload = (
+            '{"formulae":[{"name":"wget","desc":"internet retriever","tap":"homebrew/core",'
+            '"versions":{"stable":"1.2.3"},"installed":[{"version":"1.2.2"}],"dependencies":["pcre2"],'
+            '"outdated":true},{"name":"pcre2","desc":"regex","tap":"homebrew/core",'
+            '"versions":{"stable":"10.42"},"installed":[{"version":"10.42","installed_on_request":false}],"dependencies":[],"outdated":false}],'
+            '"casks":[{"token":"iterm2","name":["iTerm2"],"desc":"terminal","tap":"homebrew/cask",'
+            '"version":"3.5.0","installed":"3.4.0","outdated":true}]}'
+        )
+        responses = {
+            ("brew", "--version"): "Homebrew 4.3.0",
+            ("brew", "info", "--json=v2", "--installed"): payload,
+        }
+
+        with patch.object(service, "is_available", return_value=True):
+            with patch.object(service, "_run", side_effect=lambda *args: responses[args]) as run_mock:
+                snapshot = service.collect_snapshot()
+
+        self.assertEqual(run_mock.call_count, 2)
+        self.assertEqual(snapshot.version, "Homebrew 4.3.0")
+        self.assertEqual(snapshot.formulae, ["wget", "pcre2"])
+        self.assertEqual(snapshot.casks, ["iterm2"])
+        self.assertEqual(snapshot.outdated_formulae, ["wget"])
+        self.assertEqual(snapshot.outdated_casks, ["iterm2"])
+        wget = snapshot.details_for("wget", "formula")
+        self.assertIsNotNone(wget)
+        self.assertEqual(wget.installed_versions, ["1.2.2"])
+        self.assertEqual(wget.dependencies, ["pcre2"])
+        self.assertEqual(wget.tap, "homebrew/core")
+        self.assertTrue(wget.installed_on_request)
+        self.assertFalse(snapshot.details_for("pcre2", "formula").installed_on_request)
+        iterm = snapshot.details_for("iterm2", "cask")
+        self.assertEqual(iterm.title, "iTerm2")
+        self.assertEqual(iterm.installed_versions, ["3.4.0"])
+        self.assertEqual(iterm.description, "terminal")
+
+    def test_collect_snapshot_json_with_empty_version_output(self) -> None:
+        service = BrewService(snapshot_mode="json")
+        responses = {
+            ("brew", "--version"): "",
+            ("brew", "info", "--json=v2", "--installed"): '{"formulae":[],"casks":[]}',
+        }
+
+        with patch.object(service, "is_available", return_value=True):
+            with patch.object(service, "_run", side_effect=lambda *args: responses[args]):
+                snapshot = service.collect_snapshot()
+
+        self.assertTrue(snapshot.available)
+        self.assertEqual(snapshot.version, "Unknown")
+
+    def test_collect_snapshot_json_falls_back_to_text(self) -> None:
+        service = BrewService(snapshot_mode="json")
+        results = {
+            ("brew", "--version"): "Homebrew 2.1.0",
+            ("brew", "list", "--formula"): "wget",
+            ("brew", "list", "--cask"): "",
+            ("brew", "outdated", "--quiet", "--formula"): "",
+            ("brew", "outdated", "--quiet", "--cask"): "",
+        }
+
+        def fake_run(*args: str) -> str:
+            if args == ("brew", "info", "--json=v2", "--installed"):
+                raise CalledProcessError(1, args, stderr="invalid option: --installed")
+            return results[args]
+
+        with patch.object(service, "is_available", return_value=True):
+            with patch.object(service, "_run", side_effect=fake_run):
+                snapshot = service.collect_snapshot()
+
+        self.assertEqual(snapshot.error, "")
+        self.assertEqual(snapshot.formulae, ["wget"])
+        self.assertEqual(snapshot.details, {})
+
+    def test_collect_snapshot_json_timeout_does_not_fall_back(self) -> None:
+        service = BrewService(snapshot_mode="json", snapshot_workers=1)
+        calls: list[tuple[str, ...]] = []
+
+        def fake_run(*args: str) -> str:
+            calls.append(args)
+            if args == ("brew", "info", "--json=v2", "--installed"):
+                raise CommandTimeout(args, 30.0)
+            return "Homebrew 4.3.0"
+
+        with patch.object(service, "is_available", return_value=True):
+            with patch.object(service, "_run", side_effect=fake_run):
+                snapshot = service.collect_snapshot()
+
+        self.assertEqual(len(calls), 2)
+        self.assertIn("Timed out after 30s.", snapshot.error)
+        self.assertEqual(snapshot.formulae, [])
+
+    def test_homebrew_prefix_prefers_environment(self) -> None:
+        service = BrewService()
+
+        with patch.dict("os.environ", {"HOMEBREW_PREFIX": "/opt/homebrew"}):
+            self.assertEqual(service.homebrew_prefix(), "/opt/homebrew")
+
+        with patch.dict("os.environ", {"HOMEBREW_PREFIX": ""}):
+            with patch("brew_gui_manager.brew_service.shutil.which", return_value="/usr/local/bin/brew"):
+                self.assertEqual(service.homebrew_prefix(), "/usr/local")
+
+    def test_homebrew_revision_reads_the_checkout_without_spawning(self) -> None:
+        with tempfile.TemporaryDirectory() as temp:
+            git_dir = Path(temp) / ".git"
+            (git_dir / "refs" / "heads").mkdir(parents=True)
+            (git_dir / "HEAD").write_text("ref: refs/heads/stable\n", encoding="utf-8")
+            (git_dir / "packed-refs").write_text("# pack-refs\n0123abcd refs/heads/stable\n", encoding="utf-8")
+            service = BrewService()
+
+            with patch.dict(os.environ, {"HOMEBREW_PREFIX": temp, "HOMEBREW_REPOSITORY": ""}):
+                packed = service.homebrew_revision()
+                (git_dir / "refs" / "heads" / "stable").write_text("4567ef\n", encoding="utf-8")
+                loose = service.homebrew_revision()
+
+        self.assertEqual((packed, loose), ("0123abcd", "4567ef"))
+
     def test_get_package_details_for_formula(self) -> None:
         service = BrewService()
         responses = {
@@ -66,12 +250,91 @@ class BrewServiceTests(unittest.TestCase):
         with patch.object(service, "_run", side_effect=lambda *args: responses[args]) as run_mock:
             details = service.get_package_details("wget", "formula")
 
-        self.assertEqual(details.title, "wget")
-        self.assertEqual(details.latest_version, "1.2.3")
-        self.assertEqual(details.installed_versions, ["1.2.2"])
-        self.assertEqual(details.dependencies, ["pcre2"])
-        self.assertEqual(details.raw_text, "formula details")
-        self.assertEqual(run_mock.call_count, 2)
+            self.assertEqual(details.title, "wget")
+            self.assertEqual(details.latest_version, "1.2.3")
+            self.assertEqual(details.installed_versions, ["1.2.2"])
+            self.assertEqual(details.dependencies, ["pcre2"])
+            self.assertEqual(details.raw_text, "")
+            self.assertEqual(run_mock.call_count, 1)
+
+            self.assertEqual(service.get_raw_info("wget", "formula"), "formula details")
+            self.assertEqual(service.get_raw_info("wget", "formula"), "formula details")
+            self.assertEqual(run_mock.call_count, 2)
+            self.assertEqual(details.raw_text, "formula details")
+
+    def test_get_package_details_is_cached_until_an_action_touches_it(self) -> None:
+        service = BrewService()
+        payload = '{"formulae":[{"name":"wget","versions":{"stable":"1.2.3"},"installed":[]}],"casks":[]}'
+        responses = {
+            ("brew", "info", "--json=v2", "wget"): payload,
+            ("brew", "install", "wget"): "",
+        }
+
+        with patch.object(service, "_run", side_effect=lambda *args: responses[args]) as run_mock:
+            first = service.get_package_details("wget", "formula")
+            second = service.get_package_details("wget", "formula")
+            self.assertIs(first, second)
+            self.assertEqual(run_mock.call_count, 1)
+            self.assertEqual((service.details_cache.hits, service.details_cache.misses), (1, 1))
+
+            service.run_action("install_formula", package_name="wget")
+            service.get_package_details("wget", "formula")
+
+        self.assertEqual(run_mock.call_count, 3)
+        self.assertEqual(service.details_cache.misses, 2)
+
+    def test_prefetch_details_batches_uncached_packages(self) -> None:
+        service = BrewService()
+        service.details_cache.put("formula:git", "already cached")
+        calls: list[tuple[str, ...]] = []
+
+        def fake_run(*args: str) -> str:
+            calls.append(args)
+            names = args[4:]
+            if args[3] == "--cask":
+                return '{"formulae":[],"casks":[%s]}' % ",".join(f'{{"token":"{name}"}}' for name in names)
+            return '{"formulae":[%s],"casks":[]}' % ",".join(f'{{"name":"{name}"}}' for name in names)
+
+        packages = [("formula", name) for name in ("wget", "git", "curl", "jq", "wget")] + [("cask", "iterm2")]
+        with patch.object(service, "_run", side_effect=fake_run):
+            fetched = service.prefetch_details(packages, chunk_size=2)
+
+        self.assertEqual(fetched, 4)
+        self.assertEqual(
+            calls,
+            [
+                ("brew", "info", "--json=v2", "--formula", "wget", "curl"),
+                ("brew", "info", "--json=v2", "--formula", "jq"),
+                ("brew", "info", "--json=v2", "--cask", "iterm2"),
+            ],
+        )
+        with patch.object(service, "_run", side_effect=AssertionError("should be cached")):
+            self.assertEqual(service.get_package_details("curl", "formula").name, "curl")
+            self.assertEqual(service.get_package_details("iterm2", "cask").name, "iterm2")
+
+    def test_prefetch_details_stops_when_stale(self) -> None:
+        service = BrewService()
+        chunks_allowed = iter([True, False])
+
+        with patch.object(service, "_run", return_value='{"formulae":[{"name":"a"}],"casks":[]}') as run_mock:
+            fetched = service.prefetch_details(
+                [("formula", "a"), ("formula", "b")],
+                chunk_size=1,
+                should_continue=lambda: next(chunks_allowed),
+            )
+
+        self.assertEqual(fetched, 1)
+        self.assertEqual(run_mock.call_count, 1)
+
+    def test_fresh_details_fetches_changed_packages_in_one_batch(self) -> None:
+        service = BrewService()
+        payload = '{"formulae":[{"name":"curl","dependencies":["openssl@3"]}],"casks":[]}'
+
+        with patch.object(service, "_run", return_value=payload) as run_mock:
+            details = service.fresh_details([("formula", "curl"), ("formula", "gone")])
+
+        self.assertEqual([(item.name, item.dependencies) for item in details], [("curl", ["openssl@3"])])
+        run_mock.assert_called_once_with("brew", "info", "--json=v2", "--formula", "curl", "gone")
 
     def test_get_package_details_falls_back_to_plain_text(self) -> None:
         service = BrewService()
@@ -103,10 +366,110 @@ class BrewServiceTests(unittest.TestCase):
                 succeeded=True,
                 output="done",
                 error="",
+                delta=SnapshotDelta(all_upgraded=True),
             ),
         )
         run_mock.assert_called_once_with("brew", "upgrade")
 
+    def test_upgrade_packages_batches_per_kind(self) -> None:
+        service = BrewService()
+
+        with patch.object(service, "_run", return_value="") as run_mock:
+            results = service.upgrade_packages(
+                [("formula", "wget"), ("cask", "iterm2"), ("formula", "jq"), ("formula", "wget")]
+            )
+
+        self.assertEqual(
+            [call.args for call in run_mock.call_args_list],
+            [("brew", "upgrade", "--cask", "iterm2"), ("brew", "upgrade", "wget", "jq")],
+        )
+        self.assertEqual(results[1].package_results, {"formula:wget": True, "formula:jq": True})
+        self.assertEqual(results[1].delta, SnapshotDelta(upgraded=[("formula", "wget"), ("formula", "jq")]))
+
+    def test_upgrade_packages_reports_partial_failures(self) -> None:
+        service = BrewService()
+        failure = CalledProcessError(
+            1,
+            ["brew", "upgrade"],
+            output="==> Upgrading wget",
+            stderr="Error: jq: no bottle available\nError: Cask 'jq-helper' is unavailable",
+        )
+
+        with patch.object(service, "_run", side_effect=failure):
+            (result,) = service.upgrade_packages([("formula", "wget"), ("formula", "jq")])
+
+        self.assertFalse(result.succeeded)
+        self.assertEqual(result.package_results, {"formula:wget": True, "formula:jq": False})
+        self.assertEqual(result.delta, SnapshotDelta(upgraded=[("formula", "wget")]))
+
+    def test_upgrade_packages_without_named_errors_fails_the_batch(self) -> None:
+        service = BrewService()
+        failure = CalledProcessError(1, ["brew", "upgrade"], stderr="Error: Another brew is running")
+
+        with patch.object(service, "_run", side_effect=failure):
+            (result,) = service.upgrade_packages([("formula", "wget"), ("formula", "jq")])
+
+        self.assertEqual(result.package_results, {"formula:wget": False, "formula:jq": False})
+        self.assertIsNone(result.delta)
+
+    def test_run_action_returns_targeted_delta(self) -> None:
+        service = BrewService()
+
+        with patch.object(service, "_run", return_value=""):
+            installed = service.run_action("install_cask", package_name="iterm2", package_kind="cask")
+            removed = service.run_action("uninstall_formula", package_name="wget")
+            upgraded = service.run_action("upgrade_selected", package_name="git")
+
+        self.assertEqual(installed.delta, SnapshotDelta(added=[("cask", "iterm2")]))
+        self.assertEqual(removed.delta, SnapshotDelta(removed=[("formula", "wget")]))
+        self.assertEqual(upgraded.delta, SnapshotDelta(upgraded=[("formula", "git")]))
+
+    def test_snapshot_delta_patches_snapshot_in_place(self) -> None:
+        snapshot = BrewSnapshot(
+            available=True,
+            version="Homebrew 4.3.0",
+            formulae=["git", "wget"],
+            casks=["iterm2"],
+            outdated_formulae=["git", "wget"],
+            outdated_casks=[],
+            details={
+                "formula:git": PackageDetails(
+                    name="git",
+                    kind="formula",
+                    title="git",
+                    description="",
+                    homepage="",
+                    latest_version="2.45.0",
+                    installed_versions=["2.44.0"],
+                    dependencies=[],
+                    tap="",
+                    caveats="",
+                    outdated=True,
+                ),
+            },
+            installed_versions={"formula:wget": ["1.2.2"]},
+        )
+        delta = SnapshotDelta(
+            added=[("formula", "curl")],
+            removed=[("formula", "wget")],
+            upgraded=[("formula", "git")],
+        )
+
+        everything = SnapshotDelta(all_upgraded=True).changed(snapshot)
+        changed = delta.changed(snapshot)
+        kinds = delta.apply(snapshot)
+
+        self.assertEqual(everything, [("formula", "git"), ("formula", "wget")])
+        self.assertEqual(changed, [("formula", "curl"), ("formula", "git")])
+        self.assertEqual(kinds, {"formula"})
+        self.assertEqual(snapshot.formulae, ["curl", "git"])
+        self.assertEqual(snapshot.outdated_formulae, [])
+        self.assertEqual(snapshot.casks, ["iterm2"])
+        self.assertNotIn("formula:wget", snapshot.installed_versions)
+        self.assertFalse(snapshot.details["formula:git"].outdated)
+        self.assertEqual(snapshot.installed_versions["formula:git"], ["2.45.0"])
+        self.assertEqual(SnapshotDelta().apply(snapshot), set())
+
     def test_run_action_requires_package_name(self) -> None:
         service = BrewService()
 
@@ -128,5 +491,231 @@ class BrewServiceTests(unittest.TestCase):
         self.assertEqual(result.error, "cleanup failed")
 
 
+class BrewServiceStreamingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tempdir.name)
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_run_action_streams_lines_and_keeps_a_bounded_tail(self) -> None:
+        brew = self._fake_brew(
+            'for i in $(seq 1 50); do echo "==> Upgrading pkg$i"; done\n'
+            'echo "Warning: slow mirror" >&2\n'
+        )
+        service = BrewService(executable=str(brew), stream_tail_lines=5, stream_spill_dir=str(self.root / "spill"))
+        lines: list[str] = []
+
+        result = service.run_action("upgrade_all", on_output=lines.append)
+
+        self.assertTrue(result.succeeded)
+        self.assertTrue(result.streamed)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(lines), 51)
+        self.assertIn("Warning: slow mirror", lines)
+        self.assertEqual(result.output.splitlines(), [f"==> Upgrading pkg{i}" for i in range(46, 51)])
+        self.assertEqual(result.delta, SnapshotDelta(all_upgraded=True))
+        spilled = Path(result.spill_path).read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(spilled), 51)
+
+    def test_failed_launch_removes_the_spill_file(self) -> None:
+        spill_dir = self.root / "spill"
+        service = BrewService(executable=str(self.root / "missing-brew"), stream_spill_dir=str(spill_dir))
+
+        result = service.run_action("upgrade_all", on_output=lambda _line: None)
+
+        self.assertFalse(result.succeeded)
+        self.assertEqual(list(spill_dir.iterdir()), [])
+
+    def test_streamed_failure_reports_stderr_tail(self) -> None:
+        brew = self._fake_brew('echo "fetching"\necho "Error: no bottle" >&2\nexit 3\n')
+        service = BrewService(executable=str(brew))
+
+        result = service.run_action("install_formula", package_name="wget", on_output=lambda _line: None)
+
+        self.assertFalse(result.succeeded)
+        self.assertEqual(result.exit_code, 3)
+        self.assertEqual(result.error, "Error: no bottle")
+        self.assertIsNone(result.delta)
+        self.assertEqual(result.spill_path, "")
+
+    def test_streamed_upgrade_batch_keeps_early_errors(self) -> None:
+        brew = self._fake_brew(
+            'echo "Error: wget: checksum mismatch" >&2\n'
+            'for i in $(seq 1 20); do echo "==> Pouring jq $i"; done\n'
+            'exit 1\n'
+        )
+        service = BrewService(executable=str(brew), stream_tail_lines=3)
+
+        (result,) = service.upgrade_packages([("formula", "wget"), ("formula", "jq")], on_output=lambda _line: None)
+
+        self.assertEqual(result.command, (str(brew), "upgrade", "wget", "jq"))
+        self.assertEqual(result.package_results, {"formula:wget": False, "formula:jq": True})
+
+    def test_command_timeout_kills_the_command(self) -> None:
+        brew = self._fake_brew("sleep 30\n")
+        service = BrewService(executable=str(brew), command_timeout=0.2)
+        started = time.monotonic()
+
+        result = service.run_action("cleanup")
+        streamed = service.run_action("cleanup", on_output=lambda _line: None)
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertFalse(result.succeeded)
+        self.assertIn("Timed out after 0.2s.", result.error)
+        self.assertFalse(streamed.succeeded)
+        self.assertIn("Timed out after 0.2s.", streamed.error)
+
+    def test_commands_are_traced_with_timings_and_byte_counts(self) -> None:
+        brew = self._fake_brew('echo "hello"\necho "oops" >&2\n[ "$1" = "cleanup" ] && exit 0\nexit 2\n')
+        tracer = CommandTrace(self.root / "trace.jsonl")
+        service = BrewService(executable=str(brew), tracer=tracer)
+
+        service.run_action("cleanup")
+        service.run_action("upgrade_all", on_output=lambda _line: None)
+        tracer.close()
+
+        records = list(read_records([self.root / "trace.jsonl"]))
+        self.assertEqual([record.argv[1:] for record in records], [["cleanup"], ["upgrade"]])
+        self.assertEqual([record.source for record in records], ["process", "stream"])
+        self.assertEqual([record.exit_code for record in records], [0, 2])
+        self.assertEqual([record.outcome for record in records], ["ok", "failed"])
+        self.assertEqual([(record.stdout_bytes, record.stderr_bytes) for record in records], [(6, 5), (6, 5)])
+        self.assertTrue(all(record.wall_time >= 0 and record.task_id is None for record in records))
+
+    def test_cancelling_a_task_terminates_the_process_group(self) -> None:
+        pid_file = self.root / "child.pid"
+        brew = self._fake_brew(f'sleep 30 &\necho $! > "{pid_file}"\necho started\nwait\n')
+        service = BrewService(executable=str(brew))
+        runner = BackgroundTaskRunner()
+
+        task_id = runner.submit(
+            "hung install",
+            lambda: service.run_action("cleanup", on_output=runner.progress_reporter()),
+        )
+        deadline = time.monotonic() + 5
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.02)
+        child = int(pid_file.read_text())
+
+        self.assertTrue(runner.cancel(task_id))
+        while self._alive(child):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+
+        statuses = [event.status for event in runner.drain_events()]
+        self.assertEqual(statuses[-1], "cancelled")
+        self.assertNotIn("completed", statuses)
+
+    def test_terminating_a_finished_leader_still_kills_its_children(self) -> None:
+        pid_file = self.root / "child.pid"
+        leader = subprocess.Popen(
+            ["/bin/sh", "-c", f'sleep 30 &\necho $! > "{pid_file}"\n'],
+            start_new_session=True,
+        )
+        leader.wait(timeout=5)
+        child = int(pid_file.read_text())
+        self.assertTrue(self._alive(child))
+
+        terminate_process_group(leader, grace=0.2)
+
+        deadline = time.monotonic() + 5
+        while self._alive(child):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+
+    def test_no_sigkill_once_the_group_is_gone(self) -> None:
+        signals: list[tuple[int, int]] = []
+        killpg = os.killpg
+
+        def record(pid: int, signum: int) -> None:
+            signals.append((pid, signum))
+            killpg(pid, signum)
+
+        leader = subprocess.Popen(["sleep", "30"], start_new_session=True)
+        with patch("brew_gui_manager.task_context.os.killpg", side_effect=record):
+            with watch_process(leader):
+                terminate_process_group(leader, grace=0.2)
+                leader.wait(timeout=5)
+            terminate_process_group(leader, grace=0.2)
+            time.sleep(0.4)
+
+        self.assertEqual([signum for pid, signum in signals if pid == leader.pid and signum], [signal.SIGTERM])
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        stat_path = Path(f"/proc/{pid}/stat")
+        # An orphan nobody reaped yet is a zombie, which is as good as gone.
+        return not (stat_path.exists() and stat_path.read_text().split(")")[-1].split()[0] == "Z")
+
+    def _fake_brew(self, body: str) -> Path:
+        path = self.root / "brew"
+        path.write_text(f"#!/bin/sh\n{body}", encoding="utf-8")
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+        return path
+
+
+class BrewServiceReplayTests(unittest.TestCase):
+    """Real Homebrew payloads served by the replay ``brew`` from ``tests/fixtures/brew``."""
+
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tempdir.name)
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def _service(self, policy: ReplayPolicy | None = None, **options) -> BrewService:
+        brew = write_replay_executable(self.root / "bin", FIXTURES, policy)
+        return BrewService(executable=str(brew), **options)
+
+    def test_json_and_text_snapshots_agree_on_recorded_payloads(self) -> None:
+        json_snapshot = self._service(snapshot_mode="json").collect_snapshot()
+        text_snapshot = self._service(snapshot_mode="text").collect_snapshot()
+
+        self.assertEqual(json_snapshot.version, "Homebrew 4.4.2")
+        self.assertEqual(len(json_snapshot.formulae), 11)
+        self.assertEqual(json_snapshot.casks, ["iterm2", "raycast", "visual-studio-code"])
+        self.assertEqual(json_snapshot.outdated_formulae, ["git", "openssl@3"])
+        self.assertEqual(json_snapshot.outdated_casks, ["raycast"])
+        for attribute in ("formulae", "casks", "outdated_formulae", "outdated_casks"):
+            self.assertEqual(getattr(json_snapshot, attribute), getattr(text_snapshot, attribute))
+        python = json_snapshot.details["formula:python@3.12"]
+        self.assertEqual(python.dependencies, ["mpdecimal", "openssl@3", "sqlite", "xz"])
+        self.assertIn("/opt/homebrew/bin/python3", python.caveats)
+        self.assertFalse(json_snapshot.details["formula:oniguruma"].installed_on_request)
+        self.assertEqual(json_snapshot.details["cask:raycast"].installed_versions, ["1.84.3"])
+
+    def test_details_prefetch_and_missing_packages(self) -> None:
+        service = self._service()
+
+        wget = service.get_package_details("wget", "formula")
+        fetched = service.prefetch_details([("formula", "jq"), ("formula", "git")])
+        raw = service.get_raw_info("wget", "formula")
+
+        self.assertEqual((wget.latest_version, wget.dependencies), ("1.24.5", ["libidn2", "openssl@3"]))
+        self.assertEqual(fetched, 2)
+        self.assertTrue(service.cached_details("git", "formula").outdated)
+        self.assertIn("Required: libidn2", raw)
+        with self.assertRaises(CalledProcessError) as failure:
+            service.get_package_details("no-such-formula", "formula")
+        self.assertEqual(failure.exception.cmd[-1], "no-such-formula")
+
+    def test_injected_failures_fall_back_to_text_snapshot(self) -> None:
+        service = self._service(ReplayPolicy(fail_matching="info --json=v2 --installed"), snapshot_mode="json")
+
+        snapshot = service.collect_snapshot()
+
+        self.assertTrue(snapshot.available)
+        self.assertEqual(snapshot.outdated_formulae, ["git", "openssl@3"])
+        self.assertEqual(snapshot.details, {})
+
+
 if __name__ == "__main__":
     unittest.main()
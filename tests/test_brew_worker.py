@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import signal
+from subprocess import CalledProcessError
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from brew_gui_manager.brew_service import BrewService
+from brew_gui_manager.brew_worker import BrewWorkerClient, WorkerTimeout, WorkerUnsupported
+
+
+FAKE_WORKER = Path(__file__).with_name("fake_brew_worker.py")
+
+
+class BrewWorkerClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.marker = Path(self._tempdir.name) / "crashed"
+        self._env = patch.dict(os.environ, {"FAKE_WORKER_MARKER": str(self.marker)})
+        self._env.start()
+        self.client = BrewWorkerClient((sys.executable, str(FAKE_WORKER)), request_timeout=5)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self._env.stop()
+        self._tempdir.cleanup()
+
+    def test_worker_is_reused_across_requests(self) -> None:
+        first = self.client.request(["--version"])
+        second = self.client.request(["--version"])
+
+        self.assertEqual(first.status, 0)
+        self.assertEqual(first.stdout, second.stdout)
+        self.assertTrue(self.client.alive)
+        self.assertTrue(self.client.ping())
+
+    def test_mutating_and_unknown_queries_are_rejected(self) -> None:
+        with self.assertRaises(WorkerUnsupported):
+            self.client.request(["install", "wget"])
+        with self.assertRaises(WorkerUnsupported):
+            self.client.request(["deps", "--tree"])
+
+    def test_restarts_after_crash(self) -> None:
+        before = self.client.request(["--version"]).stdout
+
+        response = self.client.request(["info", "--json=v2", "crash-once"])
+
+        self.assertEqual(response.status, 0)
+        self.assertEqual(self.client.restarts, 1)
+        self.assertNotEqual(self.client.request(["--version"]).stdout, before)
+
+    def test_timeouts_are_not_retried(self) -> None:
+        client = BrewWorkerClient((sys.executable, str(FAKE_WORKER)), request_timeout=0.3)
+        self.addCleanup(client.close)
+        client.request(["--version"])
+        started = time.monotonic()
+
+        with self.assertRaises(WorkerTimeout):
+            client.request(["info", "--json=v2", "hang"])
+
+        self.assertLess(time.monotonic() - started, 3.0)
+        self.assertEqual(client.restarts, 0)
+        self.assertEqual(client.request(["list", "--formula"]).stdout, "wget\njq\n")
+        self.assertEqual(client.restarts, 1)
+
+    def test_idle_worker_is_pinged_and_replaced_when_wedged(self) -> None:
+        client = BrewWorkerClient(
+            (sys.executable, str(FAKE_WORKER)),
+            request_timeout=5,
+            health_check_after=0.1,
+            ping_timeout=0.3,
+        )
+        self.addCleanup(client.close)
+        client.request(["--version"])
+        with patch.object(client, "ping", wraps=client.ping) as ping_mock:
+            client.request(["--version"])
+            ping_mock.assert_not_called()
+
+            wedged = client._process
+            os.kill(wedged.pid, signal.SIGSTOP)
+            self.addCleanup(self._kill, wedged)
+            time.sleep(0.15)
+            response = client.request(["list", "--formula"])
+
+        ping_mock.assert_called_once()
+        self.assertEqual(response.stdout, "wget\njq\n")
+        self.assertEqual(client.restarts, 1)
+        self.assertIsNot(client._process, wedged)
+
+    @staticmethod
+    def _kill(process) -> None:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def test_shuts_down_when_idle(self) -> None:
+        client = BrewWorkerClient((sys.executable, str(FAKE_WORKER)), idle_timeout=0.2)
+        self.addCleanup(client.close)
+
+        client.request(["--version"])
+        deadline = time.time() + 3
+        while client.alive and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertFalse(client.alive)
+        self.assertEqual(client.request(["list", "--formula"]).stdout, "wget\njq\n")
+
+    def test_unstartable_worker_falls_back_to_subprocess(self) -> None:
+        client = BrewWorkerClient(("/nonexistent/brew-worker",))
+        service = BrewService(worker=client)
+
+        with patch.object(service, "_run", return_value="wget") as run_mock:
+            self.assertEqual(service._query("brew", "list", "--formula"), "wget")
+
+        run_mock.assert_called_once_with("brew", "list", "--formula")
+
+
+class BrewServiceWorkerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = BrewWorkerClient((sys.executable, str(FAKE_WORKER)), request_timeout=5)
+        self.service = BrewService(worker=self.client)
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_read_only_queries_use_the_worker(self) -> None:
+        with patch.object(self.service, "_run", side_effect=AssertionError("spawned brew")):
+            details = self.service.get_package_details("wget", "formula")
+
+        self.assertEqual(details.description, "from worker")
+
+    def test_worker_errors_surface_as_called_process_errors(self) -> None:
+        with patch.object(self.service, "_run", side_effect=AssertionError("spawned brew")):
+            with self.assertRaises(CalledProcessError) as raised:
+                self.service.get_package_details("missing", "formula")
+
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertIn("No available formula", raised.exception.stderr)
+
+    def test_actions_still_use_fresh_processes(self) -> None:
+        with patch.object(self.service, "_run", return_value="done") as run_mock:
+            result = self.service.run_action("install_formula", package_name="wget")
+
+        self.assertTrue(result.succeeded)
+        run_mock.assert_called_once_with("brew", "install", "wget")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+import unittest
+
+from brew_gui_manager.catalog_index import CatalogIndex
+
+
+class CatalogIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        root = Path(self._tempdir.name)
+        self.api_dir = root / "api"
+        self.api_dir.mkdir()
+        self.index = CatalogIndex(root / "catalog.sqlite3", self.api_dir)
+        self._write(
+            "formula",
+            [
+                {"name": "jq", "full_name": "jq", "desc": "Lightweight and flexible command-line JSON processor",
+                 "tap": "homebrew/core", "versions": {"stable": "1.7.1"}},
+                {"name": "wget", "full_name": "wget", "aliases": ["wget2"], "desc": "Internet file retriever",
+                 "tap": "homebrew/core", "versions": {"stable": "1.24.5"}},
+            ],
+        )
+        self._write(
+            "cask",
+            [
+                {"token": "iterm2", "full_token": "iterm2", "name": ["iTerm2"], "desc": "Terminal emulator",
+                 "tap": "homebrew/cask", "version": "3.5.0"},
+            ],
+        )
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self._tempdir.cleanup()
+
+    def test_refresh_indexes_both_sources(self) -> None:
+        self.assertEqual(self.index.refresh(), {"formula": 2, "cask": 1})
+
+        self.assertEqual([entry.name for entry in self.index.search("json")], ["jq"])
+        self.assertEqual([entry.name for entry in self.index.search("terminal")], ["iterm2"])
+        self.assertEqual(self.index.search("iterm")[0].title, "iTerm2")
+        self.assertEqual(self.index.search("wget")[0].version, "1.24.5")
+        self.assertEqual(self.index.search("   "), [])
+
+    def test_complete_returns_name_prefix_matches(self) -> None:
+        self.index.refresh()
+
+        self.assertEqual(self.index.complete("w"), ["wget"])
+        self.assertEqual(self.index.complete("i"), ["iterm2"])
+        self.assertEqual(self.index.complete(""), [])
+
+    def test_refresh_is_incremental(self) -> None:
+        self.index.refresh()
+        self.assertEqual(self.index.refresh(), {})
+
+        source = self.api_dir / "formula.jws.json"
+        os.utime(source, (time.time() + 10, time.time() + 10))
+        self.assertEqual(self.index.refresh(), {})
+
+        self._write("formula", [{"name": "ripgrep", "desc": "Search tool", "tap": "homebrew/core"}])
+        self.assertEqual(self.index.refresh(), {"formula": 1})
+        self.assertEqual(self.index.search("wget"), [])
+        self.assertEqual([entry.name for entry in self.index.search("iterm")], ["iterm2"])
+
+    def test_refresh_reads_plain_arrays_and_skips_truncated_sources(self) -> None:
+        self.index.refresh()
+        source = self.api_dir / "formula.jws.json"
+        source.write_text(' [ {"name": "ripgrep"} ,\n{"name": "fd"}, "junk" ] ', encoding="utf-8")
+        self.assertEqual(self.index.refresh(), {"formula": 2})
+
+        source.write_text('[{"name": "bat"}, {"name": "eza"', encoding="utf-8")
+        self.assertEqual(self.index.refresh(), {})
+        self.assertEqual(self.index.complete("r"), ["ripgrep"])
+
+    def test_search_without_index_is_empty(self) -> None:
+        self.assertEqual(self.index.search("jq"), [])
+        self.assertEqual(self.index.complete("j"), [])
+
+    def test_search_is_fast_on_a_large_catalog(self) -> None:
+        self._write(
+            "formula",
+            [
+                {"name": f"tool-{index:05d}", "desc": f"Synthetic package number {index} for parsing data",
+                 "tap": "homebrew/core"}
+                for index in range(15000)
+            ],
+        )
+        self.index.refresh()
+
+        self.index.search("synthetic")
+        started = time.perf_counter()
+        results = self.index.search("tool-01234")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results[0].name, "tool-01234")
+        self.assertLess(elapsed, 0.05)
+
+    def _write(self, kind: str, entries: list[dict]) -> None:
+        document = {"payload": json.dumps(entries), "signatures": []}
+        (self.api_dir / f"{kind}.jws.json").write_text(json.dumps(document), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    unittest.main()
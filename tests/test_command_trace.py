@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from pathlib import Path
+import tempfile
+import unittest
+
+from brew_gui_manager.command_trace import (
+    CommandTrace,
+    TraceRecord,
+    command_type,
+    format_report,
+    percentile,
+    read_records,
+    summarize,
+)
+from brew_gui_manager.task_context import TaskContext, bind
+
+
+class CommandTraceTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.path = Path(self._tempdir.name) / "commands.jsonl"
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_records_are_written_with_the_current_task_id(self) -> None:
+        trace = CommandTrace(self.path)
+        with bind(TaskContext(7)):
+            trace.record(("brew", "info", "--json=v2", "wget"), 100.0, 0.25, 0, "out", "é")
+        trace.record(("brew", "upgrade", "jq"), 101.0, 3.0, 1, 10, 2, source="stream")
+        trace.flush()
+
+        first, second = read_records([self.path])
+
+        self.assertEqual(first.argv, ["brew", "info", "--json=v2", "wget"])
+        self.assertEqual((first.task_id, first.stdout_bytes, first.stderr_bytes, first.outcome), (7, 3, 2, "ok"))
+        self.assertEqual((second.task_id, second.source, second.outcome), (None, "stream", "failed"))
+        trace.close()
+
+    def test_file_rotates_past_max_bytes(self) -> None:
+        trace = CommandTrace(self.path, max_bytes=400, backups=2)
+        for index in range(12):
+            trace.record(("brew", "list", f"pkg{index}"), float(index), 0.1, 0)
+            trace.flush()
+        trace.close()
+
+        rotated = [self.path.with_name(f"commands.jsonl.{index}") for index in (2, 1)]
+        self.assertTrue(all(path.exists() for path in rotated))
+        self.assertFalse(self.path.with_name("commands.jsonl.3").exists())
+        started = [record.started_at for record in read_records([*rotated, self.path])]
+        self.assertEqual(started, sorted(started))
+        self.assertEqual(started[-1], 11.0)
+
+    def test_files_orders_ten_or_more_backups_numerically(self) -> None:
+        trace = CommandTrace(self.path, backups=12)
+        for name in ("commands.jsonl", "commands.jsonl.tmp", *(f"commands.jsonl.{index}" for index in range(1, 12))):
+            self.path.with_name(name).write_text("", encoding="utf-8")
+
+        self.assertEqual(
+            [path.name for path in trace.files()],
+            [*(f"commands.jsonl.{index}" for index in range(11, 0, -1)), "commands.jsonl"],
+        )
+        trace.close()
+
+    def test_summarize_reports_percentiles_per_command_type(self) -> None:
+        records = [
+            TraceRecord(["brew", "info", "--json=v2", f"pkg{index}"], 0.0, float(index), 0)
+            for index in range(1, 101)
+        ]
+        records.append(TraceRecord(["brew", "list", "--formula"], 0.0, 0.5, 1, outcome="failed"))
+
+        info, listing = summarize(records)
+
+        self.assertEqual(
+            (info.command_type, info.count, info.p50, info.p95, info.p99),
+            ("info --json=v2", 100, 50.0, 95.0, 99.0),
+        )
+        self.assertEqual((listing.command_type, listing.failures), ("list --formula", 1))
+        self.assertEqual(command_type(["brew", "--version"]), "--version")
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_report_compares_before_and_after_a_split(self) -> None:
+        records = [TraceRecord(["brew", "list"], float(index), 1.0 if index < 10 else 2.0, 0) for index in range(20)]
+
+        report = format_report(records, split=10.0)
+
+        self.assertIn("list", report.splitlines()[1])
+        self.assertIn("+100%", report)
+        self.assertIn("p95", format_report(records))
+
+
+if __name__ == "__main__":
+    unittest.main()
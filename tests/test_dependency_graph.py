@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import unittest
+
+from brew_gui_manager.brew_service import PackageDetails
+from brew_gui_manager.dependency_graph import DependencyGraph
+
+
+def formula(name: str, *dependencies: str, on_request: bool = True) -> PackageDetails:
+    return PackageDetails(
+        name=name,
+        kind="formula",
+        title=name,
+        description="",
+        homepage="",
+        latest_version="1.0",
+        installed_versions=["1.0"],
+        dependencies=list(dependencies),
+        tap="homebrew/core",
+        caveats="",
+        installed_on_request=on_request,
+    )
+
+
+class DependencyGraphTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.graph = DependencyGraph.from_details(
+            [
+                formula("wget", "openssl@3", "libidn2"),
+                formula("curl", "openssl@3"),
+                formula("openssl@3", "ca-certificates", on_request=False),
+                formula("ca-certificates", on_request=False),
+                formula("libidn2", "libunistring", on_request=False),
+                formula("libunistring", on_request=False),
+                formula("gettext", on_request=False),
+            ]
+        )
+
+    def test_direct_and_reverse_dependencies(self) -> None:
+        self.assertEqual(self.graph.dependencies("wget"), ["libidn2", "openssl@3"])
+        self.assertEqual(self.graph.dependents("openssl@3"), ["curl", "wget"])
+        self.assertEqual(self.graph.dependents("wget"), [])
+
+    def test_transitive_closures(self) -> None:
+        self.assertEqual(
+            self.graph.transitive_dependencies("wget"),
+            ["ca-certificates", "libidn2", "libunistring", "openssl@3"],
+        )
+        self.assertEqual(self.graph.transitive_dependents("ca-certificates"), ["curl", "openssl@3", "wget"])
+
+    def test_leaves_and_orphans(self) -> None:
+        self.assertEqual(self.graph.leaves(), ["curl", "gettext", "wget"])
+        self.assertEqual(self.graph.orphans(), ["gettext"])
+
+    def test_remove_updates_reverse_edges_and_orphans(self) -> None:
+        self.graph.remove("wget", "formula")
+
+        self.assertNotIn("formula:wget", self.graph)
+        self.assertEqual(self.graph.dependents("openssl@3"), ["curl"])
+        self.assertEqual(self.graph.orphans(), ["gettext", "libidn2", "libunistring"])
+
+    def test_reinstall_reattaches_existing_edges(self) -> None:
+        self.graph.remove("openssl@3", "formula")
+        self.assertEqual(self.graph.dependencies("curl"), [])
+
+        self.graph.add(formula("openssl@3", "ca-certificates", on_request=False))
+
+        self.assertEqual(self.graph.dependencies("curl"), ["openssl@3"])
+        self.assertEqual(self.graph.orphans(), ["gettext"])
+
+    def test_cask_formula_dependencies_and_tap_names(self) -> None:
+        cask = PackageDetails(
+            name="wireshark",
+            kind="cask",
+            title="Wireshark",
+            description="",
+            homepage="",
+            latest_version="4.2",
+            installed_versions=["4.2"],
+            dependencies=["homebrew/core/gettext"],
+            tap="homebrew/cask",
+            caveats="",
+            installed_on_request=False,
+        )
+        self.graph.add(cask)
+
+        self.assertEqual(self.graph.dependents("gettext"), ["wireshark"])
+        self.assertEqual(self.graph.orphans(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
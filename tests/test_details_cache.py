@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import unittest
+
+from brew_gui_manager.details_cache import DetailsCache
+
+
+class DetailsCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.cache = DetailsCache(max_entries=2, ttl=10.0, clock=lambda: self.now)
+
+    def test_counts_hits_and_misses(self) -> None:
+        self.assertIsNone(self.cache.get("formula:wget"))
+        self.cache.put("formula:wget", "details")
+
+        self.assertEqual(self.cache.get("formula:wget"), "details")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.hit_ratio, 0.5)
+
+    def test_evicts_least_recently_used(self) -> None:
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_entries_expire_after_ttl(self) -> None:
+        self.cache.put("a", 1)
+        self.now = 10.5
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate_and_clear(self) -> None:
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+
+        self.cache.invalidate("a")
+        self.assertNotIn("a", self.cache)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import tempfile
+import threading
+import time
+import tkinter as tk
+import tracemalloc
+import unittest
+import zipfile
+
+from brew_gui_manager.brew_service import BrewService, BrewSnapshot
+from brew_gui_manager.command_trace import CommandTrace
+from brew_gui_manager.diagnostics import Diagnostics
+from brew_gui_manager.render_scheduler import RenderScheduler
+from brew_gui_manager.snapshot_cache import SnapshotCache
+from brew_gui_manager.task_runner import BackgroundTaskRunner
+
+
+class DiagnosticsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tempdir.name)
+        self.tracer = CommandTrace(self.root / "commands.jsonl")
+        self.service = BrewService(tracer=self.tracer)
+        self.runner = BackgroundTaskRunner(max_workers=1)
+        self.interp = tk.Tcl()
+        self.scheduler = RenderScheduler(self.interp)
+        self.cache = SnapshotCache(self.root / "snapshot.json")
+        self.diagnostics = Diagnostics(self.runner, self.service, self.scheduler, self.cache)
+
+    def tearDown(self) -> None:
+        self.diagnostics.stop_allocation_tracking()
+        self.tracer.close()
+        self._tempdir.cleanup()
+
+    def test_collect_reports_tasks_commands_caches_and_tk_work(self) -> None:
+        release = threading.Event()
+        self.runner.submit("slow refresh", release.wait)
+        deadline = time.monotonic() + 5
+        while not any(task.started for task in self.runner.tasks()):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.runner.submit("queued details", lambda: None, lane="interactive")
+        for wall_time in (0.1, 0.2, 0.3):
+            self.tracer.record(("brew", "info", "--json=v2", "wget"), time.time(), wall_time, 0)
+        self.service.details_cache.put("formula:wget", object())
+        self.service.details_cache.get("formula:wget")
+        self.service.details_cache.get("formula:jq")
+        self.scheduler.request("shelf", lambda: None)
+        self.scheduler.flush()
+
+        report = self.diagnostics.collect()
+        release.set()
+
+        self.assertEqual(report["queues"]["interactive"], 1)
+        self.assertEqual(
+            [(task["description"], task["started"]) for task in report["tasks"]],
+            [("slow refresh", True), ("queued details", False)],
+        )
+        self.assertEqual(report["commands"][0]["command"], "info --json=v2")
+        self.assertEqual((report["commands"][0]["count"], report["commands"][0]["max"]), (3, 0.3))
+        self.assertEqual(report["caches"]["details"]["hit_ratio"], 0.5)
+        self.assertEqual([row["name"] for row in report["tk_callbacks"]], ["shelf"])
+        self.assertIsNone(report["allocations"])
+        text = Diagnostics.format_report(report)
+        self.assertIn("slow refresh", text)
+        self.assertIn("tracemalloc is off", text)
+
+    def test_allocation_tracking_reports_top_allocators(self) -> None:
+        if tracemalloc.is_tracing():
+            self.skipTest("tracemalloc is already running")
+        self.diagnostics.start_allocation_tracking()
+        blocks = [bytearray(1024) for _index in range(200)]
+
+        before = self.diagnostics.collect()["allocations"]
+        sampled = self.diagnostics.refresh_allocations()
+        allocations = self.diagnostics.collect()["allocations"]
+        self.diagnostics.stop_allocation_tracking()
+
+        self.assertEqual(before, [])
+        self.assertIn("sampling...", Diagnostics.format_report({**self.diagnostics.collect(), "allocations": []}))
+        self.assertIs(allocations, sampled)
+        self.assertIsNone(self.diagnostics.collect()["allocations"])
+        self.diagnostics.refresh_allocations()
+        self.assertIsNone(self.diagnostics.collect()["allocations"])
+        self.assertTrue(allocations)
+        self.assertTrue(any("test_diagnostics.py" in row["location"] for row in allocations))
+        self.assertFalse(tracemalloc.is_tracing())
+        del blocks
+
+    def test_export_bundles_report_snapshot_and_trace(self) -> None:
+        self.cache.store_snapshot(BrewSnapshot(True, "Homebrew 4.3.0", ["wget"], [], [], []), "/opt/homebrew")
+        self.tracer.record(("brew", "list", "--formula"), time.time(), 0.05, 0)
+
+        archive_path = self.diagnostics.export(self.root / "out" / "bundle.zip")
+
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                ["report.json", "report.txt", "snapshot.json", "trace/commands.jsonl"],
+            )
+            self.assertIn("queues", json.loads(archive.read("report.json")))
+            self.assertIn('"--formula"', archive.read("trace/commands.jsonl").decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
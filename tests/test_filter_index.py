@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import unittest
+
+from brew_gui_manager.filter_index import FilterIndex
+
+
+class FilterIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.names = ["Git", "git-lfs", "lazygit", "node", "python@3.12", "wget"]
+        self.index = FilterIndex(self.names)
+
+    def test_search_matches_substrings_in_source_order(self) -> None:
+        self.assertIs(self.index.search(""), self.index.names)
+        self.assertEqual(self.index.search("GIT"), ["Git", "git-lfs", "lazygit"])
+        self.assertEqual(self.index.search("g"), ["Git", "git-lfs", "lazygit", "wget"])
+        self.assertEqual(self.index.search("@3."), ["python@3.12"])
+        self.assertEqual(self.index.search("xyz"), [])
+
+    def test_extending_a_query_narrows_the_previous_matches(self) -> None:
+        self.assertEqual(self.index.search("gi"), ["Git", "git-lfs", "lazygit"])
+        self.assertEqual(self.index._last_rows, [0, 1, 2])
+
+        self.assertEqual(self.index.search("git-"), ["git-lfs"])
+        self.assertEqual(self.index.search("git"), ["Git", "git-lfs", "lazygit"])
+        self.assertEqual(self.index.search("od"), ["node"])
+
+    def test_matches_detects_in_place_changes_to_the_source(self) -> None:
+        self.assertTrue(self.index.matches(self.names))
+        self.names.remove("wget")
+        self.assertFalse(self.index.matches(self.names))
+        self.assertEqual(FilterIndex(self.names).search("g"), ["Git", "git-lfs", "lazygit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from brew_gui_manager.brew_service import BrewService
+from brew_gui_manager.inventory import FilesystemInventory, InventoryLayoutError
+
+
+class FilesystemInventoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.prefix = Path(self._tempdir.name)
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_reads_formulae_casks_and_versions(self) -> None:
+        self._keg("Cellar", "wget", "1.21.4")
+        self._keg("Cellar", "python@3.12", "3.12.1")
+        self._keg("Cellar", "python@3.12", "3.12.10")
+        self._keg("Caskroom", "iterm2", "3.5.0")
+        (self.prefix / "Caskroom" / "iterm2" / ".metadata").mkdir()
+        (self.prefix / "Cellar" / ".DS_Store").write_text("", encoding="utf-8")
+        (self.prefix / "Cellar" / "empty-rack").mkdir()
+
+        inventory = FilesystemInventory(self.prefix).read()
+
+        self.assertEqual(inventory.formulae, ["python@3.12", "wget"])
+        self.assertEqual(inventory.casks, ["iterm2"])
+        self.assertEqual(inventory.formula_versions["python@3.12"], ["3.12.1", "3.12.10"])
+        self.assertEqual(inventory.cask_versions["iterm2"], ["3.5.0"])
+
+    def test_missing_caskroom_means_no_casks(self) -> None:
+        self._keg("Cellar", "wget", "1.21.4")
+
+        inventory = FilesystemInventory(self.prefix).read()
+
+        self.assertEqual(inventory.casks, [])
+
+    def test_unexpected_layout_raises(self) -> None:
+        with self.assertRaises(InventoryLayoutError):
+            FilesystemInventory(self.prefix).read()
+
+        (self.prefix / "Cellar").mkdir()
+        (self.prefix / "Cellar" / "stray-file").write_text("", encoding="utf-8")
+        with self.assertRaises(InventoryLayoutError):
+            FilesystemInventory(self.prefix).read()
+
+    def test_receipt_is_read_lazily_from_linked_keg(self) -> None:
+        self._keg("Cellar", "wget", "1.21.3", receipt={"installed_on_request": False})
+        self._keg("Cellar", "wget", "1.21.4", receipt={"installed_on_request": True})
+        (self.prefix / "opt").mkdir()
+        os.symlink(self.prefix / "Cellar" / "wget" / "1.21.3", self.prefix / "opt" / "wget")
+        inventory = FilesystemInventory(self.prefix)
+
+        inventory.read()
+        self.assertEqual(inventory._receipts, {})
+
+        self.assertEqual(inventory.receipt("wget"), {"installed_on_request": False})
+        self.assertIsNone(inventory.receipt("missing"))
+
+    def test_scans_thousands_of_kegs_quickly(self) -> None:
+        for index in range(2000):
+            self._keg("Cellar", f"formula-{index:04d}", "1.0.0")
+
+        started = time.perf_counter()
+        inventory = FilesystemInventory(self.prefix).read()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(inventory.formulae), 2000)
+        self.assertLess(elapsed, 1.0)
+
+    def test_service_uses_filesystem_backend_for_lists(self) -> None:
+        self._keg("Cellar", "wget", "1.21.4")
+        self._keg("Caskroom", "iterm2", "3.5.0")
+        service = BrewService(inventory_backend="filesystem", snapshot_workers=1)
+        results = {
+            ("brew", "--version"): "Homebrew 4.3.0",
+            ("brew", "outdated", "--quiet", "--formula"): "wget",
+            ("brew", "outdated", "--quiet", "--cask"): "",
+        }
+
+        with patch.dict(os.environ, {"HOMEBREW_PREFIX": str(self.prefix)}):
+            with patch.object(service, "is_available", return_value=True):
+                with patch.object(service, "_run", side_effect=lambda *args: results[args]) as run_mock:
+                    snapshot = service.collect_snapshot()
+
+        self.assertEqual(run_mock.call_count, 3)
+        self.assertEqual(snapshot.formulae, ["wget"])
+        self.assertEqual(snapshot.casks, ["iterm2"])
+        self.assertEqual(snapshot.outdated_formulae, ["wget"])
+        self.assertEqual(snapshot.installed_versions["cask:iterm2"], ["3.5.0"])
+        self.assertIn("scan Cellar/Caskroom", snapshot.timings)
+
+    def test_receipt_details_build_dependency_data_after_a_scan(self) -> None:
+        self._keg("Cellar", "wget", "1.21.4", receipt={
+            "installed_on_request": True,
+            "runtime_dependencies": [
+                {"full_name": "openssl@3", "declared_directly": True},
+                {"full_name": "ca-certificates", "declared_directly": False},
+            ],
+        })
+        self._keg("Cellar", "openssl@3", "3.3.0", receipt={"installed_on_request": False})
+        self._keg("Cellar", "broken", "1.0")
+        service = BrewService(inventory_backend="filesystem")
+
+        self.assertEqual(service.receipt_details(["wget"]), [])
+        with patch.dict(os.environ, {"HOMEBREW_PREFIX": str(self.prefix)}):
+            service.read_inventory()
+        details = {item.name: item for item in service.receipt_details(["broken", "openssl@3", "wget"])}
+
+        self.assertEqual(sorted(details), ["openssl@3", "wget"])
+        self.assertEqual(details["wget"].dependencies, ["openssl@3"])
+        self.assertFalse(details["openssl@3"].installed_on_request)
+
+    def test_service_falls_back_to_cli_for_unexpected_layout(self) -> None:
+        service = BrewService(inventory_backend="filesystem", snapshot_workers=1)
+        results = {
+            ("brew", "--version"): "Homebrew 4.3.0",
+            ("brew", "list", "--formula"): "wget",
+            ("brew", "list", "--cask"): "",
+            ("brew", "outdated", "--quiet", "--formula"): "",
+            ("brew", "outdated", "--quiet", "--cask"): "",
+        }
+
+        with patch.dict(os.environ, {"HOMEBREW_PREFIX": str(self.prefix)}):
+            with patch.object(service, "is_available", return_value=True):
+                with patch.object(service, "_run", side_effect=lambda *args: results[args]):
+                    snapshot = service.collect_snapshot()
+
+        self.assertEqual(snapshot.formulae, ["wget"])
+        self.assertEqual(snapshot.installed_versions, {})
+
+    def _keg(self, root: str, name: str, version: str, receipt: dict | None = None) -> None:
+        keg = self.prefix / root / name / version
+        keg.mkdir(parents=True)
+        if receipt is not None:
+            (keg / FilesystemInventory.RECEIPT_NAME).write_text(json.dumps(receipt), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+import tkinter as tk
+import unittest
+
+from brew_gui_manager.render_scheduler import RenderScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RenderSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        # A bare Tcl interpreter runs the same event loop without a display.
+        self.interp = tk.Tcl()
+        self.clock = FakeClock()
+        self.scheduler = RenderScheduler(self.interp, budget_ms=8.0, frame_ms=1, clock=self.clock)
+
+    def test_repeated_changes_collapse_into_one_pass(self) -> None:
+        status = tk.StringVar(master=self.interp, value="Idle")
+        renders: list[str] = []
+        for index in range(5):
+            self.scheduler.set(status, f"step {index}")
+            self.scheduler.request("shelf", lambda index=index: renders.append(f"shelf {index}"))
+
+        self.assertEqual(status.get(), "Idle")
+        self._pump_until_idle()
+
+        self.assertEqual(status.get(), "step 4")
+        self.assertEqual(renders, ["shelf 4"])
+        self.assertEqual(self.scheduler.frames, 1)
+
+    def test_unchanged_values_are_not_written(self) -> None:
+        status = tk.StringVar(master=self.interp, value="Idle")
+        writes: list[str] = []
+        status.trace_add("write", lambda *_: writes.append(status.get()))
+
+        self.scheduler.set(status, "Idle")
+        self._pump_until_idle()
+        self.scheduler.set(status, "Busy")
+        self._pump_until_idle()
+
+        self.assertEqual(writes, ["Busy"])
+        self.assertEqual(self.scheduler.skipped_writes, 1)
+
+    def test_items_beyond_the_budget_wait_for_the_next_frame(self) -> None:
+        handled: list[int] = []
+
+        def slow_handler(item: int) -> None:
+            handled.append(item)
+            self.clock.now += 0.003
+
+        self.scheduler.process(range(10), slow_handler)
+        self.interp.tk.dooneevent(tk._tkinter.DONT_WAIT | tk._tkinter.IDLE_EVENTS)
+
+        self.assertEqual(handled, [0, 1, 2])
+        self.assertEqual(self.scheduler.pending, 7)
+        self._pump_until_idle()
+        self.assertEqual(handled, list(range(10)))
+        self.assertEqual(self.scheduler.deferred_frames, 3)
+
+    def test_flush_applies_everything_immediately(self) -> None:
+        status = tk.StringVar(master=self.interp, value="Idle")
+        handled: list[int] = []
+        self.scheduler.set(status, "Done")
+        self.scheduler.process([1, 2], handled.append)
+
+        self.scheduler.flush()
+
+        self.assertEqual(status.get(), "Done")
+        self.assertEqual(handled, [1, 2])
+
+    def _pump_until_idle(self, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.scheduler.pending or self.interp.tk.call("after", "info"):
+            self.assertLess(time.monotonic(), deadline)
+            if not self.interp.tk.dooneevent(tk._tkinter.DONT_WAIT):
+                time.sleep(0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import unittest
+
+from brew_gui_manager.catalog_index import CatalogEntry
+from brew_gui_manager.search import SearchEngine
+
+
+def entry(
+    name: str,
+    description: str,
+    kind: str = "formula",
+    title: str = "",
+    tap: str = "homebrew/core",
+) -> CatalogEntry:
+    return CatalogEntry(name, kind, title or name, description, tap, "1.0")
+
+
+class SearchEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = SearchEngine(
+            [
+                entry("jq", "Lightweight and flexible command-line JSON processor"),
+                entry("jless", "Command-line pager for JSON data"),
+                entry("wget", "Internet file retriever"),
+                entry("ripgrep", "Search tool like grep and The Silver Searcher"),
+                entry(
+                    "iterm2",
+                    "Terminal emulator as alternative to Apple's Terminal app",
+                    "cask",
+                    "iTerm2",
+                    "homebrew/cask",
+                ),
+                entry("mytool", "Private helper", tap="acme/tools"),
+            ]
+        )
+
+    def names(self, query: str) -> list[str]:
+        return [hit.entry.name for hit in self.engine.search(query)]
+
+    def test_descriptions_rank_entries_matching_more_terms_first(self) -> None:
+        self.assertEqual(self.names("command line json")[:2], ["jless", "jq"])
+        self.assertEqual(self.names("the JSON tool"), ["jless", "jq"])
+        self.assertEqual(self.names("acme"), ["mytool"])
+
+    def test_exact_name_beats_description_matches(self) -> None:
+        hits = self.engine.search("grep")
+
+        self.assertEqual([hit.entry.name for hit in hits], ["ripgrep"])
+        self.assertEqual(self.names("jq")[0], "jq")
+        self.assertGreater(self.engine.search("wget")[0].score, 1000)
+
+    def test_tolerates_one_typo_per_term(self) -> None:
+        self.assertEqual(self.names("wgte"), ["wget"])
+        self.assertEqual(self.names("ripgrap"), ["ripgrep"])
+        self.assertEqual(self.names("iterm"), ["iterm2"])
+        self.assertEqual(self.names("termnial emulator"), ["iterm2"])
+        self.assertEqual(self.names("zzzz"), [])
+
+    def test_prefix_matches_rank_below_exact_tokens(self) -> None:
+        hits = self.engine.search("pager")
+        prefix_hits = self.engine.search("page")
+
+        self.assertEqual([hit.entry.name for hit in hits], ["jless"])
+        self.assertLess(prefix_hits[0].score, hits[0].score)
+        self.assertEqual(self.engine.search("json", limit=1)[0].entry.name, "jless")
+
+    def test_within_one_edit(self) -> None:
+        self.assertTrue(SearchEngine._within_one_edit("json", "jsno"))
+        self.assertTrue(SearchEngine._within_one_edit("wget", "wgets"))
+        self.assertTrue(SearchEngine._within_one_edit("wget", "wgat"))
+        self.assertFalse(SearchEngine._within_one_edit("ab", "ca"))
+        self.assertFalse(SearchEngine._within_one_edit("wget", "wg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
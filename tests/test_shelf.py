@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+import unittest
+
+from brew_gui_manager.shelf import ShelfModel
+
+
+class ShelfModelTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = ShelfModel()
+        self.model.visible_rows = 3
+
+    def test_window_labels_only_visible_rows(self) -> None:
+        self.model.set_items(["git", "node", "python", "wget", "zsh"])
+
+        self.assertEqual(self.model.window(), ["01   git", "02   node", "03   python"])
+        self.assertTrue(self.model.scroll_to(10))
+        self.assertEqual(self.model.top, 2)
+        self.assertEqual(self.model.window(), ["03   python", "04   wget", "05   zsh"])
+        self.assertEqual(self.model.visible_names(), ["python", "wget", "zsh"])
+        self.assertEqual(self.model.fractions(), (0.4, 1.0))
+        self.assertFalse(self.model.scroll_to(2))
+
+    def test_set_items_reports_changes_and_keeps_selection(self) -> None:
+        self.assertTrue(self.model.set_items(["git", "node", "wget"]))
+        self.model.selected = 2
+
+        self.assertFalse(self.model.set_items(["git", "node", "wget"]))
+        self.assertTrue(self.model.set_items(["wget", "zsh"]))
+        self.assertEqual(self.model.selected, 0)
+        self.assertEqual(self.model.selected_name(), "wget")
+
+        self.model.set_items(["zsh"])
+        self.assertIsNone(self.model.selected)
+        self.assertEqual(self.model.top, 0)
+
+    def test_ensure_visible_and_neighbours(self) -> None:
+        self.model.set_items([f"pkg-{index}" for index in range(10)])
+        self.model.selected = 7
+
+        self.assertTrue(self.model.ensure_visible(7))
+        self.assertEqual(self.model.top, 5)
+        self.assertFalse(self.model.ensure_visible(6))
+        self.assertEqual(self.model.neighbours(2), ["pkg-5", "pkg-6", "pkg-7", "pkg-8", "pkg-9"])
+
+    def test_large_shelf_only_formats_the_window(self) -> None:
+        items = [f"package-{index:05d}" for index in range(20_000)]
+        self.model.visible_rows = 40
+
+        started = time.perf_counter()
+        self.model.set_items(items)
+        self.model.scroll_to(15_000)
+        window = self.model.window()
+        row = self.model.index_of("package-19999")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(window), 40)
+        self.assertEqual(window[0], "15001   package-15000")
+        self.assertEqual(row, 19_999)
+        self.assertEqual(self.model.item(row), "package-19999")
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
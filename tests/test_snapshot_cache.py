@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from brew_gui_manager.brew_service import BrewSnapshot, PackageDetails
+from brew_gui_manager.snapshot_cache import SnapshotCache
+
+
+class SnapshotCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.path = Path(self._tempdir.name) / "cache" / "snapshot.json"
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_round_trip_snapshot_and_details(self) -> None:
+        cache = SnapshotCache(self.path)
+        cache.store_snapshot(self._snapshot("Homebrew 4.3.0"), "/opt/homebrew")
+        cache.store_details(self._details("wget"))
+        cache.flush()
+
+        loaded = SnapshotCache(self.path)
+        cached = loaded.load("/opt/homebrew")
+
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.snapshot.formulae, ["wget"])
+        self.assertEqual(cached.snapshot.details_for("wget", "formula").latest_version, "1.2.3")
+        self.assertEqual(cached.brew_version, "Homebrew 4.3.0")
+        self.assertEqual(loaded.details_for("wget", "formula").description, "internet retriever")
+        self.assertEqual([entry.name for entry in self.path.parent.iterdir()], ["snapshot.json"])
+
+    def test_prefix_mismatch_hides_cache(self) -> None:
+        SnapshotCache(self.path).store_snapshot(self._snapshot("Homebrew 4.3.0"), "/opt/homebrew")
+
+        self.assertIsNone(SnapshotCache(self.path).load("/usr/local"))
+
+    def test_new_brew_version_drops_cached_details(self) -> None:
+        cache = SnapshotCache(self.path)
+        cache.store_snapshot(self._snapshot("Homebrew 4.3.0"), "/opt/homebrew")
+        cache.store_details(self._details("wget"))
+
+        cache.store_snapshot(self._snapshot("Homebrew 4.4.0"), "/opt/homebrew")
+
+        self.assertIsNone(cache.details_for("wget", "formula"))
+        self.assertIsNone(SnapshotCache(self.path).details_for("wget", "formula"))
+
+    def test_moved_revision_drops_details_at_load(self) -> None:
+        cache = SnapshotCache(self.path)
+        snapshot = self._snapshot("Homebrew 4.3.0")
+        snapshot.details = {"formula:wget": self._details("wget")}
+        cache.store_snapshot(snapshot, "/opt/homebrew", "abc123")
+        cache.store_details(self._details("wget"))
+        cache.flush()
+
+        same = SnapshotCache(self.path)
+        same_cached = same.load("/opt/homebrew", "abc123")
+        moved = SnapshotCache(self.path)
+        moved_cached = moved.load("/opt/homebrew", "def456")
+
+        self.assertIsNotNone(same.details_for("wget", "formula"))
+        self.assertEqual(list(same_cached.snapshot.details), ["formula:wget"])
+        self.assertEqual(moved_cached.snapshot.formulae, ["wget"])
+        self.assertEqual(moved_cached.snapshot.details, {})
+        self.assertIsNone(moved.details_for("wget", "formula"))
+
+    def test_details_writes_are_batched(self) -> None:
+        cache = SnapshotCache(self.path, details_write_delay=0.1)
+        cache.store_snapshot(self._snapshot("Homebrew 4.3.0"), "/opt/homebrew")
+
+        write = cache._write
+        written = threading.Event()
+
+        def write_and_signal(payload: dict) -> bool:
+            try:
+                return write(payload)
+            finally:
+                written.set()
+
+        with patch.object(cache, "_write", side_effect=write_and_signal) as write_mock:
+            for name in ("wget", "jq", "git"):
+                cache.store_details(self._details(name))
+            self.assertEqual(write_mock.call_count, 0)
+            self.assertTrue(written.wait(5))
+
+        self.assertEqual(write_mock.call_count, 1)
+        loaded = SnapshotCache(self.path)
+        loaded.load("/opt/homebrew")
+        self.assertIsNotNone(loaded.details_for("git", "formula"))
+
+    def test_failed_snapshots_are_not_cached(self) -> None:
+        cache = SnapshotCache(self.path)
+        snapshot = self._snapshot("Unknown")
+        snapshot.error = "boom"
+
+        cache.store_snapshot(snapshot, "/opt/homebrew")
+
+        self.assertFalse(self.path.exists())
+
+    def test_corrupt_or_old_schema_is_ignored(self) -> None:
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("{not json", encoding="utf-8")
+        self.assertIsNone(SnapshotCache(self.path).load("/opt/homebrew"))
+
+        self.path.write_text('{"schema": 0, "prefix": "/opt/homebrew"}', encoding="utf-8")
+        self.assertIsNone(SnapshotCache(self.path).load("/opt/homebrew"))
+
+    def test_default_path_honours_xdg_cache_home(self) -> None:
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": "/tmp/xdg"}):
+            self.assertEqual(SnapshotCache.default_path(), Path("/tmp/xdg/brew-gui-manager/snapshot.json"))
+
+    @staticmethod
+    def _snapshot(version: str) -> BrewSnapshot:
+        return BrewSnapshot(
+            available=True,
+            version=version,
+            formulae=["wget"],
+            casks=[],
+            outdated_formulae=[],
+            outdated_casks=[],
+            details={"formula:wget": SnapshotCacheTests._details("wget")},
+        )
+
+    @staticmethod
+    def _details(name: str) -> PackageDetails:
+        return PackageDetails(
+            name=name,
+            kind="formula",
+            title=name,
+            description="internet retriever",
+            homepage="https://example.com",
+            latest_version="1.2.3",
+            installed_versions=["1.2.2"],
+            dependencies=[],
+            tap="homebrew/core",
+            caveats="",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ import threading
 import time
 import unittest
 
+from brew_gui_manager.task_context import TaskCancelled, current_task
 from brew_gui_manager.task_runner import BackgroundTaskRunner
 
 
@@ -40,6 +41,234 @@ class BackgroundTaskRunnerTests(unittest.TestCase):
 
         self.assertNotEqual(events[-1].payload, main_thread)
 
+    def test_progress_reporter_emits_events_from_any_thread(self) -> None:
+        runner = BackgroundTaskRunner()
+
+        def streaming_task() -> str:
+            report = runner.progress_reporter()
+            report("first line")
+            helper = threading.Thread(target=report, args=("from helper",))
+            helper.start()
+            helper.join()
+            return "done"
+
+        task_id = runner.submit("stream task", streaming_task)
+        events = self._wait_for_events(runner, expected=4)
+
+        self.assertEqual([event.status for event in events], ["started", "progress", "progress", "completed"])
+        self.assertEqual([event.payload for event in events[1:3]], ["first line", "from helper"])
+        self.assertTrue(all(event.task_id == task_id for event in events))
+
+    def test_progress_reporter_requires_a_running_task(self) -> None:
+        with self.assertRaises(RuntimeError):
+            BackgroundTaskRunner().progress_reporter()
+
+    def test_cancel_emits_cancelled_and_drops_the_result(self) -> None:
+        runner = BackgroundTaskRunner()
+        release = threading.Event()
+
+        task_id = runner.submit("slow task", lambda: release.wait(5) and "done")
+        events = self._wait_for_events(runner, expected=1)
+        self.assertTrue(runner.cancel(task_id))
+        release.set()
+        time.sleep(0.1)
+        events += self._wait_for_events(runner, expected=1)
+
+        self.assertEqual([event.status for event in events], ["started", "cancelled"])
+        self.assertIsInstance(events[-1].error, TaskCancelled)
+        self.assertFalse(runner.is_running(task_id))
+        self.assertFalse(runner.cancel(task_id))
+
+    def test_timeout_cancels_the_task(self) -> None:
+        runner = BackgroundTaskRunner()
+        observed: list[bool] = []
+
+        def watch_context() -> None:
+            context = current_task()
+            observed.append(context is not None)
+            time.sleep(0.5)
+            observed.append(context.cancelled)
+
+        runner.submit("stuck task", watch_context, timeout=0.1)
+        events = self._wait_for_events(runner, expected=2)
+        time.sleep(0.6)
+
+        self.assertEqual(events[-1].status, "cancelled")
+        self.assertIn("Timed out", str(events[-1].error))
+        self.assertEqual(observed, [True, True])
+        self.assertEqual(runner.drain_events(), [])
+
+    def test_interactive_lane_runs_before_queued_background_work(self) -> None:
+        runner = BackgroundTaskRunner(max_workers=1)
+        gate = threading.Event()
+        order: list[str] = []
+
+        runner.submit("blocker", lambda: gate.wait(2), lane="background")
+        self._wait_for_events(runner, expected=1)
+        for index in range(3):
+            label = f"prefetch {index}"
+            runner.submit(label, lambda label=label: order.append(label), lane="background")
+        runner.submit("refresh", lambda: order.append("refresh"))
+        runner.submit("details", lambda: order.append("details"), lane="interactive")
+        self.assertEqual(runner.queue_depth("background"), 3)
+        self.assertEqual(runner.queue_depth(), 5)
+        gate.set()
+        events = self._wait_for_events(runner, expected=11)
+
+        self.assertEqual(order, ["details", "refresh", "prefetch 0", "prefetch 1", "prefetch 2"])
+        started = {event.description: event for event in events if event.status == "started"}
+        self.assertEqual(started["details"].lane, "interactive")
+        self.assertEqual(started["prefetch 0"].queue_depth, 2)
+        self.assertGreater(started["prefetch 2"].wait_time, 0)
+
+    def test_mutating_lane_runs_one_task_at_a_time(self) -> None:
+        runner = BackgroundTaskRunner(max_workers=4)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def action() -> None:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+        for _index in range(4):
+            runner.submit("brew action", action, lane="mutating")
+        runner.submit("details", lambda: "fast", lane="interactive")
+        events = self._wait_for_events(runner, expected=10)
+
+        self.assertEqual(peak, 1)
+        statuses = [(event.description, event.status) for event in events]
+        second_action = [index for index, item in enumerate(statuses) if item == ("brew action", "started")][1]
+        self.assertLess(statuses.index(("details", "completed")), second_action)
+
+    def test_cancelling_a_queued_task_never_starts_it(self) -> None:
+        runner = BackgroundTaskRunner()
+        gate = threading.Event()
+        ran: list[str] = []
+
+        runner.submit("install", lambda: gate.wait(2), lane="mutating")
+        queued = runner.submit("uninstall", lambda: ran.append("uninstall"), lane="mutating")
+        self.assertTrue(runner.cancel(queued))
+        gate.set()
+        events = self._wait_for_events(runner, expected=3)
+        time.sleep(0.1)
+
+        self.assertEqual(ran, [])
+        self.assertEqual([event.status for event in events if event.task_id == queued], ["cancelled"])
+        self.assertEqual(runner.queue_depth("mutating"), 0)
+
+    def test_same_key_replaces_a_queued_task(self) -> None:
+        runner = BackgroundTaskRunner(max_workers=1)
+        gate = threading.Event()
+        ran: list[str] = []
+
+        runner.submit("blocker", lambda: gate.wait(2))
+        self._wait_for_events(runner, expected=1)
+        first = runner.submit("details wget", lambda: ran.append("wget"), key="details")
+        second = runner.submit("details jq", lambda: ran.append("jq"), key="details")
+        gate.set()
+        events = self._wait_for_events(runner, expected=3)
+
+        self.assertEqual(first, second)
+        self.assertEqual(ran, ["jq"])
+        self.assertEqual(runner.queue_depth(), 0)
+        self.assertEqual([(event.description, event.generation) for event in events[1:]], [("details jq", 2)] * 2)
+
+    def test_replacing_a_queued_task_moves_it_to_the_new_lane(self) -> None:
+        runner = BackgroundTaskRunner(max_workers=1)
+        gate = threading.Event()
+        order: list[str] = []
+
+        runner.submit("blocker", lambda: gate.wait(2))
+        self._wait_for_events(runner, expected=1)
+        first = runner.submit("prefetch wget", lambda: order.append("prefetch"), lane="background", key="wget")
+        runner.submit("refresh", lambda: order.append("refresh"))
+        second = runner.submit("details wget", lambda: order.append("details"), lane="interactive", key="wget")
+        depths = (runner.queue_depth("background"), runner.queue_depth("interactive"))
+        gate.set()
+        events = self._wait_for_events(runner, expected=5)
+        time.sleep(0.1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(depths, (0, 1))
+        self.assertEqual(order, ["details", "refresh"])
+        started = [event for event in events if event.status == "started" and event.task_id == first]
+        self.assertEqual([event.lane for event in started], ["interactive"])
+        self.assertEqual(runner.queue_depth(), 0)
+
+    def test_cancelling_a_queued_task_updates_the_queue_depth_right_away(self) -> None:
+        runner = BackgroundTaskRunner(max_workers=1)
+        gate = threading.Event()
+
+        runner.submit("blocker", lambda: gate.wait(2))
+        self._wait_for_events(runner, expected=1)
+        queued = runner.submit("prefetch", lambda: None, lane="background")
+        runner.submit("refresh", lambda: None)
+        runner.cancel(queued)
+
+        self.assertEqual((runner.queue_depth("background"), runner.queue_depth()), (0, 1))
+        gate.set()
+        self._wait_for_events(runner, expected=4)
+        time.sleep(0.1)
+        self.assertEqual(runner.queue_depth(), 0)
+
+    def test_join_returns_the_running_task_with_that_key(self) -> None:
+        runner = BackgroundTaskRunner()
+        gate = threading.Event()
+        calls: list[str] = []
+
+        def snapshot() -> str:
+            calls.append("snapshot")
+            gate.wait(2)
+            return "fresh"
+
+        first = runner.submit("refresh", snapshot, key="snapshot", join=True)
+        self._wait_for_events(runner, expected=1)
+        joined = runner.submit("refresh", snapshot, key="snapshot", join=True)
+        gate.set()
+        events = self._wait_for_events(runner, expected=1)
+
+        self.assertEqual(joined, first)
+        self.assertEqual(calls, ["snapshot"])
+        self.assertEqual(events[-1].payload, "fresh")
+
+    def test_without_join_a_running_key_gets_a_newer_generation(self) -> None:
+        runner = BackgroundTaskRunner()
+        gate = threading.Event()
+
+        first = runner.submit("details wget", lambda: gate.wait(2) and "wget", key="details")
+        self._wait_for_events(runner, expected=1)
+        second = runner.submit("details jq", lambda: "jq", key="details")
+        events = self._wait_for_events(runner, expected=2)
+        gate.set()
+        events += self._wait_for_events(runner, expected=1)
+
+        self.assertNotEqual(first, second)
+        completed = {event.payload: event.generation for event in events if event.status == "completed"}
+        self.assertEqual(completed, {"jq": 2, "wget": 1})
+
+    def test_notifier_runs_for_every_event_and_idle_tracks_work(self) -> None:
+        notified = threading.Semaphore(0)
+        runner = BackgroundTaskRunner(notifier=notified.release)
+
+        self.assertTrue(runner.idle)
+        runner.submit("task", lambda: "done")
+        self.assertFalse(runner.idle)
+        for _index in range(2):
+            self.assertTrue(notified.acquire(timeout=2))
+        runner.drain_events()
+
+        self.assertTrue(runner.idle)
+
+    def test_unknown_lane_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            BackgroundTaskRunner().submit("task", lambda: None, lane="urgent")
+
     @staticmethod
     def _wait_for_events(runner: BackgroundTaskRunner, expected: int) -> list:
         deadline = time.time() + 2
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import time
+import tkinter as tk
+import unittest
+
+from brew_gui_manager.tk_wakeup import TkWakeup
+
+
+class TkWakeupTests(unittest.TestCase):
+    def setUp(self) -> None:
+        # A bare Tcl interpreter runs the same event loop without a display.
+        self.interp = tk.Tcl()
+        self.calls = 0
+        self.wakeup = TkWakeup(self.interp, self._callback)
+        if self.wakeup.mode != "pipe":
+            self.skipTest("Tk file handlers are not available on this platform.")
+
+    def tearDown(self) -> None:
+        self.wakeup.close()
+
+    def test_notify_from_a_thread_runs_the_callback_on_the_loop(self) -> None:
+        threading.Thread(target=self.wakeup.notify).start()
+
+        self._pump_until(lambda: self.calls == 1)
+
+        self.assertEqual(self.calls, 1)
+
+    def test_a_burst_of_notifications_costs_one_wakeup(self) -> None:
+        for _index in range(100):
+            self.wakeup.notify()
+
+        self._pump_until(lambda: self.calls >= 1)
+        self._pump_for(0.05)
+
+        self.assertEqual(self.calls, 1)
+        self.wakeup.notify()
+        self._pump_until(lambda: self.calls == 2)
+
+    def test_close_falls_back_to_polling(self) -> None:
+        self.wakeup.close()
+        self.wakeup.notify()
+        self._pump_for(0.05)
+
+        self.assertEqual(self.wakeup.mode, "poll")
+        self.assertEqual(self.calls, 0)
+
+    def _callback(self) -> None:
+        self.calls += 1
+
+    def _pump_until(self, condition, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "event loop never ran the callback")
+            self._pump_once()
+
+    def _pump_once(self) -> None:
+        if not self.interp.tk.dooneevent(tk._tkinter.DONT_WAIT):
+            time.sleep(0.005)
+
+    def _pump_for(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self._pump_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import unittest
+
+from brew_gui_manager.upgrade_queue import UpgradeQueue
+
+
+class UpgradeQueueTests(unittest.TestCase):
+    def test_add_deduplicates_and_keeps_order(self) -> None:
+        queue = UpgradeQueue()
+
+        self.assertTrue(queue.add("wget", "formula"))
+        self.assertTrue(queue.add("iterm2", "cask"))
+        self.assertFalse(queue.add("wget", "formula"))
+        self.assertTrue(queue.add("wget", "cask"))
+
+        self.assertEqual(len(queue), 3)
+        self.assertEqual(queue.drain(), [("formula", "wget"), ("cask", "iterm2"), ("cask", "wget")])
+        self.assertEqual(len(queue), 0)
+
+    def test_in_flight_packages_are_not_queued_again(self) -> None:
+        queue = UpgradeQueue()
+        queue.add("wget", "formula")
+        batch = queue.drain()
+
+        self.assertTrue(queue.busy)
+        self.assertIn("formula:wget", queue)
+        self.assertFalse(queue.add("wget", "formula"))
+        self.assertTrue(queue.add("jq", "formula"))
+
+        queue.finish(batch)
+
+        self.assertFalse(queue.busy)
+        self.assertTrue(queue.add("wget", "formula"))
+        self.assertEqual(queue.drain(), [("formula", "jq"), ("formula", "wget")])
+
+
+if __name__ == "__main__":
+    unittest.main()